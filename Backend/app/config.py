@@ -3,7 +3,7 @@ Configuration de l'application FastAPI
 Gère les variables d'environnement et les paramètres de l'application
 """
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
@@ -53,6 +53,48 @@ class Settings(BaseSettings):
     PUBLIC_FRONTEND_NEXTJS_URL: str = "http://localhost:3100"
     SQLite_DATABASE_URL: str = "sqlite:///./data/coupe_ucl_2026.db"
 
+    # Scores en direct (SSE)
+    # "memory" : diffusion locale au processus (un seul worker uvicorn)
+    # "sqlite" : bus partagé entre les workers d'un même hôte via un fichier SQLite
+    LIVE_SCORE_BUS_BACKEND: str = "memory"
+    LIVE_SCORE_BUS_PATH: Optional[str] = None  # Par défaut: <dossier de la base>/live_score_bus.db
+    LIVE_SCORE_BUS_POLL_INTERVAL: float = 0.05  # secondes
+    LIVE_SCORE_BUS_RETENTION_SECONDS: int = 300
+    LIVE_SCORE_KEYFRAME_INTERVAL: int = 20  # un état complet tous les N événements en mode delta (0 = pas de delta)
+    # Fenêtre de regroupement des mises à jour d'un même match (0 = diffusion immédiate)
+    # Par sport, sur option : ex. {"flechettes": 100, "petanque": 100}
+    LIVE_SCORE_COALESCE_WINDOW_MS: int = 0
+    LIVE_SCORE_COALESCE_WINDOW_BY_SPORT: Dict[str, int] = {}
+    # Éviction des scores en direct : inactivité (0 = jamais) et nombre maximum de matchs en mémoire (LRU)
+    LIVE_SCORE_IDLE_TTL_SECONDS: int = 2 * 3600
+    LIVE_SCORE_MAX_MATCHES: int = 500
+    # Flux SSE : keepalive partagé, éviction des clients morts et limites de connexions
+    SSE_HEARTBEAT_INTERVAL: float = 5.0  # secondes sans écriture avant un keepalive
+    SSE_CLIENT_TIMEOUT: float = 30.0  # secondes sans écriture consommée avant éviction
+    SSE_MAX_CONNECTIONS: int = 2000
+    SSE_MAX_CONNECTIONS_PER_IP: int = 50  # large : les écrans d'un site partagent souvent une IP (NAT)
+    SSE_RECONNECT_WINDOW: float = 15.0  # secondes : étalement des reconnexions à l'arrêt (drain)
+
+    # Journal des scores en direct (reprise à chaud après un redémarrage)
+    LIVE_SCORE_JOURNAL_ENABLED: bool = True
+    LIVE_SCORE_JOURNAL_PATH: Optional[str] = None  # Par défaut: <dossier de la base>/live_score_journal.db
+    LIVE_SCORE_JOURNAL_FLUSH_INTERVAL: float = 0.5  # secondes
+    LIVE_SCORE_JOURNAL_BATCH_SIZE: int = 200
+    LIVE_SCORE_JOURNAL_COMPACT_INTERVAL: int = 600  # secondes
+
+    # Index en mémoire des matchs (vérification d'existence des scores en direct)
+    MATCH_INDEX_TTL_SECONDS: int = 300  # rechargement complet (suppressions faites par d'autres workers)
+    MATCH_INDEX_NEGATIVE_TTL_SECONDS: int = 10  # mémorisation des identifiants de match inconnus
+
+    # Traitements post-résultat (classements de poule, propagation) en tâche de fond
+    RESULT_WORKER_COALESCE_MS: int = 200  # fenêtre de regroupement des résultats d'un même tournoi
+
+    # Probabilités de qualification : calculs en attente ou en cours au-delà desquels on répond 503
+    QUALIFICATION_ODDS_MAX_PENDING: int = 2
+
+    # Encodeur JSON des trames SSE et du bus : "json" (standard) ou "orjson" (si installé)
+    JSON_ENCODER: str = "json"
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
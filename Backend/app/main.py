@@ -12,18 +12,25 @@ from pathlib import Path
 from datetime import datetime
 
 from fastapi import (
-    FastAPI, Request, Query, Depends, status, Body, UploadFile, File, HTTPException
+    FastAPI, Request, Query, Header, Depends, status, Body, UploadFile, File, HTTPException,
+    WebSocket, WebSocketDisconnect
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from app.utils.serializers import match_to_dict
+from app.utils.json_encoder import iter_json_array, iter_json_object
+from app.services.match_index import match_index
+from app.services.propagation_engine import propagation_engine
+from app.services.result_worker import result_worker
+from app.services.structure_cache import bump_structure_version
+from app.services.structure_purge import purge_tournament_structure
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from app.db import get_db, init_db
+from app.db import SessionLocal, get_db, init_db
 from app.config import settings
 from app.auth.permissions import require_admin, require_admin_or_staff
 from app.exceptions import (
@@ -63,21 +70,6 @@ app = FastAPI(
     },
 )
 
-# Variables globales pour gérer l'arrêt propre
-shutdown_event = None
-
-def signal_handler(signum, frame):
-    """Gestionnaire de signaux pour un arrêt propre"""
-    logger.info(f"Received signal {signum}")
-    if shutdown_event:
-        shutdown_event.set()
-
-# Installer les gestionnaires de signaux
-if hasattr(signal, 'SIGINT'):
-    signal.signal(signal.SIGINT, signal_handler)
-if hasattr(signal, 'SIGTERM'):
-    signal.signal(signal.SIGTERM, signal_handler)
-
 # CORS setup
 logger.info(f"CORS_ORIGINS: {settings.CORS_ORIGINS}")
 
@@ -128,6 +120,33 @@ app.include_router(courts_status.router, tags=["Courts"])
 # Router des matchs (fiche de match + événements)
 app.include_router(matches_router.router, prefix="")
 
+def install_sse_drain_signal_handlers():
+    """
+    Déclenche le drain des flux SSE dès la réception de SIGTERM/SIGINT.
+
+    uvicorn n'exécute l'événement "shutdown" qu'une fois toutes les connexions fermées :
+    les flux SSE le bloqueraient jusqu'au SIGKILL et tous les spectateurs se reconnecteraient
+    au même instant. On chaîne donc le drain avant le gestionnaire installé par uvicorn
+    (appelé au démarrage, après qu'uvicorn a installé ses propres gestionnaires).
+    """
+    import threading
+    from app.services.sse_connections import sse_connections
+
+    # Les signaux ne peuvent être capturés que depuis le thread principal (pas sous TestClient)
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+
+        def drain_then_exit(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(sse_connections.drain, settings.SSE_RECONNECT_WINDOW)
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(sig, drain_then_exit)
+
 @app.on_event("startup")
 async def startup_event():
     """Actions à effectuer au démarrage de l'application"""
@@ -160,11 +179,31 @@ async def startup_event():
             if "standing_points" not in cols:
                 conn.execute(text("ALTER TABLE Pool ADD COLUMN standing_points TEXT DEFAULT NULL"))
                 logger.info("Migration: added Pool.standing_points column")
+            cols = [row[1] for row in conn.execute(text("PRAGMA table_info(Tournament)")).fetchall()]
+            if "structure_version" not in cols:
+                conn.execute(text("ALTER TABLE Tournament ADD COLUMN structure_version INTEGER NOT NULL DEFAULT 0"))
+                logger.info("Migration: added Tournament.structure_version column")
             conn.commit()
 
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
         raise
+
+    # Démarrer le bus de diffusion des scores en direct (partagé entre workers si configuré)
+    from app.services.live_score_service import live_score_manager
+    await live_score_manager.start()
+
+    # Charger l'index des matchs utilisé par les endpoints de score en direct
+    await asyncio.to_thread(match_index.load)
+
+    # Keepalive partagé et éviction des clients SSE morts
+    from app.services.sse_connections import sse_connections
+    sse_connections.start()
+    install_sse_drain_signal_handlers()
+
+    # File des traitements post-résultat (PATCH /matches/{id})
+    result_worker.start()
+
     print("\n📋 Routes disponibles:")
     for route in app.routes:
         if hasattr(route, "methods"):
@@ -178,6 +217,13 @@ async def shutdown_event():
     try:
         # Ajouter ici toute logique de nettoyage nécessaire
         # Par exemple: fermer les connexions, sauvegarder des données, etc.
+        from app.services.live_score_service import live_score_manager
+        from app.services.sse_connections import sse_connections
+        # Fermer les flux SSE restants avec un délai de reconnexion aléatoire
+        sse_connections.drain(settings.SSE_RECONNECT_WINDOW)
+        await sse_connections.stop()
+        await live_score_manager.stop()
+        await result_worker.stop()
         await asyncio.sleep(0.1)  # Petit délai pour finir les tâches en cours
         logger.info("Application shutdown complete")
     except Exception as e:
@@ -1559,6 +1605,8 @@ async def update_tournament(
                     db.query(MatchSchedule).filter(MatchSchedule.match_id == m_id).delete()
                     db.delete(m)
     
+    # Suppressions en masse (planifications) non vues par l'écouteur de flush
+    bump_structure_version(db, tournament_id)
     db.commit()
     db.refresh(tournament)
     
@@ -1579,6 +1627,7 @@ async def delete_tournament(
     
     db.delete(tournament)
     db.commit()
+    match_index.invalidate_tournament(tournament_id)
     
     return create_success_response(
         data={"id": tournament_id},
@@ -2392,6 +2441,7 @@ async def delete_match(
     
     db.delete(match)
     db.commit()
+    match_index.invalidate_match(match_id)
     
     return create_success_response(
         data={"id": match_id},
@@ -2426,169 +2476,19 @@ async def update_match(
     for field, value in update_data.items():
         setattr(match, field, value)
     
+    completed = match.status == "completed" and match.score_a is not None and match.score_b is not None
     db.commit()
-    db.refresh(match)
     
-    # === MISE À JOUR DU CLASSEMENT DE POULE ===
-    # Si le match est un match de poule et qu'il est complété, mettre à jour le classement
-    if match.pool_id is not None and match.status == "completed" and match.score_a is not None and match.score_b is not None:
-        from app.services.match_service import MatchService
-        match_service = MatchService(db)
-        match_service.update_pool_rankings(match.pool_id)
+    # Classement de poule, équipes depuis les noms et propagation : en tâche de fond,
+    # regroupés par tournoi (GET /tournaments/{id}/propagation-status)
+    if completed:
+        result_worker.enqueue(match.tournament_id, match.id, match.pool_id)
+        if not result_worker.running:
+            await asyncio.to_thread(result_worker.process_pending)
     
-    # === PROPAGATION AUTOMATIQUE DES ÉQUIPES ===
-    # Si le match vient d'être complété avec des scores, propager les équipes
-    if match.status == "completed" and match.score_a is not None and match.score_b is not None:
-        # ✅ FIX: Si les team_sport_id sont NULL, essayer de les résoudre depuis team_a_source/team_b_source
-        from app.models.teamsport import TeamSport
-
-        # Récupérer la phase et le tournoi UNE SEULE FOIS
-        phase = db.query(TournamentPhase).filter(TournamentPhase.id == match.phase_id).first()
-        if phase:
-            tournament = db.query(Tournament).filter(Tournament.id == phase.tournament_id).first()
-            sport_id = tournament.sport_id if tournament else None
-
-            if sport_id:
-                # Résoudre team_a_source
-                if match.team_sport_a_id is None and match.team_a_source:
-                    team_sport_a = (
-                        db.query(TeamSport)
-                        .join(Team)
-                        .filter(
-                            Team.name == match.team_a_source,
-                            TeamSport.sport_id == sport_id
-                        )
-                        .first()
-                    )
-                    if team_sport_a:
-                        match.team_sport_a_id = team_sport_a.id
-                        print(f"✅ [Match {match.id}] team_a_source '{match.team_a_source}' → team_sport_id {team_sport_a.id}")
-
-                # Résoudre team_b_source
-                if match.team_sport_b_id is None and match.team_b_source:
-                    team_sport_b = (
-                        db.query(TeamSport)
-                        .join(Team)
-                        .filter(
-                            Team.name == match.team_b_source,
-                            TeamSport.sport_id == sport_id
-                        )
-                        .first()
-                    )
-                    if team_sport_b:
-                        match.team_sport_b_id = team_sport_b.id
-                        print(f"✅ [Match {match.id}] team_b_source '{match.team_b_source}' → team_sport_id {team_sport_b.id}")
-
-        # Déterminer le gagnant et le perdant
-        if match.team_sport_a_id is not None and match.team_sport_b_id is not None:
-            if match.score_a > match.score_b:
-                winner_team_sport_id = match.team_sport_a_id
-                loser_team_sport_id = match.team_sport_b_id
-            elif match.score_b > match.score_a:
-                winner_team_sport_id = match.team_sport_b_id
-                loser_team_sport_id = match.team_sport_a_id
-            else:
-                # Match nul - pas de propagation automatique pour l'instant
-                winner_team_sport_id = None
-                loser_team_sport_id = None
-            
-            # Propager le gagnant vers le match de destination
-            if winner_team_sport_id and match.winner_destination_match_id:
-                print(f"🔄 Propagation du gagnant (team_sport_id={winner_team_sport_id}) du match {match.id} vers match {match.winner_destination_match_id}")
-                print(f"   Slot configuré: {match.winner_destination_slot}")
-
-                winner_dest_match = db.query(Match).filter(
-                    Match.id == match.winner_destination_match_id
-                ).first()
-
-                if winner_dest_match:
-                    # Récupérer le nom de l'équipe gagnante
-                    winner_team_sport = db.query(TeamSport).filter(TeamSport.id == winner_team_sport_id).first()
-                    winner_team_name = None
-                    if winner_team_sport:
-                        winner_team = db.query(Team).filter(Team.id == winner_team_sport.team_id).first()
-                        winner_team_name = winner_team.name if winner_team else None
-
-                    print(f"   Match destination trouvé: {winner_dest_match.id} (label={winner_dest_match.label})")
-                    print(f"   Nom de l'équipe gagnante: {winner_team_name}")
-
-                    # UTILISER LE SLOT CONFIGURÉ (winner_destination_slot)
-                    if match.winner_destination_slot == "A":
-                        winner_dest_match.team_sport_a_id = winner_team_sport_id
-                        if winner_team_name:
-                            winner_dest_match.team_a_source = winner_team_name
-                        print(f"   ✅ Gagnant assigné à slot A (team_sport_a_id={winner_team_sport_id}, team_a_source={winner_team_name})")
-                    elif match.winner_destination_slot == "B":
-                        winner_dest_match.team_sport_b_id = winner_team_sport_id
-                        if winner_team_name:
-                            winner_dest_match.team_b_source = winner_team_name
-                        print(f"   ✅ Gagnant assigné à slot B (team_sport_b_id={winner_team_sport_id}, team_b_source={winner_team_name})")
-                    else:
-                        # Fallback: chercher un slot libre si winner_destination_slot n'est pas configuré
-                        print(f"   ⚠️ winner_destination_slot non configuré, recherche d'un slot libre...")
-                        if winner_dest_match.team_sport_a_id is None:
-                            winner_dest_match.team_sport_a_id = winner_team_sport_id
-                            if winner_team_name:
-                                winner_dest_match.team_a_source = winner_team_name
-                            print(f"   ✅ Gagnant assigné à slot A libre (fallback)")
-                        elif winner_dest_match.team_sport_b_id is None:
-                            winner_dest_match.team_sport_b_id = winner_team_sport_id
-                            if winner_team_name:
-                                winner_dest_match.team_b_source = winner_team_name
-                            print(f"   ✅ Gagnant assigné à slot B libre (fallback)")
-                        else:
-                            print(f"   ❌ Aucun slot libre disponible!")
-                else:
-                    print(f"   ❌ Match destination {match.winner_destination_match_id} introuvable")
-
-            # Propager le perdant vers le match de destination (bracket perdants)
-            if loser_team_sport_id and match.loser_destination_match_id:
-                print(f"🔄 Propagation du perdant (team_sport_id={loser_team_sport_id}) du match {match.id} vers match {match.loser_destination_match_id}")
-                print(f"   Slot configuré: {match.loser_destination_slot}")
-
-                loser_dest_match = db.query(Match).filter(
-                    Match.id == match.loser_destination_match_id
-                ).first()
-
-                if loser_dest_match:
-                    # Récupérer le nom de l'équipe perdante
-                    loser_team_sport = db.query(TeamSport).filter(TeamSport.id == loser_team_sport_id).first()
-                    loser_team_name = None
-                    if loser_team_sport:
-                        loser_team = db.query(Team).filter(Team.id == loser_team_sport.team_id).first()
-                        loser_team_name = loser_team.name if loser_team else None
-
-                    print(f"   Match destination trouvé: {loser_dest_match.id} (label={loser_dest_match.label})")
-                    print(f"   Nom de l'équipe perdante: {loser_team_name}")
-
-                    # UTILISER LE SLOT CONFIGURÉ (loser_destination_slot)
-                    if match.loser_destination_slot == "A":
-                        loser_dest_match.team_sport_a_id = loser_team_sport_id
-                        if loser_team_name:
-                            loser_dest_match.team_a_source = loser_team_name
-                        print(f"   ✅ Perdant assigné à slot A (team_sport_a_id={loser_team_sport_id}, team_a_source={loser_team_name})")
-                    elif match.loser_destination_slot == "B":
-                        loser_dest_match.team_sport_b_id = loser_team_sport_id
-                        if loser_team_name:
-                            loser_dest_match.team_b_source = loser_team_name
-                        print(f"   ✅ Perdant assigné à slot B (team_sport_b_id={loser_team_sport_id}, team_b_source={loser_team_name})")
-                    else:
-                        # Fallback: chercher un slot libre si loser_destination_slot n'est pas configuré
-                        print(f"   ⚠️ loser_destination_slot non configuré, recherche d'un slot libre...")
-                        if loser_dest_match.team_sport_a_id is None:
-                            loser_dest_match.team_sport_a_id = loser_team_sport_id
-                            if loser_team_name:
-                                loser_dest_match.team_a_source = loser_team_name
-                            print(f"   ✅ Perdant assigné à slot A libre (fallback)")
-                        elif loser_dest_match.team_sport_b_id is None:
-                            loser_dest_match.team_sport_b_id = loser_team_sport_id
-                            if loser_team_name:
-                                loser_dest_match.team_b_source = loser_team_name
-                            print(f"   ✅ Perdant assigné à slot B libre (fallback)")
-                        else:
-                            print(f"   ❌ Aucun slot libre disponible!")
-            
-            db.commit()
+    # Match terminé : retirer son score en direct de la mémoire (tous les workers)
+    if update_data.get("status") == "completed":
+        await live_score_manager.clear_match(match_id)
     
     db.refresh(match)
     return create_success_response(
@@ -2611,6 +2511,9 @@ async def update_match_status(
     db.commit()
     db.refresh(match)
     
+    if status == "completed":
+        await live_score_manager.clear_match(match_id)
+    
     return create_success_response(
         data=MatchResponse.model_validate(match).model_dump(mode="json"),
         message="Statut du match mis à jour avec succès"
@@ -2631,6 +2534,9 @@ async def patch_match_status(
     db.commit()
     db.refresh(match)
     
+    if status == "completed":
+        await live_score_manager.clear_match(match_id)
+    
     return create_success_response(
         data=MatchResponse.model_validate(match).model_dump(mode="json"),
         message="Statut du match mis à jour avec succès"
@@ -2703,6 +2609,7 @@ async def create_match_schedule(
     if payload.match_id != match_id:
         raise BadRequestError("Le match_id du body ne correspond pas à l'URL")
     schedule = service.create_schedule(payload)
+    match_index.invalidate_match(match_id)
     return create_success_response(
         data=MatchScheduleResponse.model_validate(schedule).model_dump(mode="json"),
         message="Planification créée avec succès"
@@ -2751,6 +2658,7 @@ async def update_match_schedule(
     """Met à jour la planification d'un match (court, horaire, durée)"""
     service = MatchScheduleService(db)
     schedule = service.update_schedule(match_id, payload)
+    match_index.invalidate_match(match_id)
     return create_success_response(
         data=MatchScheduleResponse.model_validate(schedule).model_dump(mode="json"),
         message="Planification mise à jour avec succès"
@@ -2773,6 +2681,7 @@ async def delete_match_schedule(match_id: int, db: Session = Depends(get_db)):
         raise NotFoundError(f"MatchSchedule for match_id {match_id} not found")
     db.delete(schedule)
     db.commit()
+    match_index.invalidate_match(match_id)
     return create_success_response(
         data={"match_id": match_id},
         message="Planification du match supprimée avec succès"
@@ -2866,283 +2775,25 @@ async def reset_tournament_matches(
 
 
 @app.post("/tournaments/{tournament_id}/propagate-results", tags=["Tournaments"], dependencies=[Depends(require_admin_or_staff)])
-async def propagate_tournament_results(
+def propagate_tournament_results(
     tournament_id: int,
     db: Session = Depends(get_db)
 ):
     """
     Propager automatiquement les résultats des matchs terminés vers les matchs suivants.
-    Remplace les codes sources (WQ1, P1-1, etc.) par les vrais team_sport_id des gagnants.
+    NOTE: masquée par la route de app/routers/tournament_structure.py (incluse avant) ;
+    les deux passent par le moteur de propagation.
     """
-    from app.models.tournament import Tournament
-    from app.models.tournamentphase import TournamentPhase
-    from app.models.pool import Pool
-    from app.models.match import Match
-    from app.models.teampool import TeamPool
-    
-    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
-    if not tournament:
-        raise NotFoundError(f"Tournament {tournament_id} not found")
-    
-    # Récupérer la phase
-    phase = db.query(TournamentPhase).filter(
-        TournamentPhase.tournament_id == tournament_id
-    ).first()
-    
-    if not phase:
+    result = propagation_engine.propagate(db, tournament_id)
+    if result is None:
         return create_success_response({
             "tournament_id": tournament_id,
             "propagated_matches": 0
         }, message="No phase found")
-    
-    # Récupérer tous les matchs
-    all_matches = db.query(Match).filter(Match.phase_id == phase.id).all()
-    
-    # Créer un mapping des poules
-    pools = db.query(Pool).filter(Pool.phase_id == phase.id).all()
-    
-    propagated_count = 0
-    
-    # Fonction pour résoudre un code source en team_sport_id
-    def resolve_source_code(source_code: str) -> Optional[int]:
-        if not source_code:
-            return None
-        
-        # Codes de type "WQ1" = Winner of Qualification 1
-        if source_code.startswith("WQ") and not source_code.startswith("WQF"):
-            try:
-                # Chercher par label (ex: "WQ1") OU par match_order
-                match_label = source_code  # "WQ1"
-                match_num = int(source_code[2:]) if source_code[2:].isdigit() else None
-                qual_match = next((m for m in all_matches 
-                                  if m.match_type == "qualification" 
-                                  and (m.label == match_label or m.match_order == match_num)
-                                  and m.status == "completed"), None)
-                if qual_match and qual_match.score_a is not None and qual_match.score_b is not None:
-                    return qual_match.team_sport_a_id if qual_match.score_a > qual_match.score_b else qual_match.team_sport_b_id
-            except (ValueError, IndexError):
-                pass
-        
-        # Codes de type "LQ1" = Loser of Qualification 1
-        elif source_code.startswith("LQ") and not source_code.startswith("LQF"):
-            try:
-                # Construire le label du match source (WQ1 pour LQ1)
-                match_label = "WQ" + source_code[2:]
-                match_num = int(source_code[2:]) if source_code[2:].isdigit() else None
-                qual_match = next((m for m in all_matches 
-                                  if m.match_type == "qualification" 
-                                  and (m.label == match_label or m.match_order == match_num)
-                                  and m.status == "completed"), None)
-                if qual_match and qual_match.score_a is not None and qual_match.score_b is not None:
-                    return qual_match.team_sport_b_id if qual_match.score_a > qual_match.score_b else qual_match.team_sport_a_id
-            except (ValueError, IndexError):
-                pass
-        
-        # Codes de type "WQF1" = Winner of Quarterfinal 1
-        elif source_code.startswith("WQF"):
-            try:
-                match_num = int(source_code[3:]) if source_code[3:].isdigit() else None
-                qf_match = next((m for m in all_matches 
-                               if m.bracket_type == "quarterfinal" 
-                               and (m.match_order == match_num or (match_num and m.label and str(match_num) in m.label))
-                               and m.status == "completed"), None)
-                if qf_match and qf_match.score_a is not None and qf_match.score_b is not None:
-                    return qf_match.team_sport_a_id if qf_match.score_a > qf_match.score_b else qf_match.team_sport_b_id
-            except (ValueError, IndexError):
-                pass
-        
-        # Codes de type "WSF1" = Winner of Semifinal 1
-        elif source_code.startswith("WSF"):
-            try:
-                match_num = int(source_code[3:]) if source_code[3:].isdigit() else None
-                # Chercher par label "WSF1" ou par match_order
-                sf_match = next((m for m in all_matches 
-                               if m.bracket_type == "semifinal" 
-                               and (m.label == source_code or m.match_order == match_num)
-                               and m.status == "completed"), None)
-                if sf_match and sf_match.score_a is not None and sf_match.score_b is not None:
-                    return sf_match.team_sport_a_id if sf_match.score_a > sf_match.score_b else sf_match.team_sport_b_id
-            except (ValueError, IndexError):
-                pass
-        
-        # Codes de type "LSF1" = Loser of Semifinal 1
-        elif source_code.startswith("LSF"):
-            try:
-                match_num = int(source_code[3:]) if source_code[3:].isdigit() else None
-                # Chercher la demi-finale correspondante (WSF1 pour LSF1)
-                sf_label = "WSF" + source_code[3:]
-                sf_match = next((m for m in all_matches 
-                               if m.bracket_type == "semifinal" 
-                               and (m.label == sf_label or m.match_order == match_num)
-                               and m.status == "completed"), None)
-                if sf_match and sf_match.score_a is not None and sf_match.score_b is not None:
-                    return sf_match.team_sport_b_id if sf_match.score_a > sf_match.score_b else sf_match.team_sport_a_id
-            except (ValueError, IndexError):
-                pass
-        
-        # Codes de type "P1-1" = Poule 1, position 1
-        elif source_code.startswith("P") and "-" in source_code:
-            try:
-                parts = source_code[1:].split("-")
-                pool_num = int(parts[0])
-                position = int(parts[1])
-                
-                # Chercher la poule correspondante
-                pool_name = f"Poule {pool_num}"
-                pool = next((p for p in pools if p.name == pool_name), None)
-                
-                if pool:
-                    # Calculer le classement de la poule
-                    pool_matches = [m for m in all_matches if m.pool_id == pool.id and m.status == "completed"]
-                    team_pools = db.query(TeamPool).filter(TeamPool.pool_id == pool.id).all()
-                    
-                    # Calculer les points de chaque équipe
-                    team_points = {}
-                    for tp in team_pools:
-                        team_id = tp.team_sport_id
-                        points = 0
-                        goal_diff = 0
-                        
-                        for match in pool_matches:
-                            if match.team_sport_a_id == team_id:
-                                if match.score_a > match.score_b:
-                                    points += 3
-                                elif match.score_a == match.score_b:
-                                    points += 1
-                                goal_diff += (match.score_a - match.score_b)
-                            elif match.team_sport_b_id == team_id:
-                                if match.score_b > match.score_a:
-                                    points += 3
-                                elif match.score_a == match.score_b:
-                                    points += 1
-                                goal_diff += (match.score_b - match.score_a)
-                        
-                        team_points[team_id] = (points, goal_diff)
-                    
-                    # Trier par points puis par différence de buts
-                    sorted_teams = sorted(team_points.items(), key=lambda x: (x[1][0], x[1][1]), reverse=True)
-                    
-                    if position <= len(sorted_teams):
-                        return sorted_teams[position - 1][0]
-            except (ValueError, IndexError):
-                pass
-        
-        return None
-    
-    # Parcourir tous les matchs et propager les résultats
-    for match in all_matches:
-        updated = False
-        
-        # Résoudre team_a_source
-        if match.team_a_source and not match.team_sport_a_id:
-            resolved_team_a = resolve_source_code(match.team_a_source)
-            if resolved_team_a:
-                match.team_sport_a_id = resolved_team_a
-                updated = True
-        
-        # Résoudre team_b_source
-        if match.team_b_source and not match.team_sport_b_id:
-            resolved_team_b = resolve_source_code(match.team_b_source)
-            if resolved_team_b:
-                match.team_sport_b_id = resolved_team_b
-                updated = True
-        
-        if updated:
-            match.updated_at = datetime.utcnow()
-            propagated_count += 1
-    
-    # Calculer et persister les standings points des poules dans TournamentRanking
-    from app.models.teamsport import TeamSport as TeamSportModel
-    from app.models.tournamentranking import TournamentRanking
-    import json as _json
-
-    standing_pools = [p for p in pools if p.use_standing_points and p.standing_points]
-    for pool in standing_pools:
-        try:
-            standing_pts = _json.loads(pool.standing_points) if isinstance(pool.standing_points, str) else pool.standing_points
-        except Exception:
-            continue
-
-        # Trouver les team_sport_ids des équipes de cette poule pour ce sport
-        pool_team_ids = [tp.team_id for tp in pool.team_pools]
-        pool_team_sports = db.query(TeamSportModel).filter(
-            TeamSportModel.team_id.in_(pool_team_ids),
-            TeamSportModel.sport_id == tournament.sport_id
-        ).all()
-        pool_ts_map = {ts.id: ts for ts in pool_team_sports}
-        pool_ts_ids = list(pool_ts_map.keys())
-
-        if not pool_ts_ids:
-            continue
-
-        # Trouver les matchs terminés de cette poule via membership des équipes
-        pool_matches_standing = db.query(Match).filter(
-            Match.tournament_id == tournament_id,
-            Match.team_sport_a_id.in_(pool_ts_ids),
-            Match.team_sport_b_id.in_(pool_ts_ids),
-            Match.status == "completed"
-        ).all()
-
-        # Calculer les stats de chaque équipe dans la poule
-        pool_stats: dict = {}
-        for pm in pool_matches_standing:
-            for ts_id in [pm.team_sport_a_id, pm.team_sport_b_id]:
-                if ts_id and ts_id not in pool_stats:
-                    pool_stats[ts_id] = {"points": 0, "goals_for": 0, "goals_against": 0}
-            sa = pm.score_a or 0
-            sb = pm.score_b or 0
-            if pm.team_sport_a_id:
-                pool_stats[pm.team_sport_a_id]["goals_for"] += sa
-                pool_stats[pm.team_sport_a_id]["goals_against"] += sb
-            if pm.team_sport_b_id:
-                pool_stats[pm.team_sport_b_id]["goals_for"] += sb
-                pool_stats[pm.team_sport_b_id]["goals_against"] += sa
-            if sa > sb:
-                if pm.team_sport_a_id:
-                    pool_stats[pm.team_sport_a_id]["points"] += 3
-            elif sb > sa:
-                if pm.team_sport_b_id:
-                    pool_stats[pm.team_sport_b_id]["points"] += 3
-            else:
-                if pm.team_sport_a_id:
-                    pool_stats[pm.team_sport_a_id]["points"] += 1
-                if pm.team_sport_b_id:
-                    pool_stats[pm.team_sport_b_id]["points"] += 1
-
-        # Trier pour obtenir les positions
-        pool_ranking = sorted(
-            pool_stats.items(),
-            key=lambda x: (
-                -x[1]["points"],
-                -(x[1]["goals_for"] - x[1]["goals_against"]),
-                -x[1]["goals_for"]
-            )
-        )
-
-        # Upsert TournamentRanking pour chaque équipe de la poule
-        for pos, (ts_id, _) in enumerate(pool_ranking, start=1):
-            pts = standing_pts.get(str(pos), 0) or standing_pts.get(pos, 0)
-            existing = db.query(TournamentRanking).filter_by(
-                tournament_id=tournament_id,
-                team_sport_id=ts_id
-            ).first()
-            if existing:
-                existing.final_position = pos
-                existing.points_awarded = pts
-            else:
-                db.add(TournamentRanking(
-                    tournament_id=tournament_id,
-                    team_sport_id=ts_id,
-                    final_position=pos,
-                    points_awarded=pts
-                ))
 
-    db.commit()
-
-    return create_success_response({
-        "tournament_id": tournament_id,
-        "propagated_matches": propagated_count
-    }, message=f"Successfully propagated {propagated_count} match results")
+    return create_success_response(
+        result, message=f"Successfully propagated {result['propagated_matches']} match results"
+    )
 
 
 @app.delete("/tournaments/{tournament_id}/reset", tags=["Tournaments"], dependencies=[Depends(require_admin)])
@@ -3155,43 +2806,18 @@ async def reset_tournament_structure(
     mais garder le tournoi lui-même.
     """
     from app.models.tournament import Tournament
-    from app.models.tournamentphase import TournamentPhase
-    from app.models.pool import Pool
-    from app.models.match import Match
-    from app.models.teampool import TeamPool
     
     tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
     if not tournament:
         raise NotFoundError(f"Tournament {tournament_id} not found")
     
-    deleted_matches = 0
-    deleted_pools = 0
-    deleted_phases = 0
-    
-    # Récupérer toutes les phases du tournoi
-    phases = db.query(TournamentPhase).filter(
-        TournamentPhase.tournament_id == tournament_id
-    ).all()
-    
-    for phase in phases:
-        # Supprimer tous les matchs de cette phase
-        match_count = db.query(Match).filter(Match.phase_id == phase.id).delete()
-        deleted_matches += match_count
-        
-        # Supprimer les team_pools associées aux poules
-        pools = db.query(Pool).filter(Pool.phase_id == phase.id).all()
-        for pool in pools:
-            db.query(TeamPool).filter(TeamPool.pool_id == pool.id).delete()
-        
-        # Supprimer toutes les poules de cette phase
-        pool_count = db.query(Pool).filter(Pool.phase_id == phase.id).delete()
-        deleted_pools += pool_count
-        
-        # Supprimer la phase elle-même
-        db.delete(phase)
-        deleted_phases += 1
+    purged = purge_tournament_structure(db, tournament_id)
+    deleted_matches = purged["deleted_matches"]
+    deleted_pools = purged["deleted_pools"]
+    deleted_phases = purged["deleted_phases"]
     
     db.commit()
+    match_index.invalidate_tournament(tournament_id)
     
     return create_success_response(
         {
@@ -3206,11 +2832,16 @@ async def reset_tournament_structure(
 @app.get("/tournaments/{tournament_id}/matches", tags=["Tournaments"])
 def get_matches_by_tournament(
     tournament_id: int,
+    stream: bool = Query(False, description="Réponse produite par morceaux (exports, gros tournois)"),
     db: Session = Depends(get_db)
 ):
     """
     Récupère tous les matchs d'un tournoi donné
+    (?stream=1 : matchs lus et encodés par lots, mémoire bornée)
     """
+    if stream:
+        return StreamingResponse(iter_tournament_matches(tournament_id), media_type="application/json")
+
     matches = db.query(Match).filter(Match.tournament_id == tournament_id).all()
 
     # Créer le mapping ID -> UUID pour résoudre les destinations
@@ -3222,13 +2853,46 @@ def get_matches_by_tournament(
     }
 
 
+def iter_tournament_matches(tournament_id: int, batch_size: int = 200):
+    """
+    Même document que get_matches_by_tournament, produit par morceaux.
+    Utilise sa propre session : celle de la requête est fermée avant l'envoi du flux.
+    """
+    from sqlalchemy.orm import selectinload
+
+    db = SessionLocal()
+    try:
+        # Seul état global : le mapping ID -> UUID (deux colonnes par match)
+        id_to_uuid = dict(
+            db.query(Match.id, Match.uuid).filter(Match.tournament_id == tournament_id, Match.uuid.isnot(None)).all()
+        )
+        matches = (
+            db.query(Match)
+            .options(selectinload(Match.schedule))
+            .filter(Match.tournament_id == tournament_id)
+            .yield_per(batch_size)
+        )
+        yield from iter_json_object([
+            ("success", True),
+            ("data", iter_json_array(match_to_dict(m, id_to_uuid) for m in matches)),
+        ])
+    finally:
+        db.close()
+
+
 # ============================================================================
 # LIVE SCORE ENDPOINTS (SSE - Server-Sent Events)
 # Pour synchronisation temps réel entre marqueurs et écrans spectateurs
 # ============================================================================
 
 from fastapi.responses import StreamingResponse
-from app.services.live_score_service import live_score_manager, LiveScoreData
+from pydantic import ValidationError
+from app.auth.permissions import decode_token, Role
+from app.services.live_score_service import (
+    live_score_manager, LiveScoreData, KEEPALIVE, parse_stream_id, parse_topic, match_topic
+)
+from app.services.sse_connections import sse_connections, SSEConnectionLimitError
+from app.routers.auth import get_client_ip
 from pydantic import BaseModel
 from typing import Dict, Any
 import json
@@ -3243,8 +2907,7 @@ class LiveScoreUpdate(BaseModel):
 @app.post("/matches/{match_id}/live-score", tags=["LiveScore"], dependencies=[Depends(require_admin_or_staff)])
 async def update_live_score(
     match_id: int,
-    update: LiveScoreUpdate,
-    db: Session = Depends(get_db)
+    update: LiveScoreUpdate
 ):
     """
     Update live score for a match (called by scorer tablets).
@@ -3253,40 +2916,124 @@ async def update_live_score(
     - **match_id**: The match ID
     - **sport**: Sport type (volleyball, badminton, petanque, flechettes)
     - **data**: Sport-specific score data (teams, scores, sets, service, etc.)
+
+    Within the coalescing window of the sport, the update is published when the window ends:
+    the response then has `pending: true` and `seq: 0` (the bus assigns the seq on publication).
     """
     logger.info(f"[LIVE SCORE POST] Received update for match {match_id} ({update.sport}): scoreA={update.data.get('scoreA')}, scoreB={update.data.get('scoreB')}")
 
-    # Verify match exists
-    match = db.query(Match).filter(Match.id == match_id).first()
-    if not match:
+    # Verify match exists and get its routing tags (in-memory index, no DB session)
+    location = await match_index.get(match_id)
+    if location is None:
         raise NotFoundError(f"Match {match_id} not found")
+    tournament_id, court_id = location
 
     # Update live score in memory and broadcast to subscribers
     score_data = await live_score_manager.update_score(
         match_id=match_id,
         sport=update.sport,
-        data=update.data
+        data=update.data,
+        tournament_id=tournament_id,
+        court_id=court_id
     )
 
     return create_success_response(
-        data=score_data.to_dict(),
+        data={**score_data.to_dict(), "pending": score_data.seq == 0},
         message=f"Live score updated for match {match_id}"
     )
 
 
+@app.websocket("/matches/{match_id}/live-score/ws")
+async def live_score_websocket(
+    websocket: WebSocket,
+    match_id: int,
+):
+    """
+    Persistent ingestion channel for scorer tablets.
+
+    Authenticates once per connection (JWT admin/staff, in an `Authorization: Bearer` header or,
+    for browsers, as the subprotocols `["bearer", "<token>"]`; never in the URL, which ends up
+    in access logs), checks the match once, then accepts a stream of JSON messages:
+    `{"seq": 12, "sport": "volleyball", "data": {...}}`
+
+    On connection the server sends `{"type": "ready", "last_seq": 11}`, the last `seq` applied
+    for this scorer and match (kept across connections). Each message goes through
+    `live_score_manager.update_score` and is acknowledged with `{"type": "ack", "seq": 12, "match_seq": 57}`
+    (`"match_seq": 0, "pending": true` while the update waits for the end of its coalescing window).
+    A message whose `seq` was already applied (resent after a reconnect) is acknowledged
+    again without being applied.
+    """
+    token, subprotocol = None, None
+    authorization = websocket.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    else:
+        subprotocols = websocket.scope.get("subprotocols") or []
+        if len(subprotocols) >= 2 and subprotocols[0] == "bearer":
+            token, subprotocol = subprotocols[1], "bearer"
+
+    token_data = decode_token(token) if token else None
+    if token_data is None or token_data.role not in (Role.ADMIN, Role.STAFF):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Authentication required")
+        return
+
+    # Verify match exists (once per connection)
+    location = await match_index.get(match_id)
+    if location is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=f"Match {match_id} not found")
+        return
+    tournament_id, court_id = location
+
+    await websocket.accept(subprotocol=subprotocol)
+    logger.info(f"[LIVE SCORE WS] Scorer {token_data.username} connected for match {match_id}")
+
+    scorer = token_data.username
+    try:
+        await websocket.send_json({"type": "ready", "last_seq": live_score_manager.get_scorer_seq(match_id, scorer)})
+        while True:
+            message = await websocket.receive_json()
+            seq = message.get("seq") if isinstance(message, dict) else None
+            if not isinstance(seq, int):
+                await websocket.send_json({"type": "error", "seq": seq, "message": "Integer 'seq' is required"})
+                continue
+
+            if seq <= live_score_manager.get_scorer_seq(match_id, scorer):
+                # Already applied (resent by the client)
+                await websocket.send_json({"type": "ack", "seq": seq, "duplicate": True})
+                continue
+
+            try:
+                update = LiveScoreUpdate(sport=message.get("sport"), data=message.get("data"))
+            except ValidationError as e:
+                await websocket.send_json({"type": "error", "seq": seq, "message": str(e)})
+                continue
+
+            score_data = await live_score_manager.update_score(
+                match_id=match_id,
+                sport=update.sport,
+                data=update.data,
+                tournament_id=tournament_id,
+                court_id=court_id
+            )
+            live_score_manager.set_scorer_seq(match_id, scorer, seq)
+            await websocket.send_json({"type": "ack", "seq": seq, "match_seq": score_data.seq, "pending": score_data.seq == 0})
+    except WebSocketDisconnect:
+        logger.info(f"[LIVE SCORE WS] Scorer disconnected from match {match_id}")
+    except ValueError:
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason="Invalid JSON")
+
+
 @app.get("/matches/{match_id}/live-score", tags=["LiveScore"])
 async def get_live_score(
-    match_id: int,
-    db: Session = Depends(get_db)
+    match_id: int
 ):
     """
     Get current live score for a match (polling fallback).
 
     Returns the in-memory live score if available, or null if no live data.
     """
-    # Verify match exists
-    match = db.query(Match).filter(Match.id == match_id).first()
-    if not match:
+    # Verify match exists (in-memory index, no DB session)
+    if not await match_index.exists(match_id):
         raise NotFoundError(f"Match {match_id} not found")
 
     score_data = await live_score_manager.get_score(match_id)
@@ -3304,8 +3051,8 @@ async def debug_live_scores():
     Returns current subscriptions and active scores.
     """
     subscriptions = {
-        match_id: len(subscribers)
-        for match_id, subscribers in live_score_manager._subscriptions.items()
+        topic: len(subscribers)
+        for topic, subscribers in live_score_manager._subscriptions.items()
     }
     active_scores = {
         match_id: {
@@ -3322,7 +3069,11 @@ async def debug_live_scores():
             "subscriptions": subscriptions,
             "active_scores": active_scores,
             "total_subscribers": sum(subscriptions.values()),
-            "total_active_matches": len(active_scores)
+            "total_active_matches": len(active_scores),
+            "broadcast_stats": live_score_manager.get_stats(),
+            "sse_connections": sse_connections.get_stats(),
+            "match_index": match_index.get_stats(),
+            "result_worker": result_worker.get_stats()
         },
         message="Live score debug info"
     )
@@ -3330,78 +3081,151 @@ async def debug_live_scores():
 
 @app.get("/live-scores/stream", tags=["LiveScore"])
 async def stream_live_scores(
-    match_ids: str = Query(..., description="Comma-separated match IDs (e.g., '1,2,3,4')")
+    request: Request,
+    match_ids: Optional[str] = Query(None, description="Comma-separated match IDs (e.g., '1,2,3,4')"),
+    topics: Optional[str] = Query(None, description="Comma-separated topics (e.g., 'tournament:3,court:2' or 'live:all')"),
+    delta: bool = Query(False, description="Send only changed fields between periodic full keyframes"),
+    last_event_id: Optional[str] = Query(None, description="Resume position (same as the Last-Event-ID header)"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
 ):
     """
     SSE endpoint for real-time live score streaming.
     Connect to receive live score updates for multiple matches.
 
-    - **match_ids**: Comma-separated list of match IDs to subscribe to
+    - **match_ids**: Comma-separated list of match IDs to subscribe to (max 4)
+    - **topics**: Comma-separated topics: `tournament:{id}`, `court:{id}`, `match:{id}` or `live:all`
+    - **delta**: If true, `score_delta` events carry only the changed fields
+    - **Last-Event-ID** (header) / **last_event_id**: resume a stream, only missed events are sent
 
+    Streams are limited per client IP and overall (429/503 with Retry-After).
+    On shutdown, streams end with a randomized `retry:` so reconnections are spread out.
     Returns a Server-Sent Events stream with score updates.
-    Event format: `data: {"event": "score_update", "match_id": 1, "sport": "volleyball", "data": {...}}`
+    Each event carries an `id:` (e.g. `3f9a1c2e-42`, position in the server's stream of updates).
+    Event format: `data: {"event": "score_update", "match_id": 1, "sport": "volleyball", "seq": 5, "data": {...}}`
     """
     # Parse match IDs
     try:
-        parsed_match_ids = [int(mid.strip()) for mid in match_ids.split(",") if mid.strip()]
+        parsed_match_ids = [int(mid.strip()) for mid in (match_ids or "").split(",") if mid.strip()]
     except ValueError:
         raise BadRequestError("Invalid match_ids format. Use comma-separated integers.")
 
-    if not parsed_match_ids:
-        raise BadRequestError("At least one match_id is required")
-
     if len(parsed_match_ids) > 4:
         raise BadRequestError("Maximum 4 matches allowed per stream")
 
+    # Parse topics
+    try:
+        parsed_topics = [parse_topic(topic) for topic in (topics or "").split(",") if topic.strip()]
+    except ValueError:
+        raise BadRequestError("Invalid topics format. Use 'tournament:{id}', 'court:{id}', 'match:{id}' or 'live:all'.")
+
+    if len(parsed_topics) > 10:
+        raise BadRequestError("Maximum 10 topics allowed per stream")
+
+    if not parsed_match_ids and not parsed_topics:
+        raise BadRequestError("At least one match_id or topic is required")
+
+    subscribed_topics = list(dict.fromkeys([match_topic(mid) for mid in parsed_match_ids] + parsed_topics))
+
+    # Resume position: stream position of the last event received by the client
+    # (None: unknown, or from another process, the client gets the full state)
+    resume_position = parse_stream_id(last_event_id_header or last_event_id, live_score_manager.stream_epoch)
+
+    # Reserve a connection slot (heartbeat and eviction handled by the registry)
+    try:
+        connection = sse_connections.register(get_client_ip(request), subscribed_topics)
+    except SSEConnectionLimitError as e:
+        # While draining, spread the retries of the rejected clients over the reconnect window
+        retry_after = int(sse_connections.reconnect_delay()) if e.scope == "draining" else 30
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS if e.scope == "ip" else status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(retry_after)}
+        )
+
     async def event_generator():
         """Generate SSE events for subscribed matches"""
-        logger.info(f"[SSE STREAM] 🔌 New client connecting for matches: {parsed_match_ids}")
-        queue = await live_score_manager.subscribe(parsed_match_ids)
-        logger.info(f"[SSE STREAM] ✅ Client subscribed to matches: {parsed_match_ids}")
+        logger.info(f"[SSE STREAM] 🔌 New client connecting for topics: {subscribed_topics}")
+        subscription = await live_score_manager.subscribe(subscribed_topics)
+        connection.subscription = subscription
+        if connection.closed:
+            # Evicted before the stream started
+            subscription.close()
+        logger.info(f"[SSE STREAM] ✅ Client subscribed to topics: {subscribed_topics}")
+
+        # Stream position of the last event sent; in delta mode, last sequence number sent per
+        # stored match (a delta is only valid on top of the previous state of the match)
+        position = resume_position or 0
+        sent_seq: Dict[int, int] = {}
+
+        def next_event(score_data: LiveScoreData) -> bytes:
+            nonlocal position
+            position = score_data.stream_position
+            if not delta:
+                return score_data.event_after(None)
+            event = score_data.event_after(sent_seq.get(score_data.match_id), delta)
+            sent_seq[score_data.match_id] = score_data.seq
+            if len(sent_seq) > 2 * len(live_score_manager.get_active_matches()) + 16:
+                # Forget the matches evicted from the store
+                for match_id in [mid for mid in sent_seq if live_score_manager.get_seq(mid) == 0]:
+                    del sent_seq[match_id]
+            return event
 
         try:
             # Send initial ping to establish connection (helps with buffering)
             yield ": ping\n\n"
+            connection.touch()
             await asyncio.sleep(0.01)  # Small delay to force flush
 
-            # Send initial state for all subscribed matches
-            initial_scores = await live_score_manager.get_scores(parsed_match_ids)
-            logger.info(f"[SSE STREAM] 📊 Sending {len(initial_scores)} initial scores")
-            for match_id, score_data in initial_scores.items():
-                logger.info(f"[SSE STREAM] 📤 Sending initial score for match {match_id}: {score_data.data}")
-                yield score_data.to_sse_event()
+            # Send initial state (or only the matches updated since the resume position)
+            for score_data in live_score_manager.get_updates_since(subscribed_topics, resume_position):
+                logger.info(f"[SSE STREAM] 📤 Sending initial score for match {score_data.match_id} (seq {score_data.seq})")
+                yield next_event(score_data)
+                connection.touch()
                 await asyncio.sleep(0.01)  # Force flush after each event
 
             # Send connection confirmation
-            confirmation = json.dumps({"event": "connected", "match_ids": parsed_match_ids})
+            confirmation = json.dumps({"event": "connected", "match_ids": parsed_match_ids, "topics": parsed_topics})
             yield f"data: {confirmation}\n\n"
-            logger.info(f"[SSE STREAM] ✅ Connection confirmed for matches: {parsed_match_ids}")
+            connection.touch()
+            logger.info(f"[SSE STREAM] ✅ Connection confirmed for topics: {subscribed_topics}")
             await asyncio.sleep(0.01)
 
             # Stream updates as they arrive
             while True:
                 try:
-                    # Wait for next update with timeout (for keepalive every 5s)
-                    score_data: LiveScoreData = await asyncio.wait_for(
-                        queue.get(),
-                        timeout=5.0
-                    )
-                    event_data = score_data.to_sse_event()
+                    # Wait for next update (or a keepalive request from the shared ticker)
+                    score_data = await subscription.get()
+                    if score_data is None:
+                        # Subscription closed by the server (evicted or shutting down)
+                        break
+                    if score_data is KEEPALIVE:
+                        # Send keepalive comment to prevent connection timeout
+                        yield ": keepalive\n\n"
+                        connection.touch()
+                        connection.keepalives_sent += 1
+                        continue
+                    if score_data.stream_position <= position:
+                        # Already sent with the initial state
+                        continue
                     logger.info(f"[SSE STREAM] 📤 Yielding event for match {score_data.match_id}: scoreA={score_data.data.get('scoreA')}, scoreB={score_data.data.get('scoreB')}, cochonnet={score_data.data.get('cochonnetTeam')}")
-                    yield event_data
+                    yield next_event(score_data)
+                    connection.touch()
+                    connection.events_sent += 1
                     await asyncio.sleep(0.001)  # Tiny delay to help flush
-                except asyncio.TimeoutError:
-                    # Send keepalive comment to prevent connection timeout
-                    yield ": keepalive\n\n"
                 except asyncio.CancelledError:
-                    logger.info(f"[SSE STREAM] Stream cancelled for matches {parsed_match_ids}")
+                    logger.info(f"[SSE STREAM] Stream cancelled for topics {subscribed_topics}")
                     break
 
+            if connection.retry_ms:
+                # Server draining: tell the client when to reconnect before closing
+                yield f"retry: {connection.retry_ms}\n\n"
+
         except Exception as e:
             logger.error(f"SSE stream error: {e}")
         finally:
-            await live_score_manager.unsubscribe(queue, parsed_match_ids)
-            logger.debug(f"SSE stream closed for matches {parsed_match_ids}")
+            await live_score_manager.unsubscribe(subscription)
+            sse_connections.unregister(connection)
+            logger.debug(f"SSE stream closed for topics {subscribed_topics}")
 
     return StreamingResponse(
         event_generator(),
@@ -41,6 +41,9 @@ class Tournament(Base):
     rules = Column(Text, nullable=True)            # Règles du tournoi
     image_url = Column(String(255), nullable=True) # URL de l'image du tournoi
 
+    # Incrémenté à chaque écriture touchant la structure (matchs, sets, poules, phases, planification)
+    structure_version = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Contraintes
     __table_args__ = (
         CheckConstraint("tournament_type IN ('pools', 'final', 'mixed', 'qualifications')", name="ck_tournament_type"),
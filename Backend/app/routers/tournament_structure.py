@@ -1,31 +1,43 @@
 """
 Routes pour la gestion complète des tournois avec toutes leurs structures
 """
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Literal, Optional, Dict, Any
 from datetime import datetime
-from fastapi import APIRouter, Depends, Body, Path, HTTPException
-from sqlalchemy.orm import Session
-from app.auth.permissions import require_admin, require_admin_or_staff
+from fastapi import APIRouter, Depends, Body, Path, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, selectinload
+from app.auth.permissions import Role, TokenData, get_current_user, require_admin, require_admin_or_staff
 from pydantic import BaseModel, Field
 from datetime import datetime
-from app.db import get_db
+from app.db import SessionLocal, get_db
 from app.models.tournament import Tournament
 from app.models.tournamentphase import TournamentPhase
 from app.models.pool import Pool
 from app.models.match import Match
 from app.models.teampool import TeamPool
-from app.exceptions import create_success_response, NotFoundError
+from app.exceptions import create_success_response, NotFoundError, BadRequestError, ConflictError, ForbiddenError
 from app.models.team import Team
 from app.models.teamsport import TeamSport
 from app.utils.serializers import match_to_dict
+from app.utils.json_encoder import iter_json_array, iter_json_object
 from app.models.court import Court
 from app.models.matchschedule import MatchSchedule
 from app.models.matchset import MatchSet
-from app.models.tournamentranking import TournamentRanking
+from app.services.match_index import match_index
+from app.services.propagation_engine import propagation_engine
+from app.services.result_worker import result_worker
+from app.services.qualification_simulator import SimulationBusyError, qualification_simulator
+from app.services.structure_purge import purge_matches, purge_tournament_structure
+from app.services.structure_cache import (
+    structure_cache, get_structure_version, bump_structure_version
+)
 import json as _json
+import logging
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Schémas pour la structure complète du tournoi
 
@@ -82,6 +94,28 @@ class TournamentStructureCreate(BaseModel):
     brackets: List[TournamentBracketCreate] = []
     loser_brackets: List[TournamentBracketCreate] = []
 
+class StructureOperation(BaseModel):
+    """Opération unitaire d'un PATCH de structure (match désigné par UUID, "match-{id}" ou ID)"""
+    op: Literal["add_match", "update_match", "remove_match", "move_team", "set_destination"]
+    uuid: str
+    # add_match : section et poule/ligue (par nom) du nouveau match
+    section: Optional[Literal["qualification", "pool", "league", "bracket", "loser_bracket"]] = None
+    pool_name: Optional[str] = None
+    # add_match / update_match : champs du match (en update, seuls les champs envoyés sont appliqués)
+    match: Optional[TournamentMatchCreate] = None
+    # move_team : équipe placée dans le slot A ou B
+    slot: Optional[Literal["A", "B"]] = None
+    team_sport_id: Optional[int] = None
+    team_source: Optional[str] = None
+    # set_destination : destination du vainqueur ou du perdant (None = supprimer)
+    outcome: Optional[Literal["winner", "loser"]] = None
+    destination_uuid: Optional[str] = None
+    destination_slot: Optional[Literal["A", "B"]] = None
+
+class TournamentStructurePatch(BaseModel):
+    """Liste d'opérations appliquées dans une seule transaction"""
+    operations: List[StructureOperation] = Field(..., min_length=1)
+
 class TournamentMatchResponse(BaseModel):
     """Réponse pour un match"""
     id: int
@@ -276,6 +310,98 @@ def list_tournaments(
         }
     }
 
+# --- RÉSOLUTION DES DESTINATIONS (PASSE 2 DE LA SAUVEGARDE DE STRUCTURE) ---
+class DestinationResolver:
+    """
+    Résout les références (UUID frontend, ID, "match-{id}" ou label) des matchs source et
+    de leurs destinations vainqueur/perdant en une seule passe.
+
+    Les index sont construits une fois ; les matchs créés dans la transaction sont prioritaires
+    sur ceux relus en base. Un label n'est indexé que s'il est unique dans le tournoi.
+    """
+
+    def __init__(self, created_matches_by_uuid: Dict[str, Match], matches: List[Match]):
+        unique_matches: Dict[int, Match] = {}
+        for match in [*created_matches_by_uuid.values(), *matches]:
+            if match.id is not None:
+                unique_matches.setdefault(match.id, match)
+
+        self.by_ref: Dict[str, Match] = {}
+        labels: Dict[str, List[Match]] = {}
+        for match in unique_matches.values():
+            if match.uuid:
+                self.by_ref.setdefault(match.uuid, match)
+            self.by_ref[str(match.id)] = match
+            self.by_ref[f"match-{match.id}"] = match
+            if match.label:
+                labels.setdefault(match.label, []).append(match)
+
+        for label, candidates in labels.items():
+            if len(candidates) == 1:
+                self.by_ref.setdefault(label, candidates[0])
+
+    def lookup(self, reference: Optional[str]) -> Optional[Match]:
+        if not reference:
+            return None
+        return self.by_ref.get(str(reference))
+
+    def resolve(self, pending_destinations: List[tuple]) -> tuple:
+        """
+        Applique les destinations en attente.
+
+        Args:
+            pending_destinations: [(match_ref, winner_dest_ref, loser_dest_ref, winner_slot, loser_slot), ...]
+
+        Returns:
+            (nombre de matchs source mis à jour, erreurs structurées des références non résolues)
+        """
+        resolved = 0
+        errors: List[Dict[str, Any]] = []
+        now = datetime.utcnow()
+
+        for match_ref, winner_ref, loser_ref, winner_slot, loser_slot in pending_destinations:
+            source_match = self.lookup(match_ref)
+            if source_match is None:
+                errors.append({"code": "source_not_found", "match": match_ref, "field": None, "reference": match_ref})
+                continue
+
+            updated = False
+            for field, reference, slot in (("winner", winner_ref, winner_slot), ("loser", loser_ref, loser_slot)):
+                if not reference:
+                    continue
+                destination = self.lookup(reference)
+                if destination is None:
+                    errors.append({
+                        "code": "destination_not_found",
+                        "match": match_ref,
+                        "field": f"{field}_destination_match_uuid",
+                        "reference": reference,
+                    })
+                    continue
+                setattr(source_match, f"{field}_destination_match_id", destination.id)
+                setattr(source_match, f"{field}_destination_slot", slot)
+                updated = True
+
+            if updated:
+                source_match.updated_at = now
+                resolved += 1
+
+        return resolved, errors
+
+
+def _structure_match_summary(m: Match) -> Dict[str, Any]:
+    return {
+        "id": m.id,
+        "uuid": m.uuid,
+        "label": m.label,
+        "match_type": m.match_type,
+        "winner_destination_match_id": m.winner_destination_match_id,
+        "loser_destination_match_id": m.loser_destination_match_id,
+        "winner_destination_slot": m.winner_destination_slot,
+        "loser_destination_slot": m.loser_destination_slot
+    }
+
+
 # --- 3. STRUCTURE D'UN TOURNOI - POST : CRÉATION / MISE À JOUR ---
 @router.post("/tournaments/{tournament_id}/structure", dependencies=[Depends(require_admin)])
 def create_tournament_structure(
@@ -283,7 +409,7 @@ def create_tournament_structure(
     structure: TournamentStructureCreate = Body(...),
     db: Session = Depends(get_db)
 ):
-    print("=== POST /structure reçu ===")
+    logger.debug("POST /tournaments/%s/structure reçu", tournament_id)
     tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
     if not tournament:
         raise NotFoundError(f"Tournament {tournament_id} not found")
@@ -293,141 +419,277 @@ def create_tournament_structure(
         parts = dt_str.split('T')
         return parts[0], parts[1][:5]
 
+    def get_val(obj, key, default=None):
+        if isinstance(obj, dict): return obj.get(key, default)
+        return getattr(obj, key, default)
+
+    def set_val(obj, key, value):
+        if isinstance(obj, dict):
+            obj[key] = value
+        else:
+            setattr(obj, key, value)
+
+    # =================================================================
+    # PRÉCHARGEMENT : phases et poules existantes (une requête chacune)
+    # =================================================================
+    phases_by_key = {
+        (p.phase_type, p.phase_order): p
+        for p in db.query(TournamentPhase).filter(TournamentPhase.tournament_id == tournament_id).all()
+    }
+    pools_by_key = {}
+    if phases_by_key:
+        for pool in (
+            db.query(Pool)
+            .filter(Pool.phase_id.in_([p.id for p in phases_by_key.values()]))
+            .order_by(Pool.id)
+            .all()
+        ):
+            pools_by_key.setdefault((pool.phase_id, pool.name), pool)
+
     def get_or_create_phase(p_type, p_order):
         # Recherche par type ET ordre pour éviter les collisions (ex: pools order=2 vs leagues order=5)
-        phase = db.query(TournamentPhase).filter(
-            TournamentPhase.tournament_id == tournament_id,
-            TournamentPhase.phase_type == p_type,
-            TournamentPhase.phase_order == p_order
-        ).first()
+        phase = phases_by_key.get((p_type, p_order))
         if not phase:
             phase = TournamentPhase(tournament_id=tournament_id, phase_type=p_type, phase_order=p_order)
             db.add(phase)
             db.flush()
+            phases_by_key[(p_type, p_order)] = phase
         return phase
 
-    import uuid
-    # --- FONCTION UPSERT OPTIMISÉE ET CORRIGÉE ---
-    def upsert_match(m_data, phase_id, match_type, pool_id=None):
-        # Imports nécessaires pour la résolution (au cas où ils ne sont pas en haut du fichier)
-        from app.models.team import Team
-        from app.models.teamsport import TeamSport
-
-        def get_val(obj, key, default=None):
-            if isinstance(obj, dict): return obj.get(key, default)
-            return getattr(obj, key, default)
-
-        # =================================================================
-        # 1. RÉSOLUTION AUTOMATIQUE DES ID D'EQUIPES (CORRECTIF)
-        # =================================================================
-        
-        # --- Résolution Équipe A ---
-        source_a = get_val(m_data, 'team_a_source')
-        id_a = get_val(m_data, 'team_sport_a_id')
-        
-        # Si on a un nom (ex: "Piktura") mais pas d'ID, on cherche l'ID dans la BDD
-        if source_a and not id_a:
-            # 1. On cherche d'abord si l'équipe existe dans la table Team
-            team = db.query(Team).filter(Team.name == source_a).first()
-            
-            if team:
-                # 2. On cherche si elle est déjà inscrite dans TeamSport pour ce sport
-                ts = db.query(TeamSport).filter(
-                    TeamSport.team_id == team.id,
-                    TeamSport.sport_id == tournament.sport_id
-                ).first()
-                
-                # 3. SI ELLE N'EST PAS INSCRITE, ON L'INSCRIT AUTOMATIQUEMENT !
-                if not ts:
-                    ts = TeamSport(
-                        team_id=team.id,
-                        sport_id=tournament.sport_id,
-                        is_active=True
-                    )
-                    db.add(ts)
-                    db.flush() # Pour générer l'ID immédiatement
-                    
-                # 4. On utilise l'ID (existant ou nouveau)
-                if isinstance(m_data, dict):
-                    m_data['team_sport_a_id'] = ts.id
-                else:
-                    m_data.team_sport_a_id = ts.id
+    def upsert_pool(phase, p_data):
+        import json
+        sp_json = json.dumps({str(k): v for k, v in p_data.standing_points.items()}) if p_data.standing_points else None
+        pool = pools_by_key.get((phase.id, p_data.name))
+        if not pool:
+            # ✅ FIX: Inclure qualified_to_finals et qualified_to_loser_bracket lors de la création
+            # (pas de flush ici : les matchs sont rattachés via la relation, un seul flush plus bas)
+            pool = Pool(
+                phase_id=phase.id,
+                name=p_data.name,
+                order=p_data.display_order,
+                qualified_to_finals=p_data.qualified_to_finals,
+                qualified_to_loser_bracket=p_data.qualified_to_loser_bracket,
+                use_standing_points=p_data.use_standing_points,
+                standing_points=sp_json
+            )
+            db.add(pool)
+            pools_by_key[(phase.id, p_data.name)] = pool
+        else:
+            # ✅ FIX: Mettre à jour les valeurs si la poule existe déjà
+            pool.qualified_to_finals = p_data.qualified_to_finals
+            pool.qualified_to_loser_bracket = p_data.qualified_to_loser_bracket
+            pool.use_standing_points = p_data.use_standing_points
+            pool.standing_points = sp_json
+        return pool
 
-        # --- Résolution Équipe B ---
-        source_b = get_val(m_data, 'team_b_source')
-        id_b = get_val(m_data, 'team_sport_b_id')
+    # --- COLLECTE DES DESTINATIONS UUID À RÉSOUDRE ---
+    # Format: [(match_uuid, winner_dest_uuid, loser_dest_uuid, winner_slot, loser_slot), ...]
+    pending_destinations = []
 
-        if source_b and not id_b:
-            # 1. On cherche d'abord si l'équipe existe dans la table Team
-            team = db.query(Team).filter(Team.name == source_b).first()
-            
-            if team:
-                # 2. On cherche si elle est déjà inscrite dans TeamSport pour ce sport
-                ts = db.query(TeamSport).filter(
-                    TeamSport.team_id == team.id,
+    # Dictionnaire pour tracker les matchs créés pendant cette transaction (UUID -> Match object)
+    created_matches_by_uuid = {}
+
+    def collect_destinations(m_data):
+        """Collecte les UUIDs de destination pour résolution ultérieure"""
+        m_uuid = get_val(m_data, 'uuid')
+        m_id = get_val(m_data, 'id')
+        m_label = get_val(m_data, 'label')
+        winner_dest_uuid = get_val(m_data, 'winner_destination_match_uuid')
+        loser_dest_uuid = get_val(m_data, 'loser_destination_match_uuid')
+        winner_slot = get_val(m_data, 'winner_destination_slot')
+        loser_slot = get_val(m_data, 'loser_destination_slot')
+
+        # Utiliser l'UUID ou l'ID comme identifiant
+        match_identifier = m_uuid or (str(m_id) if m_id else None) or m_label
+
+        if match_identifier and (winner_dest_uuid or loser_dest_uuid):
+            pending_destinations.append((match_identifier, winner_dest_uuid, loser_dest_uuid, winner_slot, loser_slot))
+        elif winner_dest_uuid or loser_dest_uuid:
+            logger.warning(
+                "[COLLECT] Match sans identifiant mais avec destinations: winnerDest=%s, loserDest=%s",
+                winner_dest_uuid, loser_dest_uuid,
+            )
+
+    # =================================================================
+    # PASSE 1a : Collecte des matchs du payload (aucune requête par match)
+    # Format: [(m_data, phase, match_type, pool), ...]
+    # =================================================================
+    match_entries = []
+
+    if structure.qualification_matches:
+        p = get_or_create_phase("qualifications", 1)
+        for m in structure.qualification_matches:
+            match_entries.append((m, p, "qualification", None))
+
+    if structure.pools:
+        p = get_or_create_phase("pools", 2)
+        for p_data in structure.pools:
+            pool = upsert_pool(p, p_data)
+            for m in p_data.matches or []:
+                match_entries.append((m, p, "pool", pool))
+
+    if structure.leagues:
+        # Utilise phase_type='pools' pour compatibilité avec la contrainte CHECK existante
+        # Les ligues sont distinguées des poules par phase_order=5
+        p_league = get_or_create_phase("pools", 5)
+        for l_data in structure.leagues:
+            pool = upsert_pool(p_league, l_data)
+            for m in l_data.matches or []:
+                match_entries.append((m, p_league, "pool", pool))
+
+    if structure.brackets:
+        phase_final = get_or_create_phase("final", 3)
+        for bracket_group in structure.brackets:
+            for m_data in bracket_group.matches:
+                match_entries.append((m_data, phase_final, "bracket", None))
+
+    if structure.loser_brackets:
+        # Utiliser "elimination" comme phase_type car c'est une valeur autorisée par la contrainte CHECK
+        # Les loser brackets sont différenciés par bracket_type="loser" sur les matchs
+        phase_loser = get_or_create_phase("elimination", 4)
+        for loser_bracket_group in structure.loser_brackets:
+            for m_data in loser_bracket_group.matches:
+                # Garder le bracket_type envoyé par le frontend (ex: loser_round_1) ou forcer "loser"
+                original_bracket_type = m_data.bracket_type if m_data.bracket_type else "loser"
+                m_dict = {**m_data.dict(), "bracket_type": original_bracket_type}
+                # Utiliser match_type "bracket" avec bracket_type contenant "loser" pour identifier les loser brackets
+                match_entries.append((m_dict, phase_loser, "bracket", None))
+
+    for m_data, _, _, _ in match_entries:
+        collect_destinations(m_data)
+
+    # =================================================================
+    # PASSE 1b : Préchargement de tout ce que les matchs référencent
+    # =================================================================
+    from app.models.team import Team
+    from app.models.teamsport import TeamSport
+
+    # Matchs existants du tournoi (sert aussi à détecter les orphelins)
+    existing_matches = (
+        db.query(Match)
+        .join(TournamentPhase)
+        .filter(TournamentPhase.tournament_id == tournament_id)
+        .order_by(Match.id)
+        .all()
+    )
+    existing_match_ids = {m.id for m in existing_matches}
+    matches_by_id = {m.id: m for m in existing_matches}
+
+    # Matchs référencés par ID SQL hors de ce tournoi (priorité absolue de l'ID, comme avant)
+    payload_ids = {get_val(m_data, 'id') for m_data, _, _, _ in match_entries}
+    foreign_ids = {m_id for m_id in payload_ids if m_id and isinstance(m_id, int)} - existing_match_ids
+    if foreign_ids:
+        for m in db.query(Match).filter(Match.id.in_(foreign_ids)).all():
+            matches_by_id[m.id] = m
+
+    matches_by_uuid = {}
+    matches_by_label = {}  # (phase_id, match_type, label) -> [Match, ...]
+    for m in existing_matches:
+        if m.uuid:
+            matches_by_uuid.setdefault(m.uuid, m)
+        if m.label and m.tournament_id == tournament_id:
+            matches_by_label.setdefault((m.phase_id, m.match_type, m.label), []).append(m)
+
+    # Équipes nommées sans ID (ex: "Piktura") et leurs inscriptions au sport du tournoi
+    team_names = set()
+    for m_data, _, _, _ in match_entries:
+        for side in ('a', 'b'):
+            if get_val(m_data, f'team_{side}_source') and not get_val(m_data, f'team_sport_{side}_id'):
+                team_names.add(get_val(m_data, f'team_{side}_source'))
+
+    teams_by_name = {}
+    team_sports_by_team = {}
+    if team_names:
+        teams_by_name = {t.name: t for t in db.query(Team).filter(Team.name.in_(team_names)).all()}
+        if teams_by_name:
+            for ts in (
+                db.query(TeamSport)
+                .filter(
+                    TeamSport.team_id.in_([t.id for t in teams_by_name.values()]),
                     TeamSport.sport_id == tournament.sport_id
-                ).first()
-                
-                # 3. SI ELLE N'EST PAS INSCRITE, ON L'INSCRIT AUTOMATIQUEMENT !
-                if not ts:
-                    ts = TeamSport(
-                        team_id=team.id,
-                        sport_id=tournament.sport_id,
-                        is_active=True
-                    )
-                    db.add(ts)
-                    db.flush() # Pour générer l'ID immédiatement
-                    
-                # 4. On utilise l'ID (existant ou nouveau)
-                if isinstance(m_data, dict):
-                    m_data['team_sport_b_id'] = ts.id
-                else:
-                    m_data.team_sport_b_id = ts.id
+                )
+                .order_by(TeamSport.id)
+                .all()
+            ):
+                team_sports_by_team.setdefault(ts.team_id, ts)
+
+    # Terrains référencés par nom
+    court_names = {get_val(m_data, 'court') for m_data, _, _, _ in match_entries} - {None, ""}
+    courts_by_name = {}
+    if court_names:
+        for court_obj in db.query(Court).filter(Court.name.in_(court_names)).order_by(Court.id).all():
+            courts_by_name.setdefault(court_obj.name, court_obj.id)
+
+    # Planifications des matchs existants
+    schedules_by_match_id = {}
+    if matches_by_id:
+        schedules_by_match_id = {
+            ms.match_id: ms
+            for ms in db.query(MatchSchedule).filter(MatchSchedule.match_id.in_(matches_by_id.keys())).all()
+        }
 
-        # =================================================================
-        # 2. LOGIQUE STANDARD DE SAUVEGARDE (EXISTANTE)
-        # =================================================================
+    # =================================================================
+    # 1. RÉSOLUTION AUTOMATIQUE DES ID D'EQUIPES (CORRECTIF)
+    # =================================================================
+    new_team_sports = []
+    for team in teams_by_name.values():
+        # SI ELLE N'EST PAS INSCRITE, ON L'INSCRIT AUTOMATIQUEMENT !
+        if team.id not in team_sports_by_team:
+            ts = TeamSport(team_id=team.id, sport_id=tournament.sport_id, is_active=True)
+            db.add(ts)
+            team_sports_by_team[team.id] = ts
+            new_team_sports.append(ts)
+    if new_team_sports:
+        db.flush()  # Pour générer les ID des inscriptions créées (un seul INSERT groupé)
+
+    for m_data, _, _, _ in match_entries:
+        for side in ('a', 'b'):
+            source = get_val(m_data, f'team_{side}_source')
+            if source and not get_val(m_data, f'team_sport_{side}_id'):
+                team = teams_by_name.get(source)
+                if team:
+                    set_val(m_data, f'team_sport_{side}_id', team_sports_by_team[team.id].id)
+
+    import uuid
+    # =================================================================
+    # 2. UPSERT EN MÉMOIRE (un seul flush groupé pour tous les matchs)
+    # =================================================================
+    def upsert_match(m_data, phase, match_type, pool=None):
+        phase_id = phase.id
+        pool_id = pool.id if pool is not None else None
 
         m_id = get_val(m_data, 'id')       # ID SQL (ex: 42)
         m_uuid = get_val(m_data, 'uuid')   # UUID Frontend (ex: "a1b2...")
         m_label = get_val(m_data, 'label') # Label sémantique (ex: "WQ1", "Finale")
 
-        # LOG POUR DEBUG
-        winner_dest = get_val(m_data, 'winner_destination_match_id')
-        loser_dest = get_val(m_data, 'loser_destination_match_id')
-        print(f"[UPSERT] Match {m_label or m_id} - winner_dest={winner_dest}, loser_dest={loser_dest}")
+        logger.debug(
+            "[UPSERT] Match %s - winner_dest=%s, loser_dest=%s", m_label or m_id,
+            get_val(m_data, 'winner_destination_match_id'), get_val(m_data, 'loser_destination_match_id'),
+        )
 
         match = None
 
         # A. Priorité absolue : ID SQL (s'il est présent et valide)
         if m_id and isinstance(m_id, int):
-            match = db.query(Match).filter(Match.id == m_id).first()
+            match = matches_by_id.get(m_id)
 
         # B. Si pas trouvé par ID, chercher par UUID (identifiant unique frontend)
         if not match and m_uuid:
-            match = (
-                db.query(Match)
-                .join(TournamentPhase)
-                .filter(
-                    Match.uuid == m_uuid,
-                    TournamentPhase.tournament_id == tournament_id
-                )
-                .first()
-            )
+            match = matches_by_uuid.get(m_uuid)
 
         # C. Dernier recours : Recherche sémantique
         if not match and m_label:
-            query = db.query(Match).filter(
-                Match.phase_id == phase_id,
-                Match.tournament_id == tournament_id,
-                Match.match_type == match_type,
-                Match.label == m_label
-            )  
-            
-            if pool_id:
-                query = query.filter(Match.pool_id == pool_id)
-            
-            match = query.first() 
+            def in_pool(candidate):
+                if pool is None:
+                    return True
+                if candidate.id is None:  # créé plus haut dans cette requête
+                    return candidate.pool is pool
+                return pool_id is not None and candidate.pool_id == pool_id
+
+            match = next(
+                (c for c in matches_by_label.get((phase_id, match_type, m_label), []) if in_pool(c)),
+                None
+            )
 
         # Gestion date / heure
         sched_dt = get_val(m_data, 'scheduled_datetime')
@@ -459,6 +721,8 @@ def create_tournament_structure(
             match.updated_at = datetime.utcnow()
             if pool_id is not None:
                 match.pool_id = pool_id
+            elif pool is not None:
+                match.pool = pool  # poule créée dans cette requête
 
             # Mise à jour des destinations et points
             if isinstance(m_data, dict):
@@ -520,16 +784,17 @@ def create_tournament_structure(
                 updated_at=datetime.utcnow(),
                 created_by_user_id=1
             )
+            if pool is not None and pool_id is None:
+                match.pool = pool  # poule créée dans cette requête
             db.add(match)
-            db.flush()  # Pour avoir match.id
+            # Les matchs créés sont visibles des entrées suivantes du payload (même UUID ou label)
+            matches_by_uuid.setdefault(final_uuid, match)
+            if match.label:
+                matches_by_label.setdefault((phase_id, match_type, match.label), []).append(match)
 
         # --- Création ou update du MatchSchedule associé ---
         court_name = get_val(m_data, 'court')
-        court_id = None
-        if court_name:
-            court_obj = db.query(Court).filter(Court.name == court_name).first()
-            if court_obj:
-                court_id = court_obj.id
+        court_id = courts_by_name.get(court_name) if court_name else None
 
         scheduled_datetime = get_val(m_data, 'scheduled_datetime')
         if scheduled_datetime:
@@ -543,7 +808,10 @@ def create_tournament_structure(
 
         estimated_duration = get_val(m_data, 'duration', 90)
 
-        ms = db.query(MatchSchedule).filter(MatchSchedule.match_id == match.id).first()
+        if match.id is not None:
+            ms = schedules_by_match_id.get(match.id)
+        else:
+            ms = match.schedule[0] if match.schedule else None  # match créé plus haut (même UUID ou label)
         if ms:
             ms.court_id = court_id
             ms.scheduled_datetime = scheduled_dt
@@ -551,275 +819,70 @@ def create_tournament_structure(
             ms.tournament_id = tournament_id
         else:
             ms = MatchSchedule(
-                match_id=match.id,
                 court_id=court_id,
                 scheduled_datetime=scheduled_dt,
                 estimated_duration_minutes=estimated_duration,
                 tournament_id=tournament_id
             )
+            if match.id is not None:
+                ms.match_id = match.id
+                schedules_by_match_id[match.id] = ms
+            else:
+                ms.match = match  # l'ID du match est connu au flush
             db.add(ms)
 
         return match
 
-    # --- COLLECTE DES DESTINATIONS UUID À RÉSOUDRE ---
-    # Format: [(match_uuid, winner_dest_uuid, loser_dest_uuid, winner_slot, loser_slot), ...]
-    pending_destinations = []
-
-    # Dictionnaire pour tracker les matchs créés pendant cette transaction (UUID -> Match object)
-    created_matches_by_uuid = {}
-
-    def collect_destinations(m_data):
-        """Collecte les UUIDs de destination pour résolution ultérieure"""
-        def get_val(obj, key, default=None):
-            if isinstance(obj, dict): return obj.get(key, default)
-            return getattr(obj, key, default)
+    upserted_matches = [
+        upsert_match(m_data, phase, match_type, pool)
+        for m_data, phase, match_type, pool in match_entries
+    ]
 
-        m_uuid = get_val(m_data, 'uuid')
-        m_id = get_val(m_data, 'id')
-        m_label = get_val(m_data, 'label')
-        winner_dest_uuid = get_val(m_data, 'winner_destination_match_uuid')
-        loser_dest_uuid = get_val(m_data, 'loser_destination_match_uuid')
-        winner_slot = get_val(m_data, 'winner_destination_slot')
-        loser_slot = get_val(m_data, 'loser_destination_slot')
-
-        # Debug: afficher toutes les valeurs reçues
-        print(f"[COLLECT-DEBUG] Match reçu: uuid={m_uuid}, id={m_id}, label={m_label}")
-        print(f"[COLLECT-DEBUG]   -> winnerDestUUID={winner_dest_uuid}, loserDestUUID={loser_dest_uuid}")
-        print(f"[COLLECT-DEBUG]   -> winnerSlot={winner_slot}, loserSlot={loser_slot}")
-
-        # Utiliser l'UUID ou l'ID comme identifiant
-        match_identifier = m_uuid or (str(m_id) if m_id else None) or m_label
-
-        if match_identifier and (winner_dest_uuid or loser_dest_uuid):
-            pending_destinations.append((match_identifier, winner_dest_uuid, loser_dest_uuid, winner_slot, loser_slot))
-            print(f"[COLLECT] ✅ Match {match_identifier} -> winnerDest={winner_dest_uuid} (slot {winner_slot}), loserDest={loser_dest_uuid} (slot {loser_slot})")
-        elif winner_dest_uuid or loser_dest_uuid:
-            print(f"[COLLECT] ⚠️ Match sans identifiant mais avec destinations: winnerDest={winner_dest_uuid}, loserDest={loser_dest_uuid}")
+    # Un seul flush : INSERT groupés des poules, matchs et planifications, UPDATE groupés des existants
+    db.flush()
 
-    # Récupérer tous les IDs de matchs existants pour ce tournoi (avant upsert)
-    existing_match_ids = {
-        m.id for m in (
-            db.query(Match)
-            .join(TournamentPhase)
-            .filter(TournamentPhase.tournament_id == tournament_id)
-            .all()
-        )
-    }
     processed_match_ids = set()
-
-    # --- TRAITEMENT DES SECTIONS (PASSE 1 : Création des matchs) ---
-    if structure.qualification_matches:
-        p = get_or_create_phase("qualifications", 1)
-        for m in structure.qualification_matches:
-            collect_destinations(m)
-            match_obj = upsert_match(m, p.id, "qualification")
-            if match_obj and match_obj.uuid:
-                created_matches_by_uuid[match_obj.uuid] = match_obj
-            if match_obj and match_obj.id:
-                processed_match_ids.add(match_obj.id)
-
-    if structure.pools:
-        p = get_or_create_phase("pools", 2)
-        for p_data in structure.pools:
-            pool = db.query(Pool).filter(Pool.phase_id == p.id, Pool.name == p_data.name).first()
-            import json
-            sp_json = json.dumps({str(k): v for k, v in p_data.standing_points.items()}) if p_data.standing_points else None
-            if not pool:
-                # ✅ FIX: Inclure qualified_to_finals et qualified_to_loser_bracket lors de la création
-                pool = Pool(
-                    phase_id=p.id,
-                    name=p_data.name,
-                    order=p_data.display_order,
-                    qualified_to_finals=p_data.qualified_to_finals,
-                    qualified_to_loser_bracket=p_data.qualified_to_loser_bracket,
-                    use_standing_points=p_data.use_standing_points,
-                    standing_points=sp_json
-                )
-                db.add(pool)
-                db.flush()
-            else:
-                # ✅ FIX: Mettre à jour les valeurs si la poule existe déjà
-                pool.qualified_to_finals = p_data.qualified_to_finals
-                pool.qualified_to_loser_bracket = p_data.qualified_to_loser_bracket
-                pool.use_standing_points = p_data.use_standing_points
-                pool.standing_points = sp_json
-            if hasattr(p_data, 'matches') and p_data.matches:
-                for m in p_data.matches:
-                    collect_destinations(m)
-                    match_obj = upsert_match(m, p.id, "pool", pool.id)
-                    if match_obj and match_obj.uuid:
-                        created_matches_by_uuid[match_obj.uuid] = match_obj
-                    if match_obj and match_obj.id:
-                        processed_match_ids.add(match_obj.id)
-
-    if structure.leagues:
-        # Utilise phase_type='pools' pour compatibilité avec la contrainte CHECK existante
-        # Les ligues sont distinguées des poules par phase_order=5
-        p_league = get_or_create_phase("pools", 5)
-        for l_data in structure.leagues:
-            pool = db.query(Pool).filter(Pool.phase_id == p_league.id, Pool.name == l_data.name).first()
-            import json
-            sp_json = json.dumps({str(k): v for k, v in l_data.standing_points.items()}) if l_data.standing_points else None
-            if not pool:
-                pool = Pool(
-                    phase_id=p_league.id,
-                    name=l_data.name,
-                    order=l_data.display_order,
-                    qualified_to_finals=l_data.qualified_to_finals,
-                    qualified_to_loser_bracket=l_data.qualified_to_loser_bracket,
-                    use_standing_points=l_data.use_standing_points,
-                    standing_points=sp_json
-                )
-                db.add(pool)
-                db.flush()
-            else:
-                pool.qualified_to_finals = l_data.qualified_to_finals
-                pool.qualified_to_loser_bracket = l_data.qualified_to_loser_bracket
-                pool.use_standing_points = l_data.use_standing_points
-                pool.standing_points = sp_json
-            if hasattr(l_data, 'matches') and l_data.matches:
-                for m in l_data.matches:
-                    collect_destinations(m)
-                    match_obj = upsert_match(m, p_league.id, "pool", pool.id)
-                    if match_obj and match_obj.uuid:
-                        created_matches_by_uuid[match_obj.uuid] = match_obj
-                    if match_obj and match_obj.id:
-                        processed_match_ids.add(match_obj.id)
-
-    if structure.brackets:
-        phase_final = get_or_create_phase("final", 3)
-        for bracket_group in structure.brackets:
-            for m_data in bracket_group.matches:
-                collect_destinations(m_data)
-                match_obj = upsert_match(m_data, phase_final.id, "bracket")
-                if match_obj and match_obj.uuid:
-                    created_matches_by_uuid[match_obj.uuid] = match_obj
-                if match_obj and match_obj.id:
-                    processed_match_ids.add(match_obj.id)
-
-    if structure.loser_brackets:
-        # Utiliser "elimination" comme phase_type car c'est une valeur autorisée par la contrainte CHECK
-        # Les loser brackets sont différenciés par bracket_type="loser" sur les matchs
-        phase_loser = get_or_create_phase("elimination", 4)
-        for loser_bracket_group in structure.loser_brackets:
-            for m_data in loser_bracket_group.matches:
-                # Garder le bracket_type envoyé par le frontend (ex: loser_round_1) ou forcer "loser"
-                original_bracket_type = m_data.bracket_type if m_data.bracket_type else "loser"
-                m_dict = {**m_data.dict(), "bracket_type": original_bracket_type}
-                collect_destinations(m_dict)
-                # Utiliser match_type "bracket" avec bracket_type contenant "loser" pour identifier les loser brackets
-                match_obj = upsert_match(m_dict, phase_loser.id, "bracket")
-                if match_obj and match_obj.uuid:
-                    created_matches_by_uuid[match_obj.uuid] = match_obj
-                if match_obj and match_obj.id:
-                    processed_match_ids.add(match_obj.id)
-
-    # Flush pour s'assurer que tous les matchs ont des IDs
-    db.flush()
+    for match_obj in upserted_matches:
+        if match_obj.uuid:
+            created_matches_by_uuid[match_obj.uuid] = match_obj
+        if match_obj.id:
+            processed_match_ids.add(match_obj.id)
 
     # Supprimer les matchs présents en BDD mais absents du payload (supprimés côté frontend)
     orphaned_ids = existing_match_ids - processed_match_ids
     if orphaned_ids:
-        print(f"[DELETE] Suppression de {len(orphaned_ids)} match(s) orphelin(s): {orphaned_ids}")
+        logger.info("[DELETE] Tournoi %s : suppression de %d match(s) orphelin(s) : %s", tournament_id, len(orphaned_ids), sorted(orphaned_ids))
+        purge_matches(db, orphaned_ids)
         for match_id in orphaned_ids:
-            db.query(MatchSchedule).filter(MatchSchedule.match_id == match_id).delete()
-            db.query(MatchSet).filter(MatchSet.match_id == match_id).delete()
-            db.query(Match).filter(Match.id == match_id).delete()
-        db.flush()
+            db.expunge(matches_by_id[match_id])
+        bump_structure_version(db, tournament_id)
 
     # --- PASSE 2 : Résolution des UUIDs de destination en IDs ---
+    destinations_resolved, unresolved_destinations = 0, []
     if pending_destinations:
-        print(f"[RESOLVE] Résolution de {len(pending_destinations)} destinations UUID...")
-        print(f"[RESOLVE] Matchs créés dans cette transaction: {len(created_matches_by_uuid)}")
+        logger.debug(
+            "[RESOLVE] %d destination(s) à résoudre, %d match(s) créé(s) dans cette transaction",
+            len(pending_destinations), len(created_matches_by_uuid),
+        )
 
-        # Récupérer tous les matchs du tournoi pour construire le mapping UUID -> ID
+        # Tous les matchs du tournoi (les matchs de la transaction sont prioritaires dans les index)
         all_matches = (
             db.query(Match)
             .join(TournamentPhase)
             .filter(TournamentPhase.tournament_id == tournament_id)
             .all()
         )
-
-        # Créer les mappings UUID -> ID et ID (string) -> ID
-        uuid_to_id = {}
-
-        # D'abord, ajouter les matchs créés dans cette transaction (ils ont la priorité)
-        for uuid_key, match_obj in created_matches_by_uuid.items():
-            if match_obj.id:
-                uuid_to_id[uuid_key] = match_obj.id
-                uuid_to_id[str(match_obj.id)] = match_obj.id
-                uuid_to_id[f"match-{match_obj.id}"] = match_obj.id
-                print(f"[RESOLVE] Mapping créé: {uuid_key} -> {match_obj.id} (transaction)")
-
-        # Ensuite, ajouter les matchs de la BDD (si pas déjà présents)
-        for m in all_matches:
-            if m.uuid and m.uuid not in uuid_to_id:
-                uuid_to_id[m.uuid] = m.id
-            if str(m.id) not in uuid_to_id:
-                uuid_to_id[str(m.id)] = m.id
-            if f"match-{m.id}" not in uuid_to_id:
-                uuid_to_id[f"match-{m.id}"] = m.id
-
-        print(f"[RESOLVE] Mapping total créé avec {len(uuid_to_id)} entrées")
-
-        # Combiner les matchs de la transaction et de la BDD pour la recherche
-        all_matches_combined = list(all_matches)
-        for match_obj in created_matches_by_uuid.values():
-            if match_obj not in all_matches_combined:
-                all_matches_combined.append(match_obj)
-
-        # Résoudre chaque destination
-        for (match_uuid, winner_dest_uuid, loser_dest_uuid, winner_slot, loser_slot) in pending_destinations:
-            # Trouver le match source par UUID d'abord dans les matchs créés, puis dans la BDD
-            source_match = created_matches_by_uuid.get(match_uuid)
-
-            if not source_match:
-                source_match = next((m for m in all_matches_combined if m.uuid == match_uuid), None)
-
-            # Si pas trouvé par UUID, essayer par ID (format "match-{id}" ou "{id}")
-            if not source_match:
-                # Extraire l'ID si le format est "match-{id}"
-                if match_uuid and match_uuid.startswith("match-"):
-                    try:
-                        match_id = int(match_uuid.replace("match-", ""))
-                        source_match = next((m for m in all_matches_combined if m.id == match_id), None)
-                    except ValueError:
-                        pass
-                # Sinon essayer directement comme ID
-                elif match_uuid and match_uuid.isdigit():
-                    source_match = next((m for m in all_matches_combined if m.id == int(match_uuid)), None)
-
-            if not source_match:
-                print(f"[RESOLVE] ⚠️ Match source non trouvé: {match_uuid}")
-                continue
-
-            updated = False
-
-            # Résoudre la destination du vainqueur
-            if winner_dest_uuid:
-                if winner_dest_uuid in uuid_to_id:
-                    source_match.winner_destination_match_id = uuid_to_id[winner_dest_uuid]
-                    source_match.winner_destination_slot = winner_slot
-                    updated = True
-                    print(f"[RESOLVE] ✅ Match {source_match.label or source_match.id}: winner -> ID {uuid_to_id[winner_dest_uuid]} (slot {winner_slot})")
-                else:
-                    print(f"[RESOLVE] ⚠️ Destination vainqueur non trouvée: {winner_dest_uuid}")
-                    print(f"[RESOLVE]    Clés disponibles: {list(uuid_to_id.keys())[:10]}...")
-
-            # Résoudre la destination du perdant
-            if loser_dest_uuid:
-                if loser_dest_uuid in uuid_to_id:
-                    source_match.loser_destination_match_id = uuid_to_id[loser_dest_uuid]
-                    source_match.loser_destination_slot = loser_slot
-                    updated = True
-                    print(f"[RESOLVE] ✅ Match {source_match.label or source_match.id}: loser -> ID {uuid_to_id[loser_dest_uuid]} (slot {loser_slot})")
-                else:
-                    print(f"[RESOLVE] ⚠️ Destination perdant non trouvée: {loser_dest_uuid}")
-
-            if updated:
-                source_match.updated_at = datetime.utcnow()
+        resolver = DestinationResolver(created_matches_by_uuid, all_matches)
+        destinations_resolved, unresolved_destinations = resolver.resolve(pending_destinations)
+        if unresolved_destinations:
+            # Renvoyées au client dans "unresolved_destinations"
+            logger.warning(
+                "Tournoi %s : %d destination(s) non résolue(s) : %s",
+                tournament_id, len(unresolved_destinations), unresolved_destinations,
+            )
 
     db.commit()
+    match_index.invalidate_tournament(tournament_id)
 
     # Récupérer tous les matchs pour renvoyer les correspondances UUID -> ID
     matches = (
@@ -831,28 +894,456 @@ def create_tournament_structure(
 
     return {
         "status": "ok",
-        "destinations_resolved": len(pending_destinations),
-        "matches": [
-            {
-                "id": m.id,
-                "uuid": m.uuid,
-                "label": m.label,
-                "match_type": m.match_type,
-                "winner_destination_match_id": m.winner_destination_match_id,
-                "loser_destination_match_id": m.loser_destination_match_id,
-                "winner_destination_slot": m.winner_destination_slot,
-                "loser_destination_slot": m.loser_destination_slot
-            }
-            for m in matches
-        ]
+        "destinations_resolved": destinations_resolved,
+        "unresolved_destinations": unresolved_destinations,
+        "matches": [_structure_match_summary(m) for m in matches]
+    }
+
+# --- 3b. STRUCTURE D'UN TOURNOI - PATCH : MODIFICATIONS INCRÉMENTALES ---
+# section -> (phase_type, phase_order, match_type), mêmes conventions que le POST
+STRUCTURE_SECTIONS = {
+    "qualification": ("qualifications", 1, "qualification"),
+    "pool": ("pools", 2, "pool"),
+    "league": ("pools", 5, "pool"),
+    "bracket": ("final", 3, "bracket"),
+    "loser_bracket": ("elimination", 4, "bracket"),
+}
+
+# Champs d'un match modifiables directement par update_match
+PATCHABLE_MATCH_FIELDS = (
+    "team_sport_a_id", "team_sport_b_id", "team_a_source", "team_b_source", "bracket_type",
+    "label", "match_order", "status", "winner_points", "loser_points",
+    "winner_destination_slot", "loser_destination_slot",
+)
+
+
+@router.patch("/tournaments/{tournament_id}/structure", dependencies=[Depends(require_admin)])
+def patch_tournament_structure(
+    tournament_id: int = Path(..., description="ID du tournoi"),
+    patch: TournamentStructurePatch = Body(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Modifie la structure par opérations (add/update/remove match, move team, set destination).
+
+    Les opérations sont appliquées dans l'ordre et dans une seule transaction : si l'une échoue,
+    rien n'est enregistré. Seuls les matchs référencés sont lus et écrits, le coût d'une
+    modification ne dépend pas de la taille du tournoi.
+    """
+    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    if not tournament:
+        raise NotFoundError(f"Tournament {tournament_id} not found")
+
+    def ref_to_id(ref: str) -> Optional[int]:
+        raw = ref[len("match-"):] if ref.startswith("match-") else ref
+        return int(raw) if raw.isdigit() else None
+
+    # Précharger les matchs référencés et leurs planifications (une requête chacun)
+    refs = {op.uuid for op in patch.operations} | {
+        op.destination_uuid for op in patch.operations if op.destination_uuid
+    }
+    ref_ids = {ref_to_id(ref) for ref in refs} - {None}
+    matches_by_ref: Dict[str, Match] = {}
+    for m in (
+        db.query(Match)
+        .filter(Match.tournament_id == tournament_id, or_(Match.uuid.in_(refs), Match.id.in_(ref_ids)))
+        .order_by(Match.id)
+        .all()
+    ):
+        if m.uuid:
+            matches_by_ref.setdefault(m.uuid, m)
+        matches_by_ref[str(m.id)] = m
+        matches_by_ref[f"match-{m.id}"] = m
+
+    schedules_by_match_id: Dict[int, MatchSchedule] = {}
+    loaded_ids = {m.id for m in matches_by_ref.values()}
+    if loaded_ids:
+        schedules_by_match_id = {
+            ms.match_id: ms
+            for ms in db.query(MatchSchedule).filter(MatchSchedule.match_id.in_(loaded_ids)).all()
+        }
+
+    # Précharger terrains, phases et poules (une requête chacun), comme le POST
+    court_names = {
+        op.match.court for op in patch.operations if op.match is not None and op.match.court
+    }
+    courts_by_name: Dict[str, int] = {}
+    if court_names:
+        for court_obj in db.query(Court).filter(Court.name.in_(court_names)).order_by(Court.id).all():
+            courts_by_name.setdefault(court_obj.name, court_obj.id)
+
+    phases_by_key: Dict[tuple, TournamentPhase] = {}
+    pools_by_key: Dict[tuple, Pool] = {}
+    if any(op.op == "add_match" for op in patch.operations):
+        phases_by_key = {
+            (p.phase_type, p.phase_order): p
+            for p in db.query(TournamentPhase).filter(TournamentPhase.tournament_id == tournament_id).all()
+        }
+        if phases_by_key:
+            for pool in (
+                db.query(Pool)
+                .filter(Pool.phase_id.in_([p.id for p in phases_by_key.values()]))
+                .order_by(Pool.id)
+                .all()
+            ):
+                pools_by_key.setdefault((pool.phase_id, pool.name), pool)
+
+    touched: Dict[int, Match] = {}  # id(objet) -> match modifié ou créé
+    removed: List[Match] = []
+
+    def find_match(ref: str, index: int) -> Match:
+        match = matches_by_ref.get(ref)
+        if match is None:
+            raise NotFoundError(f"Operation {index}: match {ref}")
+        return match
+
+    def court_id_for(name: Optional[str]) -> Optional[int]:
+        return courts_by_name.get(name) if name else None
+
+    def schedule_for(match: Match) -> MatchSchedule:
+        ms = schedules_by_match_id.get(match.id) if match.id is not None else None
+        if ms is None and match.id is None and match.schedule:
+            ms = match.schedule[0]
+        if ms is None:
+            ms = MatchSchedule(tournament_id=tournament_id, estimated_duration_minutes=match.duration)
+            if match.id is not None:
+                ms.match_id = match.id
+                schedules_by_match_id[match.id] = ms
+            else:
+                ms.match = match  # l'ID du match est connu au flush
+            db.add(ms)
+        return ms
+
+    def apply_schedule(match: Match, fields: Dict[str, Any]) -> None:
+        """Répercute terrain / horaire / durée sur le match et sa planification"""
+        if not {"court", "scheduled_datetime", "duration"} & fields.keys():
+            return
+        ms = schedule_for(match)
+        if "court" in fields:
+            match.court = fields["court"]
+            ms.court_id = court_id_for(fields["court"])
+        if "scheduled_datetime" in fields:
+            sched_dt = fields["scheduled_datetime"]
+            try:
+                from dateutil.parser import parse as parse_dt
+                ms.scheduled_datetime = parse_dt(sched_dt) if sched_dt else None
+            except Exception:
+                ms.scheduled_datetime = None
+            if sched_dt and "T" in sched_dt:
+                match.date, time_part = sched_dt.split("T", 1)
+                match.time = time_part[:5]
+        if "duration" in fields:
+            match.duration = fields["duration"]
+            ms.estimated_duration_minutes = fields["duration"]
+
+    def set_destination(match: Match, outcome: str, destination_ref: Optional[str], slot: Optional[str], index: int) -> None:
+        destination = find_match(destination_ref, index) if destination_ref else None
+        # Par la relation : l'ID d'une destination ajoutée plus haut dans ce PATCH est connu au flush
+        setattr(match, f"{outcome}_destination", destination)
+        setattr(match, f"{outcome}_destination_slot", slot if destination is not None else None)
+
+    def get_phase(section: str) -> TournamentPhase:
+        p_type, p_order, _ = STRUCTURE_SECTIONS[section]
+        phase = phases_by_key.get((p_type, p_order))
+        if not phase:
+            phase = TournamentPhase(tournament_id=tournament_id, phase_type=p_type, phase_order=p_order)
+            db.add(phase)
+            db.flush()
+            phases_by_key[(p_type, p_order)] = phase
+        return phase
+
+    import uuid as uuid_lib
+    for index, op in enumerate(patch.operations):
+        if op.op == "add_match":
+            if op.uuid in matches_by_ref:
+                raise ConflictError(f"Operation {index}: match {op.uuid} already exists")
+            if not op.section:
+                raise BadRequestError(f"Operation {index}: 'section' is required for add_match")
+            phase = get_phase(op.section)
+            match_type = STRUCTURE_SECTIONS[op.section][2]
+            pool_id = None
+            if op.section in ("pool", "league"):
+                pool = pools_by_key.get((phase.id, op.pool_name))
+                if not pool:
+                    raise NotFoundError(f"Operation {index}: pool {op.pool_name}")
+                pool_id = pool.id
+
+            m_data = op.match or TournamentMatchCreate()
+            fields = m_data.model_dump(exclude_unset=True)
+            match = Match(
+                uuid=op.uuid if op.uuid.strip() else str(uuid_lib.uuid4()),
+                phase_id=phase.id,
+                pool_id=pool_id,
+                tournament_id=tournament_id,
+                match_type=match_type,
+                bracket_type=m_data.bracket_type or ("loser" if op.section == "loser_bracket" else None),
+                team_sport_a_id=m_data.team_sport_a_id,
+                team_sport_b_id=m_data.team_sport_b_id,
+                team_a_source=m_data.team_a_source,
+                team_b_source=m_data.team_b_source,
+                winner_destination_match_id=m_data.winner_destination_match_id,
+                loser_destination_match_id=m_data.loser_destination_match_id,
+                winner_destination_slot=m_data.winner_destination_slot,
+                loser_destination_slot=m_data.loser_destination_slot,
+                winner_points=m_data.winner_points,
+                loser_points=m_data.loser_points,
+                label=m_data.label,
+                match_order=m_data.match_order,
+                status=m_data.status,
+                duration=m_data.duration,
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow(),
+                created_by_user_id=1
+            )
+            db.add(match)
+            matches_by_ref[match.uuid] = match
+            apply_schedule(match, {"duration": m_data.duration, **fields})
+            for outcome in ("winner", "loser"):
+                destination_ref = fields.get(f"{outcome}_destination_match_uuid")
+                if destination_ref:
+                    set_destination(match, outcome, destination_ref, fields.get(f"{outcome}_destination_slot"), index)
+            touched[id(match)] = match
+
+        elif op.op == "update_match":
+            match = find_match(op.uuid, index)
+            if op.match is None:
+                raise BadRequestError(f"Operation {index}: 'match' is required for update_match")
+            fields = op.match.model_dump(exclude_unset=True)
+            for field in PATCHABLE_MATCH_FIELDS:
+                if field in fields:
+                    setattr(match, field, fields[field])
+            if "winner_destination_match_id" in fields:
+                match.winner_destination_match_id = fields["winner_destination_match_id"]
+            if "loser_destination_match_id" in fields:
+                match.loser_destination_match_id = fields["loser_destination_match_id"]
+            apply_schedule(match, fields)
+            for outcome in ("winner", "loser"):
+                if f"{outcome}_destination_match_uuid" in fields:
+                    set_destination(
+                        match, outcome, fields[f"{outcome}_destination_match_uuid"],
+                        fields.get(f"{outcome}_destination_slot", getattr(match, f"{outcome}_destination_slot")),
+                        index
+                    )
+            touched[id(match)] = match
+
+        elif op.op == "remove_match":
+            match = find_match(op.uuid, index)
+            for key in [key for key, value in matches_by_ref.items() if value is match]:
+                del matches_by_ref[key]
+            touched.pop(id(match), None)
+            if match.id is None:
+                # Ajouté puis retiré dans le même PATCH
+                for ms in list(match.schedule):
+                    db.expunge(ms)
+                db.expunge(match)
+            else:
+                removed.append(match)
+
+        elif op.op == "move_team":
+            match = find_match(op.uuid, index)
+            if not op.slot:
+                raise BadRequestError(f"Operation {index}: 'slot' is required for move_team")
+            side = op.slot.lower()
+            if op.team_sport_id is not None and db.get(TeamSport, op.team_sport_id) is None:
+                raise NotFoundError(f"Operation {index}: team sport {op.team_sport_id}")
+            setattr(match, f"team_sport_{side}_id", op.team_sport_id)
+            if "team_source" in op.model_fields_set:
+                setattr(match, f"team_{side}_source", op.team_source)
+            touched[id(match)] = match
+
+        elif op.op == "set_destination":
+            match = find_match(op.uuid, index)
+            if not op.outcome:
+                raise BadRequestError(f"Operation {index}: 'outcome' is required for set_destination")
+            set_destination(match, op.outcome, op.destination_uuid, op.destination_slot, index)
+            touched[id(match)] = match
+
+    now = datetime.utcnow()
+    for match in touched.values():
+        match.updated_at = now
+
+    db.flush()
+
+    removed_ids = [m.id for m in removed]
+    if removed_ids:
+        logger.info("[PATCH] Tournoi %s : suppression de %d match(s) : %s", tournament_id, len(removed_ids), removed_ids)
+        purge_matches(db, removed_ids)
+        bump_structure_version(db, tournament_id)
+
+    db.commit()
+    for match_id in [*removed_ids, *(m.id for m in touched.values())]:
+        match_index.invalidate_match(match_id)
+
+    return {
+        "status": "ok",
+        "applied": len(patch.operations),
+        "removed_match_ids": removed_ids,
+        "matches": [_structure_match_summary(m) for m in touched.values()]
     }
 
 # --- 2. GET : RÉCUPÉRATION ---
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Vérifie si l'en-tête If-None-Match désigne l'ETag courant"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
 @router.get("/tournaments/{tournament_id}/structure")
 def get_tournament_structure(
+    request: Request,
     tournament_id: int = Path(..., description="ID du tournoi"),
+    stream: bool = Query(False, description="Réponse produite par morceaux (exports, gros tournois)"),
     db: Session = Depends(get_db)
 ):
+    """
+    Structure complète du tournoi (qualifications, poules, ligues, brackets).
+
+    La réponse est mise en cache par version de structure et servie avec un ETag :
+    un client qui renvoie cet ETag dans If-None-Match reçoit 304 tant que rien n'a changé.
+
+    Avec ?stream=1 et sans réponse en cache, le document est streamé phase par phase et poule
+    par poule (mémoire bornée) ; il n'est alors ni mis en cache ni servi avec un ETag.
+    """
+    version = get_structure_version(db, tournament_id)
+    if version is None:
+        raise NotFoundError(f"Tournament {tournament_id} not found")
+
+    etag = structure_cache.etag(tournament_id, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = structure_cache.get(tournament_id, version)
+    if body is None and stream:
+        return StreamingResponse(
+            iter_tournament_structure(tournament_id),
+            media_type="application/json",
+            headers={"Cache-Control": "no-cache"}
+        )
+    if body is None:
+        body = build_tournament_structure(tournament_id, db).body
+        if get_structure_version(db, tournament_id) == version:
+            structure_cache.put(tournament_id, version, body)
+        else:
+            # Écriture pendant la construction : réponse fraîche, mais sans ETag ni cache
+            headers = {"Cache-Control": "no-cache"}
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _structure_match_dict(m: Match, id_to_uuid: Dict[int, str], set_totals: Dict[int, tuple]) -> Dict[str, Any]:
+    """Sérialise un match de la structure (réponse GET /tournaments/{id}/structure)"""
+    # Résoudre les UUIDs de destination depuis les IDs
+    winner_dest_uuid = id_to_uuid.get(m.winner_destination_match_id) if m.winner_destination_match_id else None
+    loser_dest_uuid = id_to_uuid.get(m.loser_destination_match_id) if m.loser_destination_match_id else None
+
+    # Lire les infos de planification depuis MatchSchedule via la relation
+    schedule = getattr(m, 'schedule', None)
+    if isinstance(schedule, list) and schedule:
+        schedule = schedule[0]
+
+    # Points totaux depuis les sets (None si le match n'a aucun set)
+    total_points_a, total_points_b = set_totals.get(m.id, (None, None))
+
+    return {
+        "id": m.id,
+        "uuid": getattr(m, 'uuid', None),
+        "match_type": m.match_type,
+        "bracket_type": m.bracket_type,
+        # ✅ IMPORTANT: Inclure les team_sport_id pour que le frontend puisse résoudre les noms
+        "team_sport_a_id": m.team_sport_a_id,
+        "team_sport_b_id": m.team_sport_b_id,
+        "team_a_source": m.team_a_source,
+        "team_b_source": m.team_b_source,
+
+        # --- DESTINATIONS ET SLOTS ---
+        "winner_destination_match_id": m.winner_destination_match_id,
+        "loser_destination_match_id": m.loser_destination_match_id,
+        # UUIDs de destination (pour le frontend)
+        "winner_destination_match_uuid": winner_dest_uuid,
+        "loser_destination_match_uuid": loser_dest_uuid,
+        "winner_destination_slot": getattr(m, 'winner_destination_slot', None),
+        "loser_destination_slot": getattr(m, 'loser_destination_slot', None),
+        "winner_points": m.winner_points if m.winner_points is not None else 0,
+        "loser_points": m.loser_points if m.loser_points is not None else 0,
+        # ------------------------------
+
+        "label": m.label,
+        "status": m.status,
+        "score_a": m.score_a if m.score_a is not None else 0,
+        "score_b": m.score_b if m.score_b is not None else 0,
+        "total_points_a": total_points_a,
+        "total_points_b": total_points_b,
+        "court": m.court if m.court else "Terrain",
+        "date": str(m.date) if m.date else None,
+        "time": str(m.time) if m.time else None,
+        "court_id": schedule.court_id if schedule else None,
+        "duration": m.duration or 90,
+        "scheduled_datetime": schedule.scheduled_datetime.isoformat() if schedule and schedule.scheduled_datetime else None,
+        "estimated_duration_minutes": schedule.estimated_duration_minutes if schedule else 90
+    }
+
+
+def _structure_pool_header(pool: Pool, default_qualified: int, standing_points: bool = True) -> Dict[str, Any]:
+    """Champs d'une poule/ligue de la structure, sans ses matchs"""
+    header = {
+        "id": pool.id,
+        "name": pool.name,
+        "qualified_to_finals": pool.qualified_to_finals if hasattr(pool, 'qualified_to_finals') else default_qualified,
+        "qualified_to_loser_bracket": pool.qualified_to_loser_bracket if hasattr(pool, 'qualified_to_loser_bracket') else 0,
+    }
+    if standing_points:
+        header["use_standing_points"] = bool(pool.use_standing_points) if hasattr(pool, 'use_standing_points') else False
+        header["standing_points"] = _json.loads(pool.standing_points) if hasattr(pool, 'standing_points') and pool.standing_points else None
+    return header
+
+
+def _structure_phase_kind(phase: TournamentPhase) -> str:
+    """
+    Section de la structure alimentée par une phase :
+    "qualification", "pools", "leagues", "leagues_legacy", "loser" ou "bracket"
+    """
+    # Normalisation du type pour éviter les erreurs de frappe (Qualif vs qualification)
+    p_type = phase.phase_type.lower() if phase.phase_type else ""
+    if "qualif" in p_type:
+        return "qualification"
+    # Les ligues utilisent aussi phase_type='pools' mais phase_order=5
+    if p_type == "pools" or "poule" in p_type:
+        return "leagues" if phase.phase_order == 5 else "pools"
+    # phase_type='leagues' — valide si la contrainte DB a été migrée
+    if p_type == "leagues":
+        return "leagues_legacy"
+    # Phase loser_bracket ou elimination : tous les matchs vont dans loser_bracket_matches
+    if "loser" in p_type or "elimination" in p_type:
+        return "loser"
+    # Autres phases : réparties selon le bracket_type des matchs
+    return "bracket"
+
+
+def _is_loser_bracket_match(m: Match) -> bool:
+    return bool(m.bracket_type and "loser" in m.bracket_type.lower())
+
+
+def _load_structure_matches(db: Session, *criteria) -> tuple:
+    """Matchs (avec planifications) et totaux des sets, en deux requêtes"""
+    matches = db.query(Match).options(selectinload(Match.schedule)).filter(*criteria).all()
+    set_totals = {
+        match_id: (total_a, total_b)
+        for match_id, total_a, total_b in (
+            db.query(MatchSet.match_id, func.sum(MatchSet.score_team_a), func.sum(MatchSet.score_team_b))
+            .join(Match, Match.id == MatchSet.match_id)
+            .filter(*criteria)
+            .group_by(MatchSet.match_id)
+            .all()
+        )
+    } if matches else {}
+    return matches, set_totals
+
+
+def build_tournament_structure(tournament_id: int, db: Session):
+    """Construit la réponse de GET /tournaments/{id}/structure (sans cache)"""
     tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
     if not tournament:
         raise NotFoundError(f"Tournament {tournament_id} not found")
@@ -861,143 +1352,63 @@ def get_tournament_structure(
     db.expire_all()
 
     phases = db.query(TournamentPhase).filter(TournamentPhase.tournament_id == tournament_id).all()
+    phase_ids = [p.id for p in phases]
 
-    # Récupérer TOUS les matchs du tournoi pour créer le mapping ID -> UUID
-    all_tournament_matches = (
-        db.query(Match)
-        .join(TournamentPhase)
-        .filter(TournamentPhase.tournament_id == tournament_id)
-        .all()
+    # Nombre de requêtes fixe, quelle que soit la taille du tournoi :
+    # matchs (+ planifications en une requête), poules, totaux des sets (GROUP BY)
+    all_tournament_matches, set_totals = (
+        _load_structure_matches(db, Match.phase_id.in_(phase_ids)) if phase_ids else ([], {})
     )
 
+    # Regrouper par phase en conservant l'ordre renvoyé par la base
+    matches_by_phase: Dict[int, List[Match]] = {}
+    for m in all_tournament_matches:
+        matches_by_phase.setdefault(m.phase_id, []).append(m)
+
+    pools_by_phase: Dict[int, List[Pool]] = {}
+    if phase_ids:
+        for pool in db.query(Pool).filter(Pool.phase_id.in_(phase_ids)).all():
+            pools_by_phase.setdefault(pool.phase_id, []).append(pool)
+
     # Créer le mapping ID -> UUID
     id_to_uuid = {m.id: m.uuid for m in all_tournament_matches if m.uuid}
 
+    def match_to_dict_internal(m):
+        return _structure_match_dict(m, id_to_uuid, set_totals)
+
+    def pool_to_dict(pool, matches, default_qualified, standing_points=True):
+        return {
+            **_structure_pool_header(pool, default_qualified, standing_points),
+            "matches": [match_to_dict_internal(m) for m in matches if m.pool_id == pool.id]
+        }
+
     qualification_matches = []
     pools_data = []
     leagues_data = []
     bracket_matches = []
     loser_bracket_matches = []
 
-    def match_to_dict_internal(m):
-        # Résoudre les UUIDs de destination depuis les IDs
-        winner_dest_uuid = id_to_uuid.get(m.winner_destination_match_id) if m.winner_destination_match_id else None
-        loser_dest_uuid = id_to_uuid.get(m.loser_destination_match_id) if m.loser_destination_match_id else None
-
-        # Lire les infos de planification depuis MatchSchedule via la relation
-        schedule = getattr(m, 'schedule', None)
-        if isinstance(schedule, list) and schedule:
-            schedule = schedule[0]
-
-        # Calculer les points totaux depuis les sets (pour le goal average des sports à sets)
-        match_sets = db.query(MatchSet).filter(MatchSet.match_id == m.id).all()
-        total_points_a = sum(s.score_team_a for s in match_sets) if match_sets else None
-        total_points_b = sum(s.score_team_b for s in match_sets) if match_sets else None
-
-        return {
-            "id": m.id,
-            "uuid": getattr(m, 'uuid', None),
-            "match_type": m.match_type,
-            "bracket_type": m.bracket_type,
-            # ✅ IMPORTANT: Inclure les team_sport_id pour que le frontend puisse résoudre les noms
-            "team_sport_a_id": m.team_sport_a_id,
-            "team_sport_b_id": m.team_sport_b_id,
-            "team_a_source": m.team_a_source,
-            "team_b_source": m.team_b_source,
-
-            # --- DESTINATIONS ET SLOTS ---
-            "winner_destination_match_id": m.winner_destination_match_id,
-            "loser_destination_match_id": m.loser_destination_match_id,
-            # UUIDs de destination (pour le frontend)
-            "winner_destination_match_uuid": winner_dest_uuid,
-            "loser_destination_match_uuid": loser_dest_uuid,
-            "winner_destination_slot": getattr(m, 'winner_destination_slot', None),
-            "loser_destination_slot": getattr(m, 'loser_destination_slot', None),
-            "winner_points": m.winner_points if m.winner_points is not None else 0,
-            "loser_points": m.loser_points if m.loser_points is not None else 0,
-            # ------------------------------
-
-            "label": m.label,
-            "status": m.status,
-            "score_a": m.score_a if m.score_a is not None else 0,
-            "score_b": m.score_b if m.score_b is not None else 0,
-            "total_points_a": total_points_a,
-            "total_points_b": total_points_b,
-            "court": m.court if m.court else "Terrain",
-            "date": str(m.date) if m.date else None,
-            "time": str(m.time) if m.time else None,
-            "court_id": schedule.court_id if schedule else None,
-            "duration": m.duration or 90,
-            "scheduled_datetime": schedule.scheduled_datetime.isoformat() if schedule and schedule.scheduled_datetime else None,
-            "estimated_duration_minutes": schedule.estimated_duration_minutes if schedule else 90
-        }
-
     for phase in phases:
-        # Récupération de tous les matchs de la phase
-        matches = db.query(Match).filter(Match.phase_id == phase.id).all()
-        # Normalisation du type pour éviter les erreurs de frappe (Qualif vs qualification)
-        p_type = phase.phase_type.lower() if phase.phase_type else ""
-        
-        # 1. Gestion des Qualifications
-        if "qualif" in p_type:
-            qualification_matches.extend([match_to_dict_internal(m) for m in matches])
-            
-        # 2. Gestion des Poules (supporte "pools" et "poule")
-        # Les ligues utilisent aussi phase_type='pools' mais phase_order=5
-        elif p_type == "pools" or "poule" in p_type:
-            import json as _json
-            pool_list = db.query(Pool).filter(Pool.phase_id == phase.id).all()
-            # Distinguer poules (order!=5) des ligues (order==5)
-            if phase.phase_order == 5:
-                for league in pool_list:
-                    league_matches = [m for m in matches if m.pool_id == league.id]
-                    leagues_data.append({
-                        "id": league.id,
-                        "name": league.name,
-                        "qualified_to_finals": league.qualified_to_finals if hasattr(league, 'qualified_to_finals') else 8,
-                        "qualified_to_loser_bracket": league.qualified_to_loser_bracket if hasattr(league, 'qualified_to_loser_bracket') else 0,
-                        "use_standing_points": bool(league.use_standing_points) if hasattr(league, 'use_standing_points') else False,
-                        "standing_points": _json.loads(league.standing_points) if hasattr(league, 'standing_points') and league.standing_points else None,
-                        "matches": [match_to_dict_internal(m) for m in league_matches]
-                    })
-            else:
-                for pool in pool_list:
-                    pool_matches = [m for m in matches if m.pool_id == pool.id]
-                    pools_data.append({
-                        "id": pool.id,
-                        "name": pool.name,
-                        "qualified_to_finals": pool.qualified_to_finals if hasattr(pool, 'qualified_to_finals') else 2,
-                        "qualified_to_loser_bracket": pool.qualified_to_loser_bracket if hasattr(pool, 'qualified_to_loser_bracket') else 0,
-                        "use_standing_points": bool(pool.use_standing_points) if hasattr(pool, 'use_standing_points') else False,
-                        "standing_points": _json.loads(pool.standing_points) if hasattr(pool, 'standing_points') and pool.standing_points else None,
-                        "matches": [match_to_dict_internal(m) for m in pool_matches]
-                    })
+        # Matchs de la phase (déjà chargés)
+        matches = matches_by_phase.get(phase.id, [])
+        kind = _structure_phase_kind(phase)
 
-        # 2b. Gestion des Ligues (phase_type='leagues' — valide si la contrainte DB a été migrée)
-        elif p_type == "leagues":
-            league_pools = db.query(Pool).filter(Pool.phase_id == phase.id).all()
-            for league in league_pools:
-                league_matches = [m for m in matches if m.pool_id == league.id]
-                import json as _json
-                leagues_data.append({
-                    "id": league.id,
-                    "name": league.name,
-                    "qualified_to_finals": league.qualified_to_finals if hasattr(league, 'qualified_to_finals') else 8,
-                    "qualified_to_loser_bracket": league.qualified_to_loser_bracket if hasattr(league, 'qualified_to_loser_bracket') else 0,
-                    "matches": [match_to_dict_internal(m) for m in league_matches]
-                })
-                
-        # 3. Gestion des Brackets (élimination, finale, etc.)
-        # Note: Les matchs loser bracket sont identifiés par:
-        # - phase_type contenant "loser" ou "elimination" OU
-        # - bracket_type contenant "loser"
-        elif "loser" in p_type or "elimination" in p_type:
-            # Phase loser_bracket ou elimination : tous les matchs vont dans loser_bracket_matches
+        if kind == "qualification":
+            qualification_matches.extend([match_to_dict_internal(m) for m in matches])
+        elif kind == "pools":
+            pools_data.extend(pool_to_dict(pool, matches, 2) for pool in pools_by_phase.get(phase.id, []))
+        elif kind == "leagues":
+            leagues_data.extend(pool_to_dict(league, matches, 8) for league in pools_by_phase.get(phase.id, []))
+        elif kind == "leagues_legacy":
+            leagues_data.extend(
+                pool_to_dict(league, matches, 8, standing_points=False) for league in pools_by_phase.get(phase.id, [])
+            )
+        elif kind == "loser":
             loser_bracket_matches.extend([match_to_dict_internal(m) for m in matches])
         else:
             for m in matches:
                 # Vérifier si c'est un match loser bracket par son bracket_type (contient "loser")
-                if m.bracket_type and "loser" in m.bracket_type.lower():
+                if _is_loser_bracket_match(m):
                     loser_bracket_matches.append(match_to_dict_internal(m))
                 else:
                     bracket_matches.append(match_to_dict_internal(m))
@@ -1011,11 +1422,74 @@ def get_tournament_structure(
     })
 
 
+def iter_tournament_structure(tournament_id: int) -> Iterator[bytes]:
+    """
+    Même document que build_tournament_structure, produit par morceaux (?stream=1).
+
+    Les matchs sont chargés phase par phase et poule par poule, la mémoire reste bornée par
+    la plus grosse poule/phase. Utilise sa propre session : la session de la requête est
+    fermée avant l'envoi d'une réponse en streaming.
+    """
+    db = SessionLocal()
+    try:
+        phases = db.query(TournamentPhase).filter(TournamentPhase.tournament_id == tournament_id).all()
+        phase_ids = [p.id for p in phases]
+
+        # Seul état global : le mapping ID -> UUID (deux colonnes par match)
+        id_to_uuid = dict(
+            db.query(Match.id, Match.uuid).filter(Match.phase_id.in_(phase_ids), Match.uuid.isnot(None)).all()
+        ) if phase_ids else {}
+
+        def phases_of(*kinds):
+            return [phase for phase in phases if _structure_phase_kind(phase) in kinds]
+
+        def match_dicts(*criteria, keep=None):
+            matches, set_totals = _load_structure_matches(db, *criteria)
+            for m in matches:
+                if keep is None or keep(m):
+                    yield _structure_match_dict(m, id_to_uuid, set_totals)
+
+        def phase_matches(kinds, keep=None):
+            for phase in phases_of(*kinds):
+                yield from match_dicts(Match.phase_id == phase.id, keep=keep)
+
+        def phase_pools(kinds, default_qualified):
+            for phase in phases_of(*kinds):
+                for pool in db.query(Pool).filter(Pool.phase_id == phase.id).all():
+                    header = _structure_pool_header(
+                        pool, default_qualified, standing_points=_structure_phase_kind(phase) != "leagues_legacy"
+                    )
+                    yield iter_json_object([
+                        *header.items(),
+                        ("matches", iter_json_array(match_dicts(Match.phase_id == phase.id, Match.pool_id == pool.id))),
+                    ])
+
+        def loser_matches():
+            # Ordre des phases conservé : phases loser/elimination entières, matchs "loser" des autres brackets
+            for phase in phases_of("loser", "bracket"):
+                keep = None if _structure_phase_kind(phase) == "loser" else _is_loser_bracket_match
+                yield from match_dicts(Match.phase_id == phase.id, keep=keep)
+
+        data = iter_json_object([
+            ("qualification_matches", iter_json_array(phase_matches(["qualification"]))),
+            ("pools", iter_json_array(phase_pools(["pools"], 2))),
+            ("leagues", iter_json_array(phase_pools(["leagues", "leagues_legacy"], 8))),
+            ("bracket_matches", iter_json_array(
+                phase_matches(["bracket"], keep=lambda m: not _is_loser_bracket_match(m))
+            )),
+            ("loser_bracket_matches", iter_json_array(loser_matches())),
+        ])
+        yield from iter_json_object([("success", True), ("message", "Operation successful"), ("data", data)])
+    finally:
+        db.close()
+
 
 
 @router.post("/tournaments/{tournament_id}/propagate-results", dependencies=[Depends(require_admin_or_staff)])
 def propagate_tournament_results(
     tournament_id: int = Path(..., description="ID du tournoi"),
+    match_id: Optional[List[int]] = Query(None, description="Matchs dont le résultat vient de changer"),
+    full: bool = Query(False, description="Réévaluer tout le tournoi"),
     db: Session = Depends(get_db)
 ):
     """
@@ -1024,576 +1498,59 @@ def propagate_tournament_results(
     Utilise DEUX mécanismes:
     1. winner_destination_match_id / loser_destination_match_id (NOUVEAU)
     2. team_a_source / team_b_source avec codes (LEGACY)
+
+    Seuls les matchs dont le résultat a changé depuis le dernier appel (ou passés en `match_id`)
+    et les matchs qui en dépendent sont réévalués (voir services/propagation_engine.py).
     """
-    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
-    if not tournament:
-        raise NotFoundError(f"Tournament {tournament_id} not found")
-    
-    # ✅ FIX: Récupérer TOUTES les phases
-    phases = db.query(TournamentPhase).filter(
-        TournamentPhase.tournament_id == tournament_id
-    ).all()
-    
-    if not phases:
+    result = propagation_engine.propagate(db, tournament_id, match_ids=match_id, full=full)
+    if result is None:
         return create_success_response({
             "tournament_id": tournament_id,
             "propagated_matches": 0
         }, message="No phases found")
-    
-    phase_ids = [p.id for p in phases]
-    all_matches = db.query(Match).filter(Match.phase_id.in_(phase_ids)).all()
-    
-    matches_by_id = {m.id: m for m in all_matches}
-    propagated_count = 0
-    
-    print(f"[PROPAGATION] Tournoi {tournament_id}: {len(all_matches)} matchs dans {len(phases)} phases")
-    
-    # =========================================================================
-    # MÉCANISME 1: Propagation via winner/loser_destination_match_id
-    # =========================================================================
-    for match in all_matches:
-        if match.status != "completed":
-            continue
-        if match.score_a is None or match.score_b is None:
-            continue
-        
-        # Déterminer vainqueur et perdant
-        if match.score_a > match.score_b:
-            winner_team_id = match.team_sport_a_id
-            loser_team_id = match.team_sport_b_id
-        elif match.score_b > match.score_a:
-            winner_team_id = match.team_sport_b_id
-            loser_team_id = match.team_sport_a_id
-        else:
-            continue  # Égalité
-        
-        # --- Propager le VAINQUEUR ---
-        if match.winner_destination_match_id and winner_team_id:
-            dest_match = matches_by_id.get(match.winner_destination_match_id)
-            if dest_match:
-                slot = match.winner_destination_slot or "A"
-                
-                # Logique intelligente: si le slot A est déjà pris, utiliser B
-                if slot == "A":
-                    if dest_match.team_sport_a_id is None or dest_match.team_sport_a_id != winner_team_id:
-                        if dest_match.team_sport_a_id is None:
-                            dest_match.team_sport_a_id = winner_team_id
-                        elif dest_match.team_sport_b_id is None:
-                            dest_match.team_sport_b_id = winner_team_id
-                        else:
-                            print(f"[PROPAGATION] ⚠️ Slots pleins pour match {dest_match.id}")
-                            continue
-                        dest_match.updated_at = datetime.utcnow()
-                        propagated_count += 1
-                        print(f"[PROPAGATION] ✅ Winner {winner_team_id} -> Match {dest_match.id}")
-                elif slot == "B":
-                    if dest_match.team_sport_b_id is None or dest_match.team_sport_b_id != winner_team_id:
-                        if dest_match.team_sport_b_id is None:
-                            dest_match.team_sport_b_id = winner_team_id
-                        elif dest_match.team_sport_a_id is None:
-                            dest_match.team_sport_a_id = winner_team_id
-                        else:
-                            print(f"[PROPAGATION] ⚠️ Slots pleins pour match {dest_match.id}")
-                            continue
-                        dest_match.updated_at = datetime.utcnow()
-                        propagated_count += 1
-                        print(f"[PROPAGATION] ✅ Winner {winner_team_id} -> Match {dest_match.id}")
-        
-        # --- Propager le PERDANT ---
-        if match.loser_destination_match_id and loser_team_id:
-            dest_match = matches_by_id.get(match.loser_destination_match_id)
-            if dest_match:
-                slot = match.loser_destination_slot or "A"
-
-                if slot == "A":
-                    if dest_match.team_sport_a_id is None or dest_match.team_sport_a_id == loser_team_id:
-                        if dest_match.team_sport_a_id is None:
-                            dest_match.team_sport_a_id = loser_team_id
-                            dest_match.updated_at = datetime.utcnow()
-                            propagated_count += 1
-                            print(f"[PROPAGATION] ✅ Loser {loser_team_id} -> Match {dest_match.id} slot A")
-                        # else: déjà propagé, idempotent, skip
-                    elif dest_match.team_sport_b_id is None or dest_match.team_sport_b_id == loser_team_id:
-                        if dest_match.team_sport_b_id is None:
-                            dest_match.team_sport_b_id = loser_team_id
-                            dest_match.updated_at = datetime.utcnow()
-                            propagated_count += 1
-                            print(f"[PROPAGATION] ✅ Loser {loser_team_id} -> Match {dest_match.id} slot B (fallback)")
-                        # else: déjà propagé en slot B, idempotent, skip
-                    else:
-                        print(f"[PROPAGATION] ⚠️ Slots pleins pour match {dest_match.id}")
-                        continue
-                elif slot == "B":
-                    if dest_match.team_sport_b_id is None or dest_match.team_sport_b_id == loser_team_id:
-                        if dest_match.team_sport_b_id is None:
-                            dest_match.team_sport_b_id = loser_team_id
-                            dest_match.updated_at = datetime.utcnow()
-                            propagated_count += 1
-                            print(f"[PROPAGATION] ✅ Loser {loser_team_id} -> Match {dest_match.id} slot B")
-                        # else: déjà propagé, idempotent, skip
-                    elif dest_match.team_sport_a_id is None or dest_match.team_sport_a_id == loser_team_id:
-                        if dest_match.team_sport_a_id is None:
-                            dest_match.team_sport_a_id = loser_team_id
-                            dest_match.updated_at = datetime.utcnow()
-                            propagated_count += 1
-                            print(f"[PROPAGATION] ✅ Loser {loser_team_id} -> Match {dest_match.id} slot A (fallback)")
-                        # else: déjà propagé en slot A, idempotent, skip
-                    else:
-                        print(f"[PROPAGATION] ⚠️ Slots pleins pour match {dest_match.id}")
-                        continue
-    
-    # =========================================================================
-    # MÉCANISME 2: Propagation des résultats des POULES vers les brackets
-    # =========================================================================
-    pools = []
-    for phase in phases:
-        pools.extend(db.query(Pool).filter(Pool.phase_id == phase.id).all())
-    pools_by_name = {p.name: p for p in pools}
-
-    # Réparer pool_id=NULL sur les matchs de poule existants (données historiques)
-    # Guard: m.phase_id == pool.phase_id (les matchs de bracket sont dans une phase différente)
-    # NB: match_type n'est PAS mis à jour dans l'UPDATE path de upsert_match → peut être NULL
-    for pool in pools:
-        pool_team_ids = [tp.team_id for tp in pool.team_pools]
-        if not pool_team_ids:
-            continue
-        ts_ids = set(
-            ts.id for ts in db.query(TeamSport).filter(
-                TeamSport.team_id.in_(pool_team_ids),
-                TeamSport.sport_id == tournament.sport_id
-            ).all()
-        )
-        for m in all_matches:
-            if (m.phase_id == pool.phase_id
-                    and m.pool_id is None
-                    and m.team_sport_a_id in ts_ids
-                    and m.team_sport_b_id in ts_ids):
-                m.pool_id = pool.id
-
-    # Réparation spécifique aux ligues : aucune TeamPool n'est créée pour les ligues,
-    # donc la boucle ci-dessus les ignore. On répare ici par phase_id.
-    league_phases = [p for p in phases if p.phase_order == 5 or p.phase_type == "leagues"]
-    for lp in league_phases:
-        league_pools_in_phase = db.query(Pool).filter(Pool.phase_id == lp.id).all()
-        if len(league_pools_in_phase) == 1:
-            # Cas simple : une seule ligue → assigner tous les matchs non assignés de la phase
-            lp_pool = league_pools_in_phase[0]
-            for m in all_matches:
-                if m.phase_id == lp.id and m.pool_id is None:
-                    m.pool_id = lp_pool.id
-                    print(f"[REPAIR-LEAGUE] ✅ Match {m.id} → pool_id={lp_pool.id} ({lp_pool.name})")
-        elif len(league_pools_in_phase) > 1:
-            # Cas multi-ligues : inférer le bon pool via les équipes déjà assignées
-            for lp_pool in league_pools_in_phase:
-                known_teams: set = set()
-                for m in all_matches:
-                    if m.pool_id == lp_pool.id:
-                        if m.team_sport_a_id: known_teams.add(m.team_sport_a_id)
-                        if m.team_sport_b_id: known_teams.add(m.team_sport_b_id)
-                for m in all_matches:
-                    if m.phase_id == lp.id and m.pool_id is None and known_teams:
-                        if m.team_sport_a_id in known_teams or m.team_sport_b_id in known_teams:
-                            m.pool_id = lp_pool.id
-                            print(f"[REPAIR-LEAGUE] ✅ Match {m.id} → pool_id={lp_pool.id} ({lp_pool.name})")
-
-    # Normalise un nom de pool : minuscules, espaces simples → clés cohérentes pour les lookups
-    import re as _re_norm
-    def _norm(name: str) -> str:
-        return _re_norm.sub(r'\s+', ' ', (name or '').strip().lower())
-
-    # Vérifier si toutes les poules sont terminées
-    pools_status = {}
-    for pool in pools:
-        all_pool_matches = [m for m in all_matches if m.pool_id == pool.id]
-        completed_pool_matches = [m for m in all_pool_matches if m.status == "completed"]
-        pools_status[_norm(pool.name)] = {
-            "total": len(all_pool_matches),
-            "completed": len(completed_pool_matches),
-            "is_complete": len(all_pool_matches) > 0 and len(completed_pool_matches) == len(all_pool_matches),
-            "original_name": pool.name,
-        }
-        print(f"[POOL-STATUS] {pool.name} (norm='{_norm(pool.name)}'): {len(completed_pool_matches)}/{len(all_pool_matches)} matchs terminés")
-
-    all_pools_complete = all(status["is_complete"] for status in pools_status.values()) if pools_status else False
-    print(f"[POOL-STATUS] Toutes les poules terminées: {all_pools_complete}")
-
-    # Calculer les classements de chaque poule
-    pool_standings = {}  # pool_name -> [(team_sport_id, points, goal_diff), ...]
-
-    for pool in pools:
-        # Récupérer tous les matchs terminés de cette poule
-        pool_matches = [m for m in all_matches if m.pool_id == pool.id and m.status == "completed"]
-
-        if not pool_matches:
-            print(f"[POOL-STANDINGS] ⚠️ {pool.name}: Aucun match terminé")
-            continue
-
-        # Calculer les stats pour chaque équipe de la poule
-        team_stats = {}  # team_sport_id -> {points, wins, draws, losses, goal_diff}
-
-        for match in pool_matches:
-            if match.score_a is None or match.score_b is None:
-                continue
-
-            team_a = match.team_sport_a_id
-            team_b = match.team_sport_b_id
-
-            if not team_a or not team_b:
-                continue
-
-            # Initialiser les stats si nécessaire
-            if team_a not in team_stats:
-                team_stats[team_a] = {"points": 0, "wins": 0, "draws": 0, "losses": 0, "goal_diff": 0, "goals_for": 0}
-            if team_b not in team_stats:
-                team_stats[team_b] = {"points": 0, "wins": 0, "draws": 0, "losses": 0, "goal_diff": 0, "goals_for": 0}
-
-            # Calculer les points (3 victoire, 1 nul, 0 défaite)
-            if match.score_a > match.score_b:
-                team_stats[team_a]["points"] += 3
-                team_stats[team_a]["wins"] += 1
-                team_stats[team_b]["losses"] += 1
-            elif match.score_b > match.score_a:
-                team_stats[team_b]["points"] += 3
-                team_stats[team_b]["wins"] += 1
-                team_stats[team_a]["losses"] += 1
-            else:
-                team_stats[team_a]["points"] += 1
-                team_stats[team_b]["points"] += 1
-                team_stats[team_a]["draws"] += 1
-                team_stats[team_b]["draws"] += 1
-
-            # Différence de buts et buts marqués
-            team_stats[team_a]["goal_diff"] += match.score_a - match.score_b
-            team_stats[team_b]["goal_diff"] += match.score_b - match.score_a
-            team_stats[team_a]["goals_for"] += match.score_a
-            team_stats[team_b]["goals_for"] += match.score_b
-
-        # Trier par points, puis différence de buts, puis buts marqués
-        sorted_teams = sorted(
-            team_stats.items(),
-            key=lambda x: (x[1]["points"], x[1]["goal_diff"], x[1]["goals_for"]),
-            reverse=True
-        )
 
-        pool_standings[_norm(pool.name)] = [(team_id, stats["points"], stats["goal_diff"]) for team_id, stats in sorted_teams]
-        print(f"[POOL-STANDINGS] {pool.name} (norm='{_norm(pool.name)}'): {pool_standings[_norm(pool.name)]}")
-
-    # Upsert TournamentRanking avec les standing_points des poules
-    for pool in pools:
-        if not pool.use_standing_points or not pool.standing_points:
-            continue
-        try:
-            standing_pts = _json.loads(pool.standing_points) if isinstance(pool.standing_points, str) else pool.standing_points
-        except Exception:
-            continue
-        standings = pool_standings.get(_norm(pool.name), [])
-        for pos, (ts_id, _, _) in enumerate(standings, start=1):
-            pts = standing_pts.get(str(pos), 0) or standing_pts.get(pos, 0)
-            existing = db.query(TournamentRanking).filter_by(
-                tournament_id=tournament_id, team_sport_id=ts_id
-            ).first()
-            if existing:
-                existing.final_position = pos
-                existing.points_awarded = pts
-            else:
-                db.add(TournamentRanking(
-                    tournament_id=tournament_id,
-                    team_sport_id=ts_id,
-                    final_position=pos,
-                    points_awarded=pts
-                ))
-
-    def resolve_source_code(source_code: str) -> Optional[int]:
-        if not source_code:
-            return None
-        
-        # WQ1 = Winner Qualification 1
-        if source_code.startswith("WQ"):
-            try:
-                match_num = int(source_code[2:])
-                qual_match = next((m for m in all_matches 
-                                  if m.match_type == "qualification" 
-                                  and m.match_order == match_num
-                                  and m.status == "completed"), None)
-                if qual_match and qual_match.score_a is not None:
-                    return qual_match.team_sport_a_id if qual_match.score_a > qual_match.score_b else qual_match.team_sport_b_id
-            except:
-                pass
-        
-        # LQ1 = Loser Qualification 1
-        elif source_code.startswith("LQ") and not source_code.startswith("LQF"):
-            try:
-                match_num = int(source_code[2:])
-                qual_match = next((m for m in all_matches 
-                                  if m.match_type == "qualification" 
-                                  and m.match_order == match_num
-                                  and m.status == "completed"), None)
-                if qual_match and qual_match.score_a is not None:
-                    return qual_match.team_sport_b_id if qual_match.score_a > qual_match.score_b else qual_match.team_sport_a_id
-            except:
-                pass
-        
-        # WSF1 = Winner Semifinal 1
-        elif source_code.startswith("WSF"):
-            try:
-                match_num = int(source_code[3:])
-                sf_match = next((m for m in all_matches 
-                               if m.bracket_type == "semifinal" 
-                               and m.match_order == match_num
-                               and m.status == "completed"), None)
-                if sf_match and sf_match.score_a is not None:
-                    return sf_match.team_sport_a_id if sf_match.score_a > sf_match.score_b else sf_match.team_sport_b_id
-            except:
-                pass
-        
-        # LSF1 = Loser Semifinal 1
-        elif source_code.startswith("LSF"):
-            try:
-                match_num = int(source_code[3:])
-                sf_match = next((m for m in all_matches
-                               if m.bracket_type == "semifinal"
-                               and m.match_order == match_num
-                               and m.status == "completed"), None)
-                if sf_match and sf_match.score_a is not None:
-                    return sf_match.team_sport_b_id if sf_match.score_a > sf_match.score_b else sf_match.team_sport_a_id
-            except:
-                pass
-
-        # =========================================================================
-        # CODES GÉNÉRIQUES DE BRACKET: WQF1, LQF1, WLR1-1, LLR2-1, WLF, etc.
-        # Résolution par label du match : "W..." → vainqueur, "L..." → perdant
-        # Fonctionne pour tous les codes non couverts ci-dessus (quarts, LB, etc.)
-        # =========================================================================
-        if source_code and len(source_code) > 1 and source_code[0] in ('W', 'L'):
-            try:
-                is_winner = source_code[0] == 'W'
-                # Pour un code perdant "LXXX", le match a label "WXXX"
-                label_to_find = source_code if is_winner else 'W' + source_code[1:]
-                ref_match = next(
-                    (m for m in all_matches
-                     if m.label == label_to_find and m.status == "completed"
-                     and m.score_a is not None and m.score_b is not None
-                     and m.score_a != m.score_b),
-                    None
-                )
-                if ref_match:
-                    if is_winner:
-                        return ref_match.team_sport_a_id if ref_match.score_a > ref_match.score_b else ref_match.team_sport_b_id
-                    else:
-                        return ref_match.team_sport_b_id if ref_match.score_a > ref_match.score_b else ref_match.team_sport_a_id
-            except Exception:
-                pass
-
-        # =========================================================================
-        # CODES DE POULE: "Poule A-1", "Poule 1-2", "Pool A-1", etc.
-        # Format: <nom_poule>-<position> où position est 1, 2, 3...
-        # =========================================================================
-        import re
-
-        # Pattern pour matcher "Poule X-N", "Pool X-N" ou "Ligue X-N" (avec ou sans espace)
-        pool_pattern = re.match(r'^(Poule\s*\d+|Poule\s*[A-Z]|Pool\s*\d+|Pool\s*[A-Z]|Ligue\s*\d+|Ligue\s*[A-Z]|League\s*\d+|League\s*[A-Z])-(\d+)$', source_code, re.IGNORECASE)
-
-        if pool_pattern:
-            pool_name_raw = pool_pattern.group(1).strip()
-            position = int(pool_pattern.group(2))
-
-            print(f"[RESOLVE-POOL] Tentative de résolution: {source_code} -> pool={pool_name_raw}, position={position}")
-
-            # Chercher la poule/ligue par son nom (essayer plusieurs variantes)
-            pool_name_variants = [
-                pool_name_raw,
-                pool_name_raw.replace("Pool", "Poule"),
-                pool_name_raw.replace("Poule", "Pool"),
-                f"Poule {pool_name_raw.replace('Poule', '').replace('Pool', '').strip()}",
-                f"Pool {pool_name_raw.replace('Poule', '').replace('Pool', '').strip()}",
-                pool_name_raw.replace("League", "Ligue"),
-                pool_name_raw.replace("Ligue", "League"),
-                f"Ligue {pool_name_raw.replace('Ligue', '').replace('League', '').strip()}",
-                f"League {pool_name_raw.replace('Ligue', '').replace('League', '').strip()}",
-            ]
-
-            pool_name_norm = _norm(pool_name_raw)
-            found_standings = None
-            for variant in pool_name_variants:
-                norm_v = _norm(variant)
-                if norm_v in pool_standings:
-                    found_standings = pool_standings[norm_v]
-                    break
-            # Fallback insensible à la casse
-            if found_standings is None:
-                for key in pool_standings:
-                    if _norm(key) == pool_name_norm:
-                        found_standings = pool_standings[key]
-                        break
-
-            if found_standings is not None:
-                if len(found_standings) >= position:
-                    team_id = found_standings[position - 1][0]
-                    print(f"[RESOLVE-POOL] ✅ {source_code} -> team_sport_id={team_id}")
-                    return team_id
-                else:
-                    print(f"[RESOLVE-POOL] ⚠️ Position {position} invalide pour '{pool_name_raw}' (seulement {len(found_standings)} équipes)")
-            else:
-                print(f"[RESOLVE-POOL] ⚠️ Poule '{pool_name_raw}' non trouvée. Poules disponibles: {list(pool_standings.keys())}")
-
-        # Pattern alternatif: "P1-1" pour "Poule 1, position 1"
-        alt_pool_pattern = re.match(r'^P(\d+)-(\d+)$', source_code)
-        if alt_pool_pattern:
-            pool_num = alt_pool_pattern.group(1)
-            position = int(alt_pool_pattern.group(2))
-
-            pool_name_variants = [f"Poule {pool_num}", f"Pool {pool_num}", f"Poule{pool_num}", f"Pool{pool_num}"]
-
-            for variant in pool_name_variants:
-                if variant in pool_standings:
-                    standings = pool_standings[variant]
-                    if len(standings) >= position:
-                        team_id = standings[position - 1][0]
-                        print(f"[RESOLVE-POOL] ✅ {source_code} -> team_sport_id={team_id}")
-                        return team_id
-
-        # Meilleur 3ème: "Meilleur-3ème" ou "Best-3rd"
-        if source_code.lower() in ["meilleur-3ème", "meilleur-3e", "best-3rd", "meilleur 3ème", "meilleur 3e"]:
-            # Collecter tous les 3èmes de toutes les poules
-            third_places = []
-            for pool_name, standings in pool_standings.items():
-                if len(standings) >= 3:
-                    team_id, points, goal_diff = standings[2]  # 3ème = index 2
-                    third_places.append((team_id, points, goal_diff, pool_name))
-
-            if third_places:
-                # Trier par points puis par goal_diff
-                third_places.sort(key=lambda x: (x[1], x[2]), reverse=True)
-                best_third = third_places[0][0]
-                print(f"[RESOLVE-POOL] ✅ Meilleur 3ème: team_sport_id={best_third}")
-                return best_third
-
-        return None
-    
-    # =========================================================================
-    # MÉCANISME 2 : Propagation via codes source (team_a_source / team_b_source)
-    # Gère la résolution "Poule 1-1" → team_sport_id uniquement quand la poule est terminée.
-    # Permet aussi la re-propagation si les classements ont évolué après assignation partielle.
-    # =========================================================================
-
-    import re as _re
-
-    def _is_pool_source(code: str) -> bool:
-        """Vérifie si le code source référence une position dans une poule."""
-        if not code:
-            return False
-        return bool(
-            _re.match(r'^(Poule\s*\d+|Poule\s*[A-Z]|Pool\s*\d+|Pool\s*[A-Z]|Ligue\s*\d+|Ligue\s*[A-Z]|League\s*\d+|League\s*[A-Z])-\d+$', code, _re.IGNORECASE)
-            or _re.match(r'^P\d+-\d+$', code)
-        )
+    propagated_count = result["propagated_matches"]
+    return create_success_response(result, message=f"Successfully propagated {propagated_count} match results")
 
-    def _pool_complete_for_source(code: str) -> bool:
-        """Retourne True si la poule référencée est entièrement terminée."""
-        m = _re.match(r'^(Poule\s*\d+|Poule\s*[A-Z]|Pool\s*\d+|Pool\s*[A-Z]|Ligue\s*\d+|Ligue\s*[A-Z]|League\s*\d+|League\s*[A-Z])-\d+$', code, _re.IGNORECASE)
-        if m:
-            pool_name_raw = m.group(1).strip()
-        else:
-            m2 = _re.match(r'^P(\d+)-\d+$', code)
-            if m2:
-                pool_name_raw = f"Poule {m2.group(1)}"
-            else:
-                return True  # code non-poule/ligue → pas de blocage
-        variants = [
-            pool_name_raw,
-            pool_name_raw.replace("Pool", "Poule"),
-            pool_name_raw.replace("Poule", "Pool"),
-            f"Poule {pool_name_raw.replace('Poule', '').replace('Pool', '').strip()}",
-            f"Pool {pool_name_raw.replace('Poule', '').replace('Pool', '').strip()}",
-            pool_name_raw.replace("League", "Ligue"),
-            pool_name_raw.replace("Ligue", "League"),
-            f"Ligue {pool_name_raw.replace('Ligue', '').replace('League', '').strip()}",
-            f"League {pool_name_raw.replace('Ligue', '').replace('League', '').strip()}",
-        ]
-        pool_name_norm = _norm(pool_name_raw)
-        for variant in variants:
-            norm_v = _norm(variant)
-            if norm_v in pools_status:
-                return pools_status[norm_v]["is_complete"]
-        # Fallback insensible à la casse
-        for key in pools_status:
-            if _norm(key) == pool_name_norm:
-                return pools_status[key]["is_complete"]
-        print(f"[POOL-COMPLETE] ⚠️ Pool '{pool_name_raw}' non trouvée. Disponibles: {list(pools_status.keys())}")
-        return False  # Poule inconnue → bloquer par précaution
-
-    debug_unresolved_sources = []  # Pour diagnostic
-
-    for match in all_matches:
-        for attr_source, attr_id, other_attr_id in [
-            ("team_a_source", "team_sport_a_id", "team_sport_b_id"),
-            ("team_b_source", "team_sport_b_id", "team_sport_a_id"),
-        ]:
-            source = getattr(match, attr_source)
-            if not source:
-                continue
 
-            is_pool = _is_pool_source(source)
-
-            current_id = getattr(match, attr_id)
-
-            # Pour les codes de poule : ne propager que si la poule est entièrement terminée
-            if is_pool and not _pool_complete_for_source(source):
-                # Nettoyer les données périmées d'une propagation partielle antérieure
-                if current_id is not None and match.status not in ("completed", "in_progress"):
-                    setattr(match, attr_id, None)
-                    match.updated_at = datetime.utcnow()
-                    print(f"[PROPAGATION] 🧹 Reset {attr_id} pour {source} (poule incomplète)")
-                else:
-                    print(f"[PROPAGATION] ⏳ Poule incomplète, skip: {source}")
-                    debug_unresolved_sources.append({
-                        "match_id": match.id,
-                        "source": source,
-                        "reason": "pool_incomplete",
-                        "pool_status": pools_status.get(_norm(source.rsplit("-", 1)[0].strip()), None),
-                    })
-                continue
+@router.get("/tournaments/{tournament_id}/propagation-status")
+def get_propagation_status(
+    tournament_id: int = Path(..., description="ID du tournoi"),
+):
+    """
+    État des traitements post-résultat d'un tournoi (file de PATCH /matches/{id}) :
+    résultats en attente, en cours de traitement et dernier passage.
+    """
+    return create_success_response({
+        **result_worker.get_status(tournament_id),
+        "worker": result_worker.get_stats(),
+    }, message="Propagation status retrieved")
 
-            resolved = resolve_source_code(source)
-            if not resolved:
-                debug_unresolved_sources.append({
-                    "match_id": match.id,
-                    "source": source,
-                    "reason": "resolve_failed",
-                    "available_standings": list(pool_standings.keys()),
-                })
-                continue
 
-            if current_id is None:
-                # Assignation initiale — vérifier contrainte A ≠ B
-                other_id = getattr(match, other_attr_id)
-                if other_id != resolved:
-                    setattr(match, attr_id, resolved)
-                    match.updated_at = datetime.utcnow()
-                    propagated_count += 1
-                    print(f"[PROPAGATION] ✅ {source} -> {attr_id}={resolved}")
-                else:
-                    print(f"[PROPAGATION] ⚠️ Contrainte A≠B bloquée: {source} -> {attr_id}={resolved} == {other_attr_id}")
-            elif is_pool and current_id != resolved:
-                # Re-propagation : les classements finaux diffèrent de l'assignation précédente
-                other_id = getattr(match, other_attr_id)
-                if other_id != resolved:
-                    setattr(match, attr_id, resolved)
-                    match.updated_at = datetime.utcnow()
-                    propagated_count += 1
-                    print(f"[PROPAGATION] 🔄 Re-propagation {source} -> {attr_id}={resolved} (était {current_id})")
-                else:
-                    print(f"[PROPAGATION] ⚠️ Re-propagation bloquée (contrainte A≠B): {source} -> {resolved} == {other_attr_id}")
+@router.get("/tournaments/{tournament_id}/qualification-odds")
+async def get_qualification_odds(
+    tournament_id: int = Path(..., description="ID du tournoi"),
+    simulations: Optional[int] = Query(None, ge=100, le=20000, description="Nombre de simulations, admin uniquement (défaut : 10000 avec NumPy, 1000 sans)"),
+    current_user: Optional[TokenData] = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Probabilités, par équipe, de chaque position finale et de qualification (match hors poule),
+    estimées en simulant les matchs restants (voir services/qualification_simulator.py).
 
-    db.commit()
+    Le résultat est mis en cache jusqu'au prochain changement du tournoi (structure_version) ;
+    le calcul tourne dans un thread dédié, partagé par les requêtes concurrentes. Seul un admin
+    peut choisir le nombre de simulations (sinon une valeur par requête contournerait le cache).
+    Trop de calculs en cours : 503 avec Retry-After.
+    """
+    if simulations is not None and (current_user is None or current_user.role != Role.ADMIN):
+        raise ForbiddenError("Only admins can choose the number of simulations")
 
-    return create_success_response({
-        "tournament_id": tournament_id,
-        "propagated_matches": propagated_count,
-        "debug_pool_standings": {k: len(v) for k, v in pool_standings.items()},
-        "debug_pools_status": {k: {"total": v["total"], "completed": v["completed"], "is_complete": v["is_complete"], "original_name": v.get("original_name", k)} for k, v in pools_status.items()},
-        "debug_phases": [{"id": p.id, "order": p.phase_order, "type": p.phase_type} for p in phases],
-        "debug_unresolved_sources": debug_unresolved_sources,
-    }, message=f"Successfully propagated {propagated_count} match results")
+    try:
+        result = await qualification_simulator.simulate(db, tournament_id, simulations)
+    except SimulationBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return create_success_response(result, message=f"Simulated {result['remaining_matches']} remaining matches {result['simulations']} times")
 
 
 @router.delete("/tournaments/{tournament_id}/structure", dependencies=[Depends(require_admin)])
@@ -1609,44 +1566,14 @@ def delete_tournament_structure(
     if not tournament:
         raise NotFoundError(f"Tournament {tournament_id} not found")
     
-    deleted_matches = 0
-    deleted_pools = 0
-    deleted_phases = 0
-    
-    # Récupérer toutes les phases du tournoi
-    phases = db.query(TournamentPhase).filter(
-        TournamentPhase.tournament_id == tournament_id
-    ).all()
-    
-    for phase in phases:
-        # Récupérer tous les matchs de cette phase
-        matches = db.query(Match).filter(Match.phase_id == phase.id).all()
-
-        # Supprimer les dépendances de chaque match
-        for match in matches:
-            # Supprimer les MatchSchedule
-            db.query(MatchSchedule).filter(MatchSchedule.match_id == match.id).delete()
-            # Supprimer les MatchSet (pour les sports à sets: volleyball, tennis, etc.)
-            db.query(MatchSet).filter(MatchSet.match_id == match.id).delete()
-
-        # Supprimer tous les matchs de cette phase
-        match_count = db.query(Match).filter(Match.phase_id == phase.id).delete()
-        deleted_matches += match_count
-
-        # Supprimer les team_pools associées aux poules
-        pools = db.query(Pool).filter(Pool.phase_id == phase.id).all()
-        for pool in pools:
-            db.query(TeamPool).filter(TeamPool.pool_id == pool.id).delete()
-
-        # Supprimer toutes les poules de cette phase
-        pool_count = db.query(Pool).filter(Pool.phase_id == phase.id).delete()
-        deleted_pools += pool_count
-
-        # Supprimer la phase elle-même
-        db.delete(phase)
-        deleted_phases += 1
+    # Matchs (avec événements, sets et planifications), poules et phases : requêtes ensemblistes
+    purged = purge_tournament_structure(db, tournament_id)
+    deleted_matches = purged["deleted_matches"]
+    deleted_pools = purged["deleted_pools"]
+    deleted_phases = purged["deleted_phases"]
     
     db.commit()
+    match_index.invalidate_tournament(tournament_id)
     
     return create_success_response(
         {
@@ -1672,19 +1599,10 @@ def delete_tournament_matches_only(
     if not tournament:
         raise NotFoundError(f"Tournament {tournament_id} not found")
     
-    deleted_matches = 0
-    
-    # Récupérer toutes les phases du tournoi
-    phases = db.query(TournamentPhase).filter(
-        TournamentPhase.tournament_id == tournament_id
-    ).all()
-    
-    for phase in phases:
-        # Supprimer tous les matchs de cette phase
-        match_count = db.query(Match).filter(Match.phase_id == phase.id).delete()
-        deleted_matches += match_count
+    deleted_matches = purge_tournament_structure(db, tournament_id, keep_phases=True)["deleted_matches"]
     
     db.commit()
+    match_index.invalidate_tournament(tournament_id)
     
     return create_success_response(
         {
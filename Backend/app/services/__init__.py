@@ -19,7 +19,9 @@ from app.services.matchschedule_service import MatchScheduleService
 from app.services.court_service import CourtService
 from app.services.player_service import PlayerService
 from app.services.user_service import UserService
-from app.services.live_score_service import LiveScoreManager, LiveScoreData, live_score_manager
+from app.services.live_score_service import LiveScoreManager, LiveScoreData, LiveScoreSubscription, live_score_manager
+from app.services.match_index import MatchIndex, match_index
+from app.services.sse_connections import SSEConnectionRegistry, sse_connections
 
 __all__ = [
     "BaseService",
@@ -41,5 +43,10 @@ __all__ = [
     "UserService",
     "LiveScoreManager",
     "LiveScoreData",
+    "LiveScoreSubscription",
     "live_score_manager",
+    "MatchIndex",
+    "match_index",
+    "SSEConnectionRegistry",
+    "sse_connections",
 ]
@@ -0,0 +1,294 @@
+"""
+Live Score Bus - Fan-out backends for live score updates
+Lets several uvicorn workers share the updates published by the scorer tablets.
+
+- InMemoryLiveScoreBus: delivers updates inside the current process (default)
+- SQLiteLiveScoreBus: shares updates between the processes of one host through
+  an append-only SQLite table polled by every worker
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.json_encoder import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+BusHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class LiveScoreBus(ABC):
+    """
+    Base class for live score fan-out backends.
+
+    A backend receives messages (plain JSON-serializable dicts) through `publish`
+    and hands every message, including the ones published by other processes,
+    to the handler registered with `start`.
+
+    Before delivery, the bus stamps each message with `seq`, a per-match sequence
+    number that increases monotonically across every process sharing the bus.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._handler: Optional[BusHandler] = None
+
+    async def start(self, handler: BusHandler) -> None:
+        """Register the handler receiving every published message"""
+        self._handler = handler
+
+    @abstractmethod
+    async def publish(self, message: Dict[str, Any]) -> None:
+        """Publish a message to every process sharing this bus"""
+
+    async def stop(self) -> None:
+        """Release the resources held by the backend"""
+        self._handler = None
+
+    @abstractmethod
+    async def seed_sequence(self, match_id: int, seq: int) -> None:
+        """Make the numbering of a match resume after `seq` (restored scores)"""
+
+    def forget_match(self, match_id: int) -> None:
+        """Release the per-match state kept by this process (match cleared or evicted)"""
+
+    async def _dispatch(self, message: Dict[str, Any]) -> None:
+        if self._handler is None:
+            logger.warning("[LIVE BUS] Message dropped: bus not started")
+            return
+        try:
+            await self._handler(message)
+        except Exception as e:
+            logger.error(f"[LIVE BUS] Error while handling message: {e}")
+
+
+class InMemoryLiveScoreBus(LiveScoreBus):
+    """Process-local bus: messages are handed directly to the handler"""
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        # match_id -> last sequence number
+        self._sequences: Dict[int, int] = {}
+
+    async def seed_sequence(self, match_id: int, seq: int) -> None:
+        if seq > self._sequences.get(match_id, 0):
+            self._sequences[match_id] = seq
+
+    def forget_match(self, match_id: int) -> None:
+        self._sequences.pop(match_id, None)
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        match_id = message["match_id"]
+        message["seq"] = self._sequences.get(match_id, 0) + 1
+        self._sequences[match_id] = message["seq"]
+        await self._dispatch(message)
+
+
+class SQLiteLiveScoreBus(LiveScoreBus):
+    """
+    Host-wide bus backed by an append-only SQLite table.
+
+    - `publish` appends the message to the table and dispatches it locally right away
+    - a background task polls the rows appended by the other workers
+    - old rows are pruned after `retention_seconds`
+    - sequences are shared by the workers of the host: `forget_match` keeps them
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        poll_interval: float = 0.05,
+        retention_seconds: int = 300,
+    ):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+
+        # Identifies the rows written by this process
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+        self._last_id = 0
+        self._poll_task: Optional[asyncio.Task] = None
+        self._last_prune = 0.0
+
+    # ------------------------------------------------------------------
+    # Blocking SQLite helpers (run in a worker thread)
+    # ------------------------------------------------------------------
+
+    def _open(self) -> int:
+        db_dir = os.path.dirname(self.path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS live_score_bus ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " origin TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " created_at REAL NOT NULL"
+            ")"
+        )
+        # Sequence numbers shared by every worker (kept when the bus is pruned)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS live_score_seq ("
+            " match_id INTEGER PRIMARY KEY,"
+            " seq INTEGER NOT NULL"
+            ")"
+        )
+        conn.commit()
+        self._conn = conn
+
+        row = conn.execute("SELECT COALESCE(MAX(id), 0) FROM live_score_bus").fetchone()
+        return row[0]
+
+    def _insert(self, message: Dict[str, Any]) -> int:
+        with self._conn_lock:
+            # Bump the sequence and append the message in one write transaction
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO live_score_seq (match_id, seq) VALUES (?, 1) "
+                    "ON CONFLICT(match_id) DO UPDATE SET seq = seq + 1",
+                    (message["match_id"],),
+                )
+                message["seq"] = self._conn.execute(
+                    "SELECT seq FROM live_score_seq WHERE match_id = ?",
+                    (message["match_id"],),
+                ).fetchone()[0]
+                cursor = self._conn.execute(
+                    "INSERT INTO live_score_bus (origin, payload, created_at) VALUES (?, ?, ?)",
+                    (self.origin, dumps_bytes(message).decode("utf-8"), time.time()),
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            return cursor.lastrowid
+
+    def _seed_sequence(self, match_id: int, seq: int) -> None:
+        with self._conn_lock:
+            self._conn.execute(
+                "INSERT INTO live_score_seq (match_id, seq) VALUES (?, ?) "
+                "ON CONFLICT(match_id) DO UPDATE SET seq = MAX(seq, excluded.seq)",
+                (match_id, seq),
+            )
+
+    def _fetch_since(self, last_id: int) -> List[Tuple[int, str, str]]:
+        with self._conn_lock:
+            return self._conn.execute(
+                "SELECT id, origin, payload FROM live_score_bus WHERE id > ? ORDER BY id",
+                (last_id,),
+            ).fetchall()
+
+    def _prune(self) -> None:
+        with self._conn_lock:
+            self._conn.execute(
+                "DELETE FROM live_score_bus WHERE created_at < ?",
+                (time.time() - self.retention_seconds,),
+            )
+            self._conn.commit()
+
+    def _close(self) -> None:
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    # LiveScoreBus API
+    # ------------------------------------------------------------------
+
+    async def start(self, handler: BusHandler) -> None:
+        await super().start(handler)
+        self._last_id = await asyncio.to_thread(self._open)
+        self._poll_task = asyncio.create_task(self._poll_loop())
+        logger.info(f"[LIVE BUS] SQLite bus started on {self.path} (origin={self.origin})")
+
+    async def publish(self, message: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._insert, message)
+        # Local subscribers do not wait for the next poll
+        await self._dispatch(message)
+
+    async def seed_sequence(self, match_id: int, seq: int) -> None:
+        await asyncio.to_thread(self._seed_sequence, match_id, seq)
+
+    async def stop(self) -> None:
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+        await asyncio.to_thread(self._close)
+        await super().stop()
+        logger.info("[LIVE BUS] SQLite bus stopped")
+
+    async def _poll_loop(self) -> None:
+        """Deliver the messages appended by the other workers"""
+        while True:
+            try:
+                rows = await asyncio.to_thread(self._fetch_since, self._last_id)
+                for row_id, origin, payload in rows:
+                    self._last_id = row_id
+                    if origin == self.origin:
+                        continue
+                    await self._dispatch(json.loads(payload))
+
+                now = time.monotonic()
+                if now - self._last_prune > 60:
+                    self._last_prune = now
+                    await asyncio.to_thread(self._prune)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[LIVE BUS] Polling error: {e}")
+
+            await asyncio.sleep(self.poll_interval)
+
+
+def default_data_path(filename: str) -> str:
+    """Place a live score side file next to the SQLite database"""
+    db_dir = "data"
+    if "sqlite" in settings.DATABASE_URL:
+        db_dir = os.path.dirname(settings.DATABASE_URL.replace("sqlite:///", "")) or "."
+    return os.path.join(db_dir, filename)
+
+
+def create_live_score_bus() -> LiveScoreBus:
+    """Build the bus backend selected by LIVE_SCORE_BUS_BACKEND"""
+    backend = settings.LIVE_SCORE_BUS_BACKEND.lower()
+
+    if backend == "memory":
+        return InMemoryLiveScoreBus()
+
+    if backend == "sqlite":
+        return SQLiteLiveScoreBus(
+            path=settings.LIVE_SCORE_BUS_PATH or default_data_path("live_score_bus.db"),
+            poll_interval=settings.LIVE_SCORE_BUS_POLL_INTERVAL,
+            retention_seconds=settings.LIVE_SCORE_BUS_RETENTION_SECONDS,
+        )
+
+    raise ValueError(f"Unknown LIVE_SCORE_BUS_BACKEND: {settings.LIVE_SCORE_BUS_BACKEND}")
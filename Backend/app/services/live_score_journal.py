@@ -0,0 +1,224 @@
+"""
+Live Score Journal - Write-behind persistence of live scores
+Lets the live score store survive a container restart in the middle of a match.
+
+- `record` only appends to an in-memory buffer (no I/O on the request path)
+- a background task flushes the buffer in batches into an append-only SQLite table
+- a tombstone (match cleared or evicted) deletes the rows of the match, so it is not restored
+- `load_latest` returns the latest state of each match to rebuild the store at startup
+- `compact` keeps only the latest row of each match
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.live_score_bus import default_data_path
+from app.utils.json_encoder import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class LiveScoreJournal:
+    """Append-only SQLite journal of live score updates, flushed in batches"""
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 0.5,
+        batch_size: int = 200,
+        compact_interval: int = 600,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.compact_interval = compact_interval
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+        # (match_id, seq, payload, created_at); payload None = tombstone
+        self._buffer: List[Tuple[int, int, Optional[str], float]] = []
+        self._wakeup = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_compact = time.monotonic()
+
+        # Counters
+        self.recorded = 0
+        self.flushed = 0
+
+    # ------------------------------------------------------------------
+    # Blocking SQLite helpers (run in a worker thread)
+    # ------------------------------------------------------------------
+
+    def _open(self) -> None:
+        db_dir = os.path.dirname(self.path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS live_score_journal ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " match_id INTEGER NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " created_at REAL NOT NULL"
+            ")"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_live_score_journal_match_seq "
+            "ON live_score_journal (match_id, seq)"
+        )
+        conn.commit()
+        self._conn = conn
+
+    def _write(self, rows: List[Tuple[int, int, Optional[str], float]]) -> None:
+        with self._conn_lock:
+            inserts = []
+            for row in rows:
+                if row[2] is not None:
+                    inserts.append(row)
+                    continue
+                # Tombstone: write the updates buffered before it, then forget the match
+                self._insert(inserts)
+                inserts = []
+                self._conn.execute("DELETE FROM live_score_journal WHERE match_id = ?", (row[0],))
+            self._insert(inserts)
+            self._conn.commit()
+
+    def _insert(self, rows: List[Tuple[int, int, str, float]]) -> None:
+        if rows:
+            self._conn.executemany(
+                "INSERT INTO live_score_journal (match_id, seq, payload, created_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def _load_latest(self) -> List[Dict[str, Any]]:
+        with self._conn_lock:
+            rows = self._conn.execute(
+                "SELECT j.payload FROM live_score_journal j"
+                " JOIN (SELECT match_id, MAX(seq) AS seq FROM live_score_journal GROUP BY match_id) latest"
+                " ON latest.match_id = j.match_id AND latest.seq = j.seq"
+                " GROUP BY j.match_id"
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def _compact(self) -> int:
+        with self._conn_lock:
+            cursor = self._conn.execute(
+                "DELETE FROM live_score_journal WHERE id NOT IN ("
+                " SELECT MAX(j.id) FROM live_score_journal j"
+                " JOIN (SELECT match_id, MAX(seq) AS seq FROM live_score_journal GROUP BY match_id) latest"
+                " ON latest.match_id = j.match_id AND latest.seq = j.seq"
+                " GROUP BY j.match_id"
+                ")"
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def _close(self) -> None:
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def open(self) -> None:
+        """Open (and create if needed) the journal file"""
+        await asyncio.to_thread(self._open)
+        logger.info(f"[LIVE JOURNAL] Opened {self.path}")
+
+    async def load_latest(self) -> List[Dict[str, Any]]:
+        """Latest journaled state of every match (LiveScoreData.to_dict form)"""
+        return await asyncio.to_thread(self._load_latest)
+
+    async def compact(self) -> int:
+        """Keep only the latest state of each match, returns the number of deleted rows"""
+        deleted = await asyncio.to_thread(self._compact)
+        self._last_compact = time.monotonic()
+        if deleted:
+            logger.info(f"[LIVE JOURNAL] Compacted {deleted} rows")
+        return deleted
+
+    def start(self) -> None:
+        """Start the background flush task"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def record(self, message: Dict[str, Any]) -> None:
+        """Buffer an update (LiveScoreData.to_dict form) or a tombstone without any I/O"""
+        self._buffer.append((
+            message["match_id"],
+            message.get("seq", 0),
+            None if message.get("cleared") else dumps_bytes(message).decode("utf-8"),
+            time.time(),
+        ))
+        self.recorded += 1
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Write the buffered updates in a single batch"""
+        if not self._buffer or self._conn is None:
+            return
+        rows, self._buffer = self._buffer, []
+        try:
+            await asyncio.to_thread(self._write, rows)
+            self.flushed += len(rows)
+        except Exception as e:
+            # Keep the rows for the next attempt
+            self._buffer = rows + self._buffer
+            logger.error(f"[LIVE JOURNAL] Flush error: {e}")
+
+    async def close(self) -> None:
+        """Stop the flush task, write the remaining updates and close the file"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        await asyncio.to_thread(self._close)
+        logger.info("[LIVE JOURNAL] Closed")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            await self.flush()
+
+            if time.monotonic() - self._last_compact > self.compact_interval:
+                try:
+                    await self.compact()
+                except Exception as e:
+                    logger.error(f"[LIVE JOURNAL] Compaction error: {e}")
+
+
+def create_live_score_journal() -> Optional[LiveScoreJournal]:
+    """Build the journal configured by LIVE_SCORE_JOURNAL_* (None if disabled)"""
+    if not settings.LIVE_SCORE_JOURNAL_ENABLED:
+        return None
+    return LiveScoreJournal(
+        path=settings.LIVE_SCORE_JOURNAL_PATH or default_data_path("live_score_journal.db"),
+        flush_interval=settings.LIVE_SCORE_JOURNAL_FLUSH_INTERVAL,
+        batch_size=settings.LIVE_SCORE_JOURNAL_BATCH_SIZE,
+        compact_interval=settings.LIVE_SCORE_JOURNAL_COMPACT_INTERVAL,
+    )
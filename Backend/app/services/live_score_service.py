@@ -4,41 +4,272 @@ Handles in-memory storage and broadcasting of live match scores across devices.
 """
 
 import asyncio
-import json
 import logging
+import time
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, Optional, Set
+from typing import Any, Dict, List, Optional, Set
+
+from app.config import settings
+from app.services.live_score_bus import LiveScoreBus, InMemoryLiveScoreBus, create_live_score_bus
+from app.services.live_score_journal import LiveScoreJournal, create_live_score_journal
+from app.utils.json_encoder import dumps_bytes
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# Subscription topics: "match:{id}", "tournament:{id}", "court:{id}" and "live:all"
+TOPIC_KINDS = ("match", "tournament", "court")
+LIVE_ALL_TOPIC = "live:all"
+
+
+def match_topic(match_id: int) -> str:
+    """Topic of a single match"""
+    return f"match:{match_id}"
+
+
+def parse_topic(value: str) -> str:
+    """
+    Validate and normalize a subscription topic.
+
+    Raises:
+        ValueError: if the topic is not "live:all" or "<match|tournament|court>:<int>"
+    """
+    value = value.strip()
+    if value == LIVE_ALL_TOPIC:
+        return value
+    kind, _, object_id = value.partition(":")
+    if kind not in TOPIC_KINDS:
+        raise ValueError(f"Unknown topic: {value}")
+    return f"{kind}:{int(object_id)}"
+
+
+@dataclass(slots=True)
 class LiveScoreData:
-    """Represents live score data for a match"""
+    """Represents live score data for a match (slotted: thousands are kept over an event)"""
     match_id: int
     sport: str
     data: Dict[str, Any]
     updated_at: datetime = field(default_factory=datetime.utcnow)
+    # Per-match sequence number, assigned by the bus
+    seq: int = 0
+    # Routing tags for topic subscriptions
+    tournament_id: Optional[int] = None
+    court_id: Optional[int] = None
+    # Position in this process's stream of stored updates and its SSE event id, assigned by the manager
+    stream_position: int = field(default=0, init=False, compare=False)
+    stream_id: str = field(default="", init=False, compare=False)
+    # SSE frames, encoded once and shared by every subscriber
+    _sse_frame: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _delta_frame: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _sse_event: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _delta_event: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "match_id": self.match_id,
             "sport": self.sport,
             "data": self.data,
-            "updated_at": self.updated_at.isoformat()
+            "updated_at": self.updated_at.isoformat(),
+            "seq": self.seq,
+            "tournament_id": self.tournament_id,
+            "court_id": self.court_id
         }
 
-    def to_sse_event(self) -> str:
-        """Format as SSE event string"""
-        payload = json.dumps({
-            "event": "score_update",
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "LiveScoreData":
+        """Rebuild a LiveScoreData from its `to_dict` form (bus messages)"""
+        return cls(
+            match_id=payload["match_id"],
+            sport=payload["sport"],
+            data=payload["data"],
+            updated_at=datetime.fromisoformat(payload["updated_at"]),
+            seq=payload.get("seq", 0),
+            tournament_id=payload.get("tournament_id"),
+            court_id=payload.get("court_id")
+        )
+
+    def topics(self) -> List[str]:
+        """Subscription topics this update is published on"""
+        topics = [match_topic(self.match_id), LIVE_ALL_TOPIC]
+        if self.tournament_id is not None:
+            topics.append(f"tournament:{self.tournament_id}")
+        if self.court_id is not None:
+            topics.append(f"court:{self.court_id}")
+        return topics
+
+    @property
+    def sse_frame(self) -> bytes:
+        """SSE event frame, serialized on first access and reused afterwards"""
+        if self._sse_frame is None:
+            payload = dumps_bytes({
+                "event": "score_update",
+                "match_id": self.match_id,
+                "sport": self.sport,
+                "seq": self.seq,
+                "data": self.data,
+                "timestamp": self.updated_at.isoformat()
+            })
+            self._sse_frame = b"data: " + payload + b"\n\n"
+        return self._sse_frame
+
+    def prime_frames(self) -> None:
+        """Encode the full SSE frame now, under the manager lock, instead of on first send"""
+        self.sse_frame
+
+    @property
+    def delta_frame(self) -> Optional[bytes]:
+        """SSE frame carrying only the fields changed since seq - 1 (None for keyframes)"""
+        return self._delta_frame
+
+    def build_delta(self, previous: "LiveScoreData") -> None:
+        """Encode the delta frame against the previous state of the match (seq - 1)"""
+        changed = {
+            key: value
+            for key, value in self.data.items()
+            if key not in previous.data or previous.data[key] != value
+        }
+        removed = [key for key in previous.data if key not in self.data]
+        payload = dumps_bytes({
+            "event": "score_delta",
             "match_id": self.match_id,
             "sport": self.sport,
-            "data": self.data,
+            "seq": self.seq,
+            "data": changed,
+            "removed": removed,
             "timestamp": self.updated_at.isoformat()
         })
-        return f"data: {payload}\n\n"
+        self._delta_frame = b"data: " + payload + b"\n\n"
+
+    def frame_after(self, last_seq: Optional[int], delta: bool = False) -> bytes:
+        """
+        Frame to send to a client whose last received event for this match is `last_seq`.
+        A delta is only valid if the client holds the immediately preceding state.
+        """
+        if delta and self._delta_frame is not None and last_seq == self.seq - 1:
+            return self._delta_frame
+        return self.sse_frame
+
+    def event_after(self, last_seq: Optional[int], delta: bool = False) -> bytes:
+        """`frame_after` preceded by the `id:` line of the update, encoded once for every subscriber"""
+        frame = self.frame_after(last_seq, delta)
+        if frame is self._delta_frame:
+            if self._delta_event is None:
+                self._delta_event = b"id: " + self.stream_id.encode() + b"\n" + frame
+            return self._delta_event
+        if self._sse_event is None:
+            self._sse_event = b"id: " + self.stream_id.encode() + b"\n" + frame
+        return self._sse_event
+
+    def to_sse_event(self) -> str:
+        """Format as SSE event string"""
+        return self.sse_frame.decode("utf-8")
+
+
+def format_stream_id(epoch: str, position: int) -> str:
+    """Encode a stream position as an SSE event id: '<epoch>-<position>'"""
+    return f"{epoch}-{position}"
+
+
+def parse_stream_id(value: Optional[str], epoch: str) -> Optional[int]:
+    """
+    Decode a Last-Event-ID produced by `format_stream_id`.
+
+    Returns:
+        The stream position, or None if the id is invalid or comes from another
+        process (restart, other worker): the client then needs the full state
+    """
+    if not value:
+        return None
+    value_epoch, _, position = value.strip().rpartition("-")
+    if value_epoch != epoch:
+        return None
+    try:
+        return int(position)
+    except ValueError:
+        return None
+
+
+# Returned by LiveScoreSubscription.get when the stream should write a keepalive
+KEEPALIVE = object()
+
+
+class LiveScoreSubscription:
+    """
+    Mailbox of one SSE client, keeping only the latest pending state per match.
+
+    - `offer` never blocks: a newer score replaces the pending one of the same match
+    - updates are delivered in stream order (a replaced update moves to the back), so the
+      stream position of the last delivered event is a valid resume point
+    - memory is bounded by the number of subscribed matches, not by the number of updates
+    - `request_keepalive` wakes an idle stream so it writes a keepalive comment
+    - once closed (client gone), offered updates are dropped
+    """
+
+    def __init__(self, topics: list[str]):
+        self.topics = list(topics)
+        # match_id -> pending LiveScoreData (ordered by stream position)
+        self._pending: Dict[int, LiveScoreData] = {}
+        self._event = asyncio.Event()
+        self._keepalive = False
+        self.closed = False
+
+        # Counters
+        self.delivered = 0
+        self.coalesced = 0
+
+    def offer(self, score_data: LiveScoreData) -> bool:
+        """
+        Deposit an update without blocking.
+
+        Returns:
+            True if the update replaced a pending one (coalesced)
+        """
+        coalesced = self._pending.pop(score_data.match_id, None) is not None
+        if coalesced:
+            self.coalesced += 1
+        self._pending[score_data.match_id] = score_data
+        self._event.set()
+        return coalesced
+
+    def request_keepalive(self) -> None:
+        """Wake the stream so it writes a keepalive (ignored if an update is pending)"""
+        self._keepalive = True
+        self._event.set()
+
+    async def get(self) -> Any:
+        """
+        Wait for the next pending update.
+
+        Returns:
+            The oldest pending update, KEEPALIVE when a keepalive was requested
+            while idle, or None once the subscription is closed
+        """
+        while not self._pending:
+            if self.closed:
+                return None
+            if self._keepalive:
+                self._keepalive = False
+                return KEEPALIVE
+            self._event.clear()
+            await self._event.wait()
+
+        self._keepalive = False
+
+        match_id = next(iter(self._pending))
+        self.delivered += 1
+        return self._pending.pop(match_id)
+
+    def pending_count(self) -> int:
+        """Number of matches with an undelivered update"""
+        return len(self._pending)
+
+    def close(self) -> None:
+        """Close the mailbox and release the pending updates"""
+        self.closed = True
+        self._pending.clear()
+        self._event.set()
 
 
 class LiveScoreManager:
@@ -48,6 +279,12 @@ class LiveScoreManager:
     - Stores live scores in-memory (fast, ephemeral)
     - Manages SSE client subscriptions per match
     - Broadcasts updates to all subscribed clients
+    - Publishes updates through a LiveScoreBus so that every uvicorn worker
+      sharing the bus receives them (in-memory bus by default)
+    - Journals updates (write-behind) and restores the latest scores on startup
+    - Coalesces bursts of updates of a match: at most one publication per window
+    - Evicts finished matches (clear_match), idle ones (TTL) and the least recently
+      updated ones beyond the memory budget (LRU)
     """
 
     _instance: Optional["LiveScoreManager"] = None
@@ -62,46 +299,329 @@ class LiveScoreManager:
         if self._initialized:
             return
 
-        # In-memory storage: match_id -> LiveScoreData
+        # In-memory storage: match_id -> LiveScoreData (ordered from least to most recently updated)
         self._scores: Dict[int, LiveScoreData] = {}
-
-        # SSE subscriptions: match_id -> set of asyncio.Queue
-        self._subscriptions: Dict[int, Set[asyncio.Queue]] = {}
+        self._max_matches = settings.LIVE_SCORE_MAX_MATCHES
+        self._idle_ttl = settings.LIVE_SCORE_IDLE_TTL_SECONDS
+        self._sweep_task: Optional[asyncio.Task] = None
+
+        # Stream of stored updates: SSE event ids are "<epoch>-<position>", the epoch
+        # identifying this process (a position from another process is not resumable)
+        self.stream_epoch = uuid.uuid4().hex[:8]
+        self._stream_position = 0
+        self._keyframe_interval = settings.LIVE_SCORE_KEYFRAME_INTERVAL
+
+        # SSE subscriptions: topic -> set of LiveScoreSubscription
+        self._subscriptions: Dict[str, Set[LiveScoreSubscription]] = {}
+
+        # Stored scores indexed by topic: topic -> set of match_id
+        self._topic_matches: Dict[str, Set[int]] = {}
+
+        # Last message seq applied per scorer (WebSocket ingestion): match_id -> {scorer: seq}
+        self._scorer_seqs: Dict[int, Dict[str, int]] = {}
+
+        # Coalescing window: last publication time and pending update per match
+        self._last_publish: Dict[int, float] = {}
+        self._pending_publish: Dict[int, LiveScoreData] = {}
+        self._flush_tasks: Dict[int, asyncio.Task] = {}
+
+        # Broadcast counters
+        self._stats: Dict[str, int] = {
+            "window_coalesced": 0,
+            "broadcasts": 0,
+            "delivered": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "cleared": 0,
+            "evicted_idle": 0,
+            "evicted_lru": 0,
+        }
 
         # Lock for thread-safe operations
         self._lock = asyncio.Lock()
 
+        # Fan-out backend (replaced by the configured one in start())
+        self._bus: LiveScoreBus = InMemoryLiveScoreBus()
+        self._bus_started = False
+
+        # Write-behind journal (opened in start())
+        self._journal: Optional[LiveScoreJournal] = None
+
         self._initialized = True
         logger.info("LiveScoreManager initialized")
 
-    async def update_score(self, match_id: int, sport: str, data: Dict[str, Any]) -> LiveScoreData:
+    async def start(
+        self,
+        bus: Optional[LiveScoreBus] = None,
+        journal: Optional[LiveScoreJournal] = None,
+    ) -> None:
         """
-        Update live score for a match and broadcast to all subscribers.
+        Start the fan-out bus and restore the journaled scores (called at application startup).
+
+        Args:
+            bus: Backend to use, defaults to the one selected by LIVE_SCORE_BUS_BACKEND
+            journal: Journal to use, defaults to the one configured by LIVE_SCORE_JOURNAL_*
+        """
+        if self._bus_started:
+            return
+        self._bus = bus or create_live_score_bus()
+        await self._bus.start(self._on_bus_message)
+        self._bus_started = True
+        logger.info(f"LiveScoreManager started with '{self._bus.name}' bus")
+
+        self._journal = journal or create_live_score_journal()
+        if self._journal is not None:
+            try:
+                await self._journal.open()
+                await self._restore(await self._journal.load_latest())
+                await self._journal.compact()
+                self._journal.start()
+            except Exception as e:
+                logger.error(f"Live score journal unavailable, scores will not be persisted: {e}")
+                self._journal = None
+
+        if self._idle_ttl > 0 and self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        """Flush the journal and stop the fan-out bus (called at application shutdown)"""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+
+        # Publish the updates still waiting for their coalescing window
+        for task in self._flush_tasks.values():
+            task.cancel()
+        self._flush_tasks.clear()
+        pending, self._pending_publish = self._pending_publish, {}
+        if self._bus_started:
+            for score_data in pending.values():
+                await self._publish(score_data)
+
+        if self._journal is not None:
+            await self._journal.close()
+            self._journal = None
+        if not self._bus_started:
+            return
+        await self._bus.stop()
+        self._bus_started = False
+
+    async def _restore(self, messages: List[Dict[str, Any]]) -> None:
+        """Rebuild the in-memory store from journaled states"""
+        async with self._lock:
+            for message in messages:
+                if message.get("cleared"):
+                    # Tombstone: the match ended before the restart
+                    continue
+                score_data = LiveScoreData.from_dict(message)
+                current = self._scores.get(score_data.match_id)
+                if current is not None and current.seq >= score_data.seq:
+                    continue
+                self._store(score_data, current)
+
+        for message in messages:
+            await self._bus.seed_sequence(message["match_id"], message.get("seq", 0))
+
+        logger.info(f"LiveScoreManager restored {len(messages)} live scores from journal")
+
+    async def update_score(
+        self,
+        match_id: int,
+        sport: str,
+        data: Dict[str, Any],
+        tournament_id: Optional[int] = None,
+        court_id: Optional[int] = None,
+    ) -> LiveScoreData:
+        """
+        Update live score for a match and publish it on the bus.
+        Every worker sharing the bus stores it and broadcasts it to its subscribers.
+
+        Within the coalescing window of the sport, the update replaces the pending one
+        and is published when the window ends; this call returns immediately in both
+        cases. A pending update keeps seq 0: the bus only assigns it on publication
+        (the SQLite bus shares sequences between workers, so it cannot be predicted).
 
         Args:
             match_id: The match ID
             sport: Sport type (volleyball, badminton, petanque, flechettes)
             data: Sport-specific score data
+            tournament_id: Tournament of the match (routes "tournament:{id}" subscriptions)
+            court_id: Court of the match (routes "court:{id}" subscriptions)
 
         Returns:
             The updated LiveScoreData
         """
-        async with self._lock:
-            score_data = LiveScoreData(
-                match_id=match_id,
-                sport=sport,
-                data=data,
-                updated_at=datetime.utcnow()
-            )
-            self._scores[match_id] = score_data
-
-        # Broadcast to subscribers (outside lock to avoid blocking)
-        logger.info(f"[SSE UPDATE] About to broadcast match {match_id}, subscriptions: {list(self._subscriptions.keys())}")
-        await self._broadcast(match_id, score_data)
-
-        logger.info(f"[SSE UPDATE] Score updated for match {match_id}: {sport}")
+        score_data = LiveScoreData(
+            match_id=match_id,
+            sport=sport,
+            data=data,
+            updated_at=datetime.utcnow(),
+            tournament_id=tournament_id,
+            court_id=court_id
+        )
+
+        if not self._bus_started:
+            await self.start()
+
+        window = self._coalesce_window(sport)
+        if window > 0:
+            now = time.monotonic()
+            last = self._last_publish.get(match_id)
+            if match_id in self._pending_publish or (last is not None and now - last < window):
+                # Burst: keep only the latest state until the end of the window
+                if match_id in self._pending_publish:
+                    self._stats["window_coalesced"] += 1
+                self._pending_publish[match_id] = score_data
+                if match_id not in self._flush_tasks:
+                    delay = window - (now - last) if last is not None else window
+                    self._flush_tasks[match_id] = asyncio.create_task(self._flush_after(match_id, delay))
+                return score_data
+
+        await self._publish(score_data)
         return score_data
 
+    def _coalesce_window(self, sport: str) -> float:
+        """Coalescing window of a sport, in seconds"""
+        window_ms = settings.LIVE_SCORE_COALESCE_WINDOW_BY_SPORT.get(sport, settings.LIVE_SCORE_COALESCE_WINDOW_MS)
+        return window_ms / 1000
+
+    async def _flush_after(self, match_id: int, delay: float) -> None:
+        """Publish the pending update of a match once its coalescing window ends"""
+        try:
+            await asyncio.sleep(max(delay, 0))
+        finally:
+            # clear_match may have replaced this task by a newer one meanwhile
+            if self._flush_tasks.get(match_id) is asyncio.current_task():
+                self._flush_tasks.pop(match_id, None)
+        score_data = self._pending_publish.pop(match_id, None)
+        if score_data is not None:
+            await self._publish(score_data)
+
+    async def _publish(self, score_data: LiveScoreData) -> None:
+        """Publish an update on the bus and journal it"""
+        match_id = score_data.match_id
+        self._last_publish[match_id] = time.monotonic()
+
+        logger.info(f"[SSE UPDATE] About to publish match {match_id} on '{self._bus.name}' bus")
+        message = score_data.to_dict()
+        await self._bus.publish(message)
+        score_data.seq = message["seq"]
+
+        if self._journal is not None:
+            self._journal.record(message)
+
+        logger.info(f"[SSE UPDATE] Score updated for match {match_id}: {score_data.sport}")
+
+    async def _on_bus_message(self, message: Dict[str, Any]) -> None:
+        """Store and broadcast an update received from the bus (local or remote)"""
+        if message.get("cleared"):
+            async with self._lock:
+                current = self._scores.get(message["match_id"])
+                if current is None or current.seq < message["seq"]:
+                    self._evict(message["match_id"])
+                    self._stats["cleared"] += 1
+            return
+
+        score_data = LiveScoreData.from_dict(message)
+
+        async with self._lock:
+            current = self._scores.get(score_data.match_id)
+            # Ignore updates older than the stored one (late delivery from another worker)
+            if current is not None and current.seq >= score_data.seq:
+                return
+
+            self._store(score_data, current)
+
+            # Serialize once for all subscribers: full frame, plus a delta between keyframes
+            score_data.prime_frames()
+            if (
+                current is not None
+                and self._keyframe_interval > 0
+                and current.seq == score_data.seq - 1
+                and score_data.seq % self._keyframe_interval != 0
+            ):
+                score_data.build_delta(current)
+
+        # Broadcast to subscribers (outside lock, never blocks)
+        self._broadcast(score_data)
+
+    def _store(self, score_data: LiveScoreData, previous: Optional[LiveScoreData]) -> None:
+        """Store a score, give it the next stream position and index it by topic"""
+        match_id = score_data.match_id
+        # Re-insert to keep _scores ordered by last update (LRU and stream order)
+        self._scores.pop(match_id, None)
+        self._scores[match_id] = score_data
+        self._stream_position += 1
+        score_data.stream_position = self._stream_position
+        score_data.stream_id = format_stream_id(self.stream_epoch, self._stream_position)
+
+        topics = score_data.topics()
+        if previous is not None:
+            for topic in previous.topics():
+                if topic not in topics:
+                    self._unindex(topic, match_id)
+        for topic in topics:
+            self._topic_matches.setdefault(topic, set()).add(match_id)
+
+        # Memory budget: evict the least recently updated matches
+        while self._max_matches > 0 and len(self._scores) > self._max_matches:
+            oldest = next(iter(self._scores))
+            self._evict(oldest)
+            self._journal_tombstone(oldest)
+            self._stats["evicted_lru"] += 1
+            logger.info(f"[LIVE EVICT] Match {oldest} evicted (memory budget of {self._max_matches} matches)")
+
+    def _evict(self, match_id: int) -> None:
+        """Drop a match from the hot store (score, topic index)"""
+        score_data = self._scores.pop(match_id, None)
+        self._last_publish.pop(match_id, None)
+        self._scorer_seqs.pop(match_id, None)
+        self._bus.forget_match(match_id)
+        if score_data is not None:
+            for topic in score_data.topics():
+                self._unindex(topic, match_id)
+
+    def _journal_tombstone(self, match_id: int) -> None:
+        """Forget an evicted match in the journal so it is not restored after a restart"""
+        if self._journal is not None:
+            self._journal.record({"match_id": match_id, "cleared": True, "updated_at": datetime.utcnow().isoformat()})
+
+    def evict_idle(self, now: Optional[datetime] = None) -> int:
+        """Evict the matches without update for LIVE_SCORE_IDLE_TTL_SECONDS, returns their number"""
+        if self._idle_ttl <= 0:
+            return 0
+        now = now or datetime.utcnow()
+        idle = [
+            match_id
+            for match_id, score_data in self._scores.items()
+            if (now - score_data.updated_at).total_seconds() > self._idle_ttl
+            and match_id not in self._pending_publish
+        ]
+        for match_id in idle:
+            self._evict(match_id)
+            self._journal_tombstone(match_id)
+        if idle:
+            self._stats["evicted_idle"] += len(idle)
+            logger.info(f"[LIVE EVICT] {len(idle)} idle matches evicted: {idle}")
+        return len(idle)
+
+    async def _sweep_loop(self) -> None:
+        interval = min(60.0, self._idle_ttl)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self._lock:
+                    self.evict_idle()
+            except Exception as e:
+                logger.error(f"[LIVE EVICT] Sweep error: {e}")
+
+    def _unindex(self, topic: str, match_id: int) -> None:
+        match_ids = self._topic_matches.get(topic)
+        if match_ids is not None:
+            match_ids.discard(match_id)
+            if not match_ids:
+                del self._topic_matches[topic]
+
     async def get_score(self, match_id: int) -> Optional[LiveScoreData]:
         """Get current live score for a match"""
         return self._scores.get(match_id)
@@ -114,73 +634,130 @@ class LiveScoreManager:
             if mid in self._scores
         }
 
-    async def subscribe(self, match_ids: list[int]) -> asyncio.Queue:
+    def get_topic_match_ids(self, topics: list[str]) -> List[int]:
+        """IDs of the stored matches published on any of the given topics"""
+        match_ids: Set[int] = set()
+        for topic in topics:
+            match_ids.update(self._topic_matches.get(topic, ()))
+        return sorted(match_ids)
+
+    def get_scorer_seq(self, match_id: int, scorer: str) -> int:
+        """Last WebSocket message seq applied for a scorer on a match (0 if none)"""
+        return self._scorer_seqs.get(match_id, {}).get(scorer, 0)
+
+    def set_scorer_seq(self, match_id: int, scorer: str, seq: int) -> None:
+        """Record the last WebSocket message seq applied for a scorer on a match"""
+        self._scorer_seqs.setdefault(match_id, {})[scorer] = seq
+
+    def get_seq(self, match_id: int) -> int:
+        """Get the last sequence number known for a match (0 if none)"""
+        score_data = self._scores.get(match_id)
+        return score_data.seq if score_data else 0
+
+    def get_updates_since(self, topics: list[str], position: Optional[int]) -> List[LiveScoreData]:
+        """
+        Current state of the stored matches of some topics updated after a stream position,
+        in stream order (initial state of a stream; every stored match if `position` is None).
         """
-        Subscribe to live score updates for multiple matches.
+        match_ids = set(self.get_topic_match_ids(topics))
+        return [
+            score_data
+            for match_id, score_data in self._scores.items()
+            if match_id in match_ids and (position is None or score_data.stream_position > position)
+        ]
+
+    async def subscribe(self, topics: list[str]) -> LiveScoreSubscription:
+        """
+        Subscribe to live score updates for several topics.
 
         Args:
-            match_ids: List of match IDs to subscribe to
+            topics: Topics to subscribe to ("match:{id}", "tournament:{id}", "court:{id}", "live:all")
 
         Returns:
-            An asyncio.Queue that will receive LiveScoreData updates
+            A LiveScoreSubscription mailbox that will receive LiveScoreData updates
         """
-        queue: asyncio.Queue = asyncio.Queue()
+        subscription = LiveScoreSubscription(topics)
 
         async with self._lock:
-            for match_id in match_ids:
-                if match_id not in self._subscriptions:
-                    self._subscriptions[match_id] = set()
-                self._subscriptions[match_id].add(queue)
-                logger.info(f"[SSE SUBSCRIBE] Added subscription for match {match_id}, total subscribers: {len(self._subscriptions[match_id])}")
+            for topic in subscription.topics:
+                self._subscriptions.setdefault(topic, set()).add(subscription)
 
-        logger.info(f"[SSE SUBSCRIBE] New subscription for matches: {match_ids}, all subscriptions: {list(self._subscriptions.keys())}")
-        return queue
+        logger.info(f"[SSE SUBSCRIBE] New subscription for topics: {topics}, active topics: {len(self._subscriptions)}")
+        return subscription
 
-    async def unsubscribe(self, queue: asyncio.Queue, match_ids: list[int]) -> None:
+    async def unsubscribe(self, subscription: LiveScoreSubscription) -> None:
         """
-        Unsubscribe from live score updates.
+        Unsubscribe from live score updates and close the mailbox.
 
         Args:
-            queue: The queue to unsubscribe
-            match_ids: List of match IDs to unsubscribe from
+            subscription: The subscription to remove
         """
+        subscription.close()
+
         async with self._lock:
-            for match_id in match_ids:
-                if match_id in self._subscriptions:
-                    self._subscriptions[match_id].discard(queue)
+            for topic in subscription.topics:
+                subscribers = self._subscriptions.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
                     # Cleanup empty subscription sets
-                    if not self._subscriptions[match_id]:
-                        del self._subscriptions[match_id]
+                    if not subscribers:
+                        del self._subscriptions[topic]
 
-        logger.debug(f"Unsubscribed from matches: {match_ids}")
+        logger.debug(f"Unsubscribed from topics: {subscription.topics}")
 
-    async def _broadcast(self, match_id: int, score_data: LiveScoreData) -> None:
-        """Broadcast score update to all subscribers of a match"""
-        subscribers = self._subscriptions.get(match_id, set())
+    def _broadcast(self, score_data: LiveScoreData) -> None:
+        """
+        Deposit a score update in the mailbox of every subscriber of its topics.
+        Costs O(subscribers of those topics); never blocks: a slow subscriber only
+        keeps the latest state of the match.
+        """
+        recipients: Set[LiveScoreSubscription] = set()
+        for topic in score_data.topics():
+            subscribers = self._subscriptions.get(topic)
+            if subscribers:
+                recipients.update(subscribers)
+
+        if not recipients:
+            logger.debug(f"[SSE BROADCAST] No subscribers for match {score_data.match_id}")
+            return
 
-        # Log broadcast attempt with subscriber count
-        logger.info(f"[SSE BROADCAST] Match {match_id}: {len(subscribers)} subscribers, all subscriptions: {list(self._subscriptions.keys())}")
+        self._stats["broadcasts"] += 1
+        delivered = 0
+        for subscription in recipients:
+            if subscription.closed:
+                self._stats["dropped"] += 1
+                continue
+            if subscription.offer(score_data):
+                self._stats["coalesced"] += 1
+            delivered += 1
+        self._stats["delivered"] += delivered
 
-        if not subscribers:
-            logger.warning(f"[SSE BROADCAST] No subscribers for match {match_id} - check if split-screen is using the same match ID")
-            return
+        logger.info(f"[SSE BROADCAST] Queued update for match {score_data.match_id} to {delivered}/{len(recipients)} subscribers")
 
-        broadcast_count = 0
-        for queue in subscribers.copy():
-            try:
-                # Non-blocking put with timeout
-                await asyncio.wait_for(queue.put(score_data), timeout=1.0)
-                broadcast_count += 1
-            except asyncio.TimeoutError:
-                logger.warning(f"Timeout broadcasting to subscriber for match {match_id}")
-            except Exception as e:
-                logger.error(f"Error broadcasting to subscriber: {e}")
+    def get_stats(self) -> Dict[str, int]:
+        """Get broadcast counters (delivered, coalesced and dropped updates)"""
+        return dict(self._stats)
 
-        logger.info(f"[SSE BROADCAST] Successfully queued update for match {match_id} to {broadcast_count}/{len(subscribers)} subscribers")
+    async def clear_match(self, match_id: int) -> None:
+        """
+        Clear live score data for a match (e.g., when match ends).
 
-    def clear_match(self, match_id: int) -> None:
-        """Clear live score data for a match (e.g., when match ends)"""
-        self._scores.pop(match_id, None)
+        Publishes a tombstone on the bus so that every worker evicts the match,
+        and journals it so the score is not restored after a restart.
+        """
+        # Drop the update still waiting for its coalescing window
+        task = self._flush_tasks.pop(match_id, None)
+        if task is not None:
+            task.cancel()
+        self._pending_publish.pop(match_id, None)
+
+        if not self._bus_started:
+            await self.start()
+
+        message = {"match_id": match_id, "cleared": True, "updated_at": datetime.utcnow().isoformat()}
+        await self._bus.publish(message)
+        if self._journal is not None:
+            self._journal.record(message)
         logger.debug(f"Cleared live score for match {match_id}")
 
     def get_active_matches(self) -> list[int]:
@@ -188,8 +765,8 @@ class LiveScoreManager:
         return list(self._scores.keys())
 
     def get_subscriber_count(self, match_id: int) -> int:
-        """Get number of subscribers for a match"""
-        return len(self._subscriptions.get(match_id, set()))
+        """Get number of subscribers of a single match topic"""
+        return len(self._subscriptions.get(match_topic(match_id), set()))
 
 
 # Global singleton instance
@@ -0,0 +1,161 @@
+"""
+Match Index - In-process index of existing matches for the live score hot path
+Lets the live score endpoints check a match and tag its updates without opening a DB session.
+
+- `load` reads every match (id, tournament, court) in a single query
+- `get` answers from memory; a miss falls back to one DB lookup in a thread (match created by
+  another worker), and unknown ids are remembered for MATCH_INDEX_NEGATIVE_TTL_SECONDS
+- `invalidate_match` / `invalidate_tournament` are called by the routes that create or delete matches
+- the whole index is reloaded in the background after MATCH_INDEX_TTL_SECONDS to drop entries
+  deleted by other workers; requests keep being answered from the previous index meanwhile
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# match_id -> (tournament_id, court_id)
+MatchLocation = Tuple[Optional[int], Optional[int]]
+
+
+class MatchIndex:
+    """Cache of valid match ids with their tournament and court"""
+
+    def __init__(self, ttl_seconds: int = 300, negative_ttl_seconds: int = 10):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: Dict[int, MatchLocation] = {}
+        # match_id -> monotonic deadline of a "does not exist" answer
+        self._missing: Dict[int, float] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+
+    @staticmethod
+    def _query(db, match_id: Optional[int] = None):
+        from app.models.match import Match
+        from app.models.matchschedule import MatchSchedule
+
+        query = db.query(Match.id, Match.tournament_id, MatchSchedule.court_id).outerjoin(
+            MatchSchedule, MatchSchedule.match_id == Match.id
+        )
+        if match_id is not None:
+            query = query.filter(Match.id == match_id)
+        return query
+
+    def load(self) -> int:
+        """(Re)load the whole index, returns the number of matches"""
+        from app.db import SessionLocal
+
+        db = SessionLocal()
+        try:
+            rows = self._query(db).all()
+        finally:
+            db.close()
+
+        entries = {match_id: (tournament_id, court_id) for match_id, tournament_id, court_id in rows}
+        with self._lock:
+            self._entries = entries
+            self._missing = {}
+            self._loaded_at = time.monotonic()
+        logger.info(f"[MATCH INDEX] Loaded {len(entries)} matches")
+        return len(entries)
+
+    def _lookup(self, match_id: int) -> Optional[MatchLocation]:
+        from app.db import SessionLocal
+
+        db = SessionLocal()
+        try:
+            row = self._query(db, match_id).first()
+        finally:
+            db.close()
+
+        with self._lock:
+            if row is None:
+                self._missing[match_id] = time.monotonic() + self.negative_ttl_seconds
+                return None
+            location = (row.tournament_id, row.court_id)
+            self._entries[match_id] = location
+        return location
+
+    async def _refresh(self) -> None:
+        try:
+            await asyncio.to_thread(self.load)
+        except Exception as e:
+            logger.error(f"[MATCH INDEX] Background reload failed: {e}")
+
+    async def get(self, match_id: int) -> Optional[MatchLocation]:
+        """(tournament_id, court_id) of a match, or None if it does not exist"""
+        if self._loaded_at is None:
+            await asyncio.to_thread(self.load)
+        elif time.monotonic() - self._loaded_at > self.ttl_seconds and (
+            self._refresh_task is None or self._refresh_task.done()
+        ):
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+        location = self._entries.get(match_id)
+        if location is not None:
+            self.hits += 1
+            return location
+
+        deadline = self._missing.get(match_id)
+        if deadline is not None and time.monotonic() < deadline:
+            self.negative_hits += 1
+            return None
+
+        self.misses += 1
+        return await asyncio.to_thread(self._lookup, match_id)
+
+    async def exists(self, match_id: int) -> bool:
+        return await self.get(match_id) is not None
+
+    def invalidate_match(self, match_id: int) -> None:
+        """Forget a match (created, deleted, or its schedule changed)"""
+        with self._lock:
+            self._entries.pop(match_id, None)
+            self._missing.pop(match_id, None)
+
+    def invalidate_tournament(self, tournament_id: int) -> None:
+        """Forget every match of a tournament (structure rebuilt or deleted)"""
+        with self._lock:
+            self._entries = {
+                match_id: location
+                for match_id, location in self._entries.items()
+                if location[0] != tournament_id
+            }
+            # New match ids of the tournament may have been remembered as missing
+            self._missing = {}
+
+    def clear(self) -> None:
+        """Drop the whole index (reloaded on next access)"""
+        with self._lock:
+            self._entries = {}
+            self._missing = {}
+            self._loaded_at = None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "missing": len(self._missing),
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+        }
+
+
+# Global singleton instance
+match_index = MatchIndex(
+    ttl_seconds=settings.MATCH_INDEX_TTL_SECONDS,
+    negative_ttl_seconds=settings.MATCH_INDEX_NEGATIVE_TTL_SECONDS,
+)
@@ -203,12 +203,13 @@ class MatchService(BaseService[Match]):
         
         return match
     
-    def update_pool_rankings(self, pool_id: int) -> None:
+    def update_pool_rankings(self, pool_id: int, commit: bool = True) -> None:
         """
         Met à jour le classement (rankings) d'une poule en fonction des résultats des matchs
         
         Args:
             pool_id: L'ID de la poule
+            commit: False si l'appelant commit lui-même la transaction
         """
         from app.models.pool import Pool
         from app.models.teampool import TeamPool
@@ -322,5 +323,6 @@ class MatchService(BaseService[Match]):
         for position, team_pool in enumerate(team_pools_list, start=1):
             team_pool.position = position
         
-        self.db.commit()
+        if commit:
+            self.db.commit()
 
@@ -0,0 +1,816 @@
+"""
+Moteur de propagation incrémentale des résultats d'un tournoi
+(POST /tournaments/{id}/propagate-results)
+
+Le moteur garde en mémoire, par tournoi, le graphe (DAG) des dépendances entre matchs :
+- arêtes winner_destination_match_id / loser_destination_match_id
+- arêtes des codes source team_a_source / team_b_source (WQ1, LSF2, WQF1, Poule A-1, Meilleur-3ème...)
+  vers les matchs (ou les matchs des poules) dont ils dépendent
+
+À chaque appel, une seule requête légère (colonnes, pas d'objets ORM) relit les matchs du tournoi :
+- si la topologie a changé (structure modifiée, premier appel du processus), le graphe est
+  reconstruit et tout le tournoi est réévalué, réparations de pool_id comprises
+- sinon, seuls les matchs dont le résultat a changé depuis le dernier appel (ou désignés par
+  l'appelant) et leur fermeture aval dans le graphe sont chargés, réévalués et écrits
+
+Les règles de propagation (slots, contrainte A ≠ B, poules incomplètes, re-propagation)
+sont celles de l'ancienne implémentation du routeur.
+"""
+import json as _json
+import logging
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.exceptions import NotFoundError
+from app.models.match import Match
+from app.models.pool import Pool
+from app.models.team import Team
+from app.models.teamsport import TeamSport
+from app.models.tournament import Tournament
+from app.models.tournamentphase import TournamentPhase
+from app.models.tournamentranking import TournamentRanking
+
+logger = logging.getLogger(__name__)
+
+# Colonnes relues à chaque appel (ordre = ordre des attributs des lignes)
+_RESULT_COLUMNS = (
+    Match.status, Match.score_a, Match.score_b, Match.team_sport_a_id, Match.team_sport_b_id,
+)
+_TOPOLOGY_COLUMNS = (
+    Match.phase_id, Match.pool_id, Match.match_type, Match.bracket_type, Match.match_order, Match.label,
+    Match.team_a_source, Match.team_b_source,
+    Match.winner_destination_match_id, Match.winner_destination_slot,
+    Match.loser_destination_match_id, Match.loser_destination_slot,
+)
+
+_POOL_CODE_RE = re.compile(
+    r'^(Poule\s*\d+|Poule\s*[A-Z]|Pool\s*\d+|Pool\s*[A-Z]|Ligue\s*\d+|Ligue\s*[A-Z]|League\s*\d+|League\s*[A-Z])-(\d+)$',
+    re.IGNORECASE,
+)
+_ALT_POOL_CODE_RE = re.compile(r'^P(\d+)-(\d+)$')
+_BEST_THIRD_CODES = ("meilleur-3ème", "meilleur-3e", "best-3rd", "meilleur 3ème", "meilleur 3e")
+
+
+def normalize_pool_name(name: str) -> str:
+    """Normalise un nom de poule : minuscules, espaces simples → clés cohérentes pour les lookups"""
+    return re.sub(r'\s+', ' ', (name or '').strip().lower())
+
+
+def _pool_name_variants(pool_name_raw: str) -> List[str]:
+    """Variantes d'un nom de poule/ligue cité dans un code source (Poule/Pool, Ligue/League)"""
+    return [
+        pool_name_raw,
+        pool_name_raw.replace("Pool", "Poule"),
+        pool_name_raw.replace("Poule", "Pool"),
+        f"Poule {pool_name_raw.replace('Poule', '').replace('Pool', '').strip()}",
+        f"Pool {pool_name_raw.replace('Poule', '').replace('Pool', '').strip()}",
+        pool_name_raw.replace("League", "Ligue"),
+        pool_name_raw.replace("Ligue", "League"),
+        f"Ligue {pool_name_raw.replace('Ligue', '').replace('League', '').strip()}",
+        f"League {pool_name_raw.replace('Ligue', '').replace('League', '').strip()}",
+    ]
+
+
+class SourceCode(NamedTuple):
+    """Code source (team_a_source / team_b_source) analysé une seule fois"""
+    raw: str
+    winner: bool  # "W..." → vainqueur, "L..." → perdant
+    stage: Optional[Tuple[str, int]]  # WQ1 / LQ1 → ("qualification", 1), WSF1 / LSF1 → ("semifinal", 1)
+    label: Optional[str]  # label du match référencé : WQF1 / LQF1 → "WQF1", WLR1-1 / LLR1-1 → "WLR1-1"
+    pool_names: Tuple[str, ...]  # noms normalisés candidats de la poule/ligue (Poule A-1, Ligue 2-3, P1-2)
+    position: Optional[int]  # position dans la poule
+    best_third: bool  # Meilleur-3ème / Best-3rd
+
+    @property
+    def is_pool(self) -> bool:
+        """Le code référence une position dans une poule."""
+        return self.position is not None
+
+
+@lru_cache(maxsize=4096)
+def parse_source_code(code: str) -> SourceCode:
+    """Analyse un code source ; le résultat est mis en cache (les codes d'un tournoi sont peu nombreux)"""
+    stage = None
+    for prefixes, kind in ((("WQ", "LQ"), "qualification"), (("WSF", "LSF"), "semifinal")):
+        prefix = next((p for p in prefixes if code.startswith(p)), None)
+        if prefix and not code.startswith("LQF") and code[len(prefix):].isdigit():
+            stage = (kind, int(code[len(prefix):]))
+            break
+
+    pool_names: Tuple[str, ...] = ()
+    position = None
+    pool_pattern = _POOL_CODE_RE.match(code)
+    alt_pool_pattern = _ALT_POOL_CODE_RE.match(code)
+    if pool_pattern or alt_pool_pattern:
+        if pool_pattern:
+            pool_name_raw, position = pool_pattern.group(1).strip(), int(pool_pattern.group(2))
+        else:
+            pool_name_raw, position = f"Poule {alt_pool_pattern.group(1)}", int(alt_pool_pattern.group(2))
+        pool_names = tuple(dict.fromkeys(normalize_pool_name(variant) for variant in _pool_name_variants(pool_name_raw)))
+
+    label = None
+    if not pool_names and len(code) > 1 and code[0] in ("W", "L"):
+        label = code if code[0] == "W" else "W" + code[1:]
+
+    return SourceCode(
+        raw=code,
+        winner=code[:1] != "L",
+        stage=stage,
+        label=label,
+        pool_names=pool_names,
+        position=position,
+        best_third=code.lower() in _BEST_THIRD_CODES,
+    )
+
+
+def _result_key(match) -> tuple:
+    return tuple(getattr(match, column.key) for column in _RESULT_COLUMNS)
+
+
+def _topology_key(match) -> tuple:
+    return (match.id, *(getattr(match, column.key) for column in _TOPOLOGY_COLUMNS))
+
+
+class PropagationGraph:
+    """
+    DAG des dépendances d'un tournoi : `downstream[x]` = matchs dont l'état dépend du match x
+    (destination vainqueur/perdant ou code source qui le référence).
+    """
+
+    def __init__(self, rows, pools: List[Pool]):
+        self.downstream: Dict[int, Set[int]] = {row.id: set() for row in rows}
+        self.feeders: Dict[int, Set[int]] = {}  # destination -> matchs qui y envoient vainqueur/perdant
+
+        by_stage: Dict[Tuple[str, int], List[int]] = {}
+        by_label: Dict[str, List[int]] = {}
+        by_pool: Dict[int, List[int]] = {}
+        for row in rows:
+            if row.match_type == "qualification":
+                by_stage.setdefault(("qualification", row.match_order), []).append(row.id)
+            if row.bracket_type == "semifinal":
+                by_stage.setdefault(("semifinal", row.match_order), []).append(row.id)
+            if row.label:
+                by_label.setdefault(row.label, []).append(row.id)
+            if row.pool_id is not None:
+                by_pool.setdefault(row.pool_id, []).append(row.id)
+
+        pool_ids_by_norm: Dict[str, List[int]] = {}
+        for pool in pools:
+            pool_ids_by_norm.setdefault(normalize_pool_name(pool.name), []).append(pool.id)
+
+        def code_dependencies(code: SourceCode) -> Set[int]:
+            deps: Set[int] = set(by_stage.get(code.stage, ()))
+            deps.update(by_label.get(code.label, ()))
+            for name in code.pool_names:
+                for pool_id in pool_ids_by_norm.get(name, ()):
+                    deps.update(by_pool.get(pool_id, ()))
+            if code.best_third:
+                for pool_matches in by_pool.values():
+                    deps.update(pool_matches)
+            return deps
+
+        for row in rows:
+            for dest_id in (row.winner_destination_match_id, row.loser_destination_match_id):
+                if dest_id in self.downstream:
+                    self.downstream[row.id].add(dest_id)
+                    self.feeders.setdefault(dest_id, set()).add(row.id)
+            for code in (row.team_a_source, row.team_b_source):
+                if code:
+                    for dep_id in code_dependencies(parse_source_code(code)):
+                        self.downstream[dep_id].add(row.id)
+
+    def feeders_of(self, match_ids: Iterable[int]) -> Set[int]:
+        """Matchs dont le vainqueur ou le perdant est envoyé vers l'un des matchs donnés"""
+        return {feeder for mid in match_ids for feeder in self.feeders.get(mid, ())}
+
+    def closure(self, match_ids: Iterable[int]) -> Set[int]:
+        """Matchs donnés + tous les matchs atteignables en aval"""
+        seen = {mid for mid in match_ids if mid in self.downstream}
+        queue = deque(seen)
+        while queue:
+            for next_id in self.downstream[queue.popleft()]:
+                if next_id not in seen:
+                    seen.add(next_id)
+                    queue.append(next_id)
+        return seen
+
+
+class _TournamentState:
+    """État conservé entre deux propagations d'un tournoi"""
+
+    def __init__(self, topology: tuple, graph: PropagationGraph):
+        self.topology = topology
+        self.graph = graph
+        self.snapshot: Dict[int, tuple] = {}  # match_id -> colonnes de résultat
+        self.pool_results: Dict[int, Tuple[dict, Optional[list]]] = {}  # pool_id -> (statut, classement)
+
+
+def _group_by_pool(all_matches) -> Dict[int, list]:
+    """Matchs regroupés par pool_id, en une seule passe"""
+    by_pool: Dict[int, list] = {}
+    for m in all_matches:
+        if m.pool_id is not None:
+            by_pool.setdefault(m.pool_id, []).append(m)
+    return by_pool
+
+
+def _compute_pool_result(pool: Pool, all_pool_matches: list) -> Tuple[dict, Optional[list]]:
+    """Statut (terminée ou non) et classement d'une poule : 3/1/0 points, différence puis buts marqués"""
+    completed_pool_matches = [m for m in all_pool_matches if m.status == "completed"]
+    status = {
+        "total": len(all_pool_matches),
+        "completed": len(completed_pool_matches),
+        "is_complete": len(all_pool_matches) > 0 and len(completed_pool_matches) == len(all_pool_matches),
+        "original_name": pool.name,
+    }
+    logger.debug("[POOL-STATUS] %s: %d/%d matchs terminés", pool.name, len(completed_pool_matches), len(all_pool_matches))
+
+    if not completed_pool_matches:
+        logger.debug("[POOL-STANDINGS] %s: aucun match terminé", pool.name)
+        return status, None
+
+    team_stats = {}  # team_sport_id -> {points, wins, draws, losses, goal_diff, goals_for}
+    for match in completed_pool_matches:
+        if match.score_a is None or match.score_b is None:
+            continue
+        team_a = match.team_sport_a_id
+        team_b = match.team_sport_b_id
+        if not team_a or not team_b:
+            continue
+
+        for team in (team_a, team_b):
+            if team not in team_stats:
+                team_stats[team] = {"points": 0, "wins": 0, "draws": 0, "losses": 0, "goal_diff": 0, "goals_for": 0}
+
+        if match.score_a > match.score_b:
+            team_stats[team_a]["points"] += 3
+            team_stats[team_a]["wins"] += 1
+            team_stats[team_b]["losses"] += 1
+        elif match.score_b > match.score_a:
+            team_stats[team_b]["points"] += 3
+            team_stats[team_b]["wins"] += 1
+            team_stats[team_a]["losses"] += 1
+        else:
+            team_stats[team_a]["points"] += 1
+            team_stats[team_b]["points"] += 1
+            team_stats[team_a]["draws"] += 1
+            team_stats[team_b]["draws"] += 1
+
+        team_stats[team_a]["goal_diff"] += match.score_a - match.score_b
+        team_stats[team_b]["goal_diff"] += match.score_b - match.score_a
+        team_stats[team_a]["goals_for"] += match.score_a
+        team_stats[team_b]["goals_for"] += match.score_b
+
+    sorted_teams = sorted(
+        team_stats.items(),
+        key=lambda x: (x[1]["points"], x[1]["goal_diff"], x[1]["goals_for"]),
+        reverse=True
+    )
+    standings = [(team_id, stats["points"], stats["goal_diff"]) for team_id, stats in sorted_teams]
+    logger.debug("[POOL-STANDINGS] %s: %s", pool.name, standings)
+    return status, standings
+
+
+def _place_team(dest_match, slot: str, team_id: int, stale_id: Optional[int], role: str, placements: list) -> Optional[bool]:
+    """
+    Place une équipe dans le slot configuré d'un match de destination.
+    Le slot est écrasé s'il contient `stale_id` (l'autre équipe du match source, placée avant
+    une correction du score) ; s'il est pris par une autre équipe, le slot libre restant est utilisé.
+    Le slot rempli est ajouté à `placements` (nom de l'équipe écrit ensuite dans team_x_source).
+
+    Returns:
+        True si le match a été modifié, False s'il n'y avait rien à faire, None si les deux slots sont pris
+    """
+    if slot not in ("A", "B"):
+        return False
+    if team_id in (dest_match.team_sport_a_id, dest_match.team_sport_b_id):
+        return False  # déjà propagé, idempotent
+
+    other = "B" if slot == "A" else "A"
+    for slot_name, fallback in ((slot, False), (other, True)):
+        attr = f"team_sport_{slot_name.lower()}_id"
+        current = getattr(dest_match, attr)
+        if current is None or (current == stale_id and not fallback):
+            setattr(dest_match, attr, team_id)
+            dest_match.updated_at = datetime.utcnow()
+            placements.append((dest_match, slot_name, team_id))
+            logger.debug("[PROPAGATION] %s %s -> Match %s slot %s%s", role, team_id, dest_match.id, slot_name, " (fallback)" if fallback else "")
+            return True
+
+    logger.warning(f"[PROPAGATION] Slots pleins pour match {dest_match.id}")
+    return None
+
+
+def _inject_destinations(match, matches_by_id, placements: list) -> int:
+    """Mécanisme 1 : place le vainqueur et le perdant d'un match terminé dans leurs matchs de destination"""
+    if match.status != "completed":
+        return 0
+    if match.score_a is None or match.score_b is None:
+        return 0
+
+    if match.score_a > match.score_b:
+        winner_team_id = match.team_sport_a_id
+        loser_team_id = match.team_sport_b_id
+    elif match.score_b > match.score_a:
+        winner_team_id = match.team_sport_b_id
+        loser_team_id = match.team_sport_a_id
+    else:
+        return 0  # Égalité
+
+    propagated = 0
+
+    # --- Propager le VAINQUEUR ---
+    if match.winner_destination_match_id and winner_team_id:
+        dest_match = matches_by_id.get(match.winner_destination_match_id)
+        if dest_match:
+            placed = _place_team(dest_match, match.winner_destination_slot or "A", winner_team_id, loser_team_id, "Winner", placements)
+            if placed is None:
+                return propagated
+            propagated += placed
+
+    # --- Propager le PERDANT ---
+    if match.loser_destination_match_id and loser_team_id:
+        dest_match = matches_by_id.get(match.loser_destination_match_id)
+        if dest_match:
+            propagated += bool(_place_team(dest_match, match.loser_destination_slot or "A", loser_team_id, winner_team_id, "Loser", placements))
+
+    return propagated
+
+
+def _write_placed_names(db: Session, placements: list) -> None:
+    """
+    Écrit le nom des équipes placées dans team_a_source / team_b_source du match de destination
+    (affiché par la page publique des tournois et les tableaux de score admin). Une requête.
+    """
+    if not placements:
+        return
+    team_ids = {team_id for _, _, team_id in placements}
+    names = dict(
+        db.query(TeamSport.id, Team.name)
+        .join(Team, Team.id == TeamSport.team_id)
+        .filter(TeamSport.id.in_(team_ids))
+        .all()
+    )
+    for dest_match, slot_name, team_id in placements:
+        if names.get(team_id):
+            setattr(dest_match, f"team_{slot_name.lower()}_source", names[team_id])
+
+
+def _repair_pool_ids(db: Session, tournament: Tournament, phases, pools, all_matches) -> None:
+    """
+    Répare pool_id=NULL sur les matchs de poule existants (données historiques).
+    Guard: m.phase_id == pool.phase_id (les matchs de bracket sont dans une phase différente)
+    NB: match_type n'est PAS mis à jour dans l'UPDATE path de upsert_match → peut être NULL
+    """
+    for pool in pools:
+        pool_team_ids = [tp.team_id for tp in pool.team_pools]
+        if not pool_team_ids:
+            continue
+        ts_ids = set(
+            ts.id for ts in db.query(TeamSport).filter(
+                TeamSport.team_id.in_(pool_team_ids),
+                TeamSport.sport_id == tournament.sport_id
+            ).all()
+        )
+        for m in all_matches:
+            if (m.phase_id == pool.phase_id
+                    and m.pool_id is None
+                    and m.team_sport_a_id in ts_ids
+                    and m.team_sport_b_id in ts_ids):
+                m.pool_id = pool.id
+
+    # Réparation spécifique aux ligues : aucune TeamPool n'est créée pour les ligues,
+    # donc la boucle ci-dessus les ignore. On répare ici par phase_id.
+    league_phases = [p for p in phases if p.phase_order == 5 or p.phase_type == "leagues"]
+    for lp in league_phases:
+        league_pools_in_phase = [pool for pool in pools if pool.phase_id == lp.id]
+        if len(league_pools_in_phase) == 1:
+            # Cas simple : une seule ligue → assigner tous les matchs non assignés de la phase
+            lp_pool = league_pools_in_phase[0]
+            for m in all_matches:
+                if m.phase_id == lp.id and m.pool_id is None:
+                    m.pool_id = lp_pool.id
+                    logger.info(f"[REPAIR-LEAGUE] Match {m.id} → pool_id={lp_pool.id} ({lp_pool.name})")
+        elif len(league_pools_in_phase) > 1:
+            # Cas multi-ligues : inférer le bon pool via les équipes déjà assignées
+            for lp_pool in league_pools_in_phase:
+                known_teams: set = set()
+                for m in all_matches:
+                    if m.pool_id == lp_pool.id:
+                        if m.team_sport_a_id: known_teams.add(m.team_sport_a_id)
+                        if m.team_sport_b_id: known_teams.add(m.team_sport_b_id)
+                for m in all_matches:
+                    if m.phase_id == lp.id and m.pool_id is None and known_teams:
+                        if m.team_sport_a_id in known_teams or m.team_sport_b_id in known_teams:
+                            m.pool_id = lp_pool.id
+                            logger.info(f"[REPAIR-LEAGUE] Match {m.id} → pool_id={lp_pool.id} ({lp_pool.name})")
+
+
+def _ranking_rows(tournament_id: int, pool: Pool, standings: Optional[list]) -> List[dict]:
+    """Lignes TournamentRanking (standing_points de la poule) pour un classement de poule"""
+    if not pool.use_standing_points or not pool.standing_points:
+        return []
+    try:
+        standing_pts = _json.loads(pool.standing_points) if isinstance(pool.standing_points, str) else pool.standing_points
+    except Exception:
+        return []
+    return [
+        {
+            "tournament_id": tournament_id,
+            "team_sport_id": ts_id,
+            "final_position": pos,
+            "points_awarded": standing_pts.get(str(pos), 0) or standing_pts.get(pos, 0),
+        }
+        for pos, (ts_id, _, _) in enumerate(standings or [], start=1)
+    ]
+
+
+def _upsert_rankings(db: Session, rows: List[dict]) -> None:
+    """Upsert TournamentRanking de toutes les poules recalculées en une seule instruction"""
+    if not rows:
+        return
+    statement = sqlite_insert(TournamentRanking).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[TournamentRanking.tournament_id, TournamentRanking.team_sport_id],
+        set_={
+            "final_position": statement.excluded.final_position,
+            "points_awarded": statement.excluded.points_awarded,
+        },
+    ))
+
+
+class _ResultIndex:
+    """Index des matchs terminés d'un tournoi, construit en une passe pour résoudre les codes source"""
+
+    def __init__(self, all_matches):
+        self.stages: Dict[Tuple[str, int], Any] = {}  # premier match terminé par (phase, match_order)
+        self.labels: Dict[str, Any] = {}  # premier match terminé et décidé par label
+        for m in all_matches:
+            if m.status != "completed":
+                continue
+            if m.match_type == "qualification":
+                self.stages.setdefault(("qualification", m.match_order), m)
+            if m.bracket_type == "semifinal":
+                self.stages.setdefault(("semifinal", m.match_order), m)
+            if m.label and m.score_a is not None and m.score_b is not None and m.score_a != m.score_b:
+                self.labels.setdefault(m.label, m)
+
+
+def _pick(match, winner: bool) -> Optional[int]:
+    a_wins = match.score_a > match.score_b
+    if winner:
+        return match.team_sport_a_id if a_wins else match.team_sport_b_id
+    return match.team_sport_b_id if a_wins else match.team_sport_a_id
+
+
+def resolve_source_code(code: SourceCode, index: _ResultIndex, pool_standings: Dict[str, list]) -> Optional[int]:
+    """Résout un code source (WQ1, LSF2, WQF1, Poule A-1, P1-2, Meilleur-3ème...) en team_sport_id"""
+    # WQ1 / LQ1 (qualifications), WSF1 / LSF1 (demi-finales) : par match_order
+    if code.stage:
+        ref_match = index.stages.get(code.stage)
+        if ref_match is not None and ref_match.score_a is not None and ref_match.score_b is not None:
+            return _pick(ref_match, code.winner)
+
+    # Codes génériques de bracket (WQF1, LQF1, WLR1-1, WLF...) : par label du match
+    if code.label:
+        ref_match = index.labels.get(code.label)
+        if ref_match is not None:
+            return _pick(ref_match, code.winner)
+
+    # Codes de poule : <nom_poule>-<position>
+    if code.is_pool:
+        found_standings = next((pool_standings[name] for name in code.pool_names if name in pool_standings), None)
+        if found_standings is None:
+            logger.warning(f"[RESOLVE-POOL] Poule de '{code.raw}' non trouvée. Poules disponibles: {list(pool_standings.keys())}")
+        elif len(found_standings) >= code.position:
+            team_id = found_standings[code.position - 1][0]
+            logger.debug("[RESOLVE-POOL] %s -> team_sport_id=%s", code.raw, team_id)
+            return team_id
+        else:
+            logger.warning(f"[RESOLVE-POOL] Position {code.position} invalide pour '{code.raw}' (seulement {len(found_standings)} équipes)")
+
+    # Meilleur 3ème: "Meilleur-3ème" ou "Best-3rd"
+    if code.best_third:
+        third_places = [
+            (standings[2][0], standings[2][1], standings[2][2])
+            for standings in pool_standings.values() if len(standings) >= 3
+        ]
+        if third_places:
+            # Trier par points puis par goal_diff
+            best_third = max(third_places, key=lambda x: (x[1], x[2]))[0]
+            logger.debug("[RESOLVE-POOL] Meilleur 3ème: team_sport_id=%s", best_third)
+            return best_third
+
+    return None
+
+
+def _pool_complete_for_source(code: SourceCode, pools_status: Dict[str, dict]) -> bool:
+    """Retourne True si la poule référencée est entièrement terminée."""
+    for name in code.pool_names:
+        if name in pools_status:
+            return pools_status[name]["is_complete"]
+    logger.warning(f"[POOL-COMPLETE] Poule de '{code.raw}' non trouvée. Disponibles: {list(pools_status.keys())}")
+    return False  # Poule inconnue → bloquer par précaution
+
+
+def _resolve_sources(match, index: _ResultIndex, pools_status, pool_standings, debug_unresolved_sources: list) -> int:
+    """
+    Mécanisme 2 : propagation via codes source (team_a_source / team_b_source).
+    Les codes de poule ne sont résolus que quand la poule est terminée ; un classement final
+    différent de l'assignation précédente est re-propagé.
+    """
+    propagated = 0
+    for attr_source, attr_id, other_attr_id in [
+        ("team_a_source", "team_sport_a_id", "team_sport_b_id"),
+        ("team_b_source", "team_sport_b_id", "team_sport_a_id"),
+    ]:
+        source = getattr(match, attr_source)
+        if not source:
+            continue
+
+        code = parse_source_code(source)
+        is_pool = code.is_pool
+        current_id = getattr(match, attr_id)
+
+        # Pour les codes de poule : ne propager que si la poule est entièrement terminée
+        if is_pool and not _pool_complete_for_source(code, pools_status):
+            # Nettoyer les données périmées d'une propagation partielle antérieure
+            if current_id is not None and match.status not in ("completed", "in_progress"):
+                setattr(match, attr_id, None)
+                match.updated_at = datetime.utcnow()
+                logger.debug("[PROPAGATION] Reset %s pour %s (poule incomplète)", attr_id, source)
+            else:
+                logger.debug("[PROPAGATION] Poule incomplète, skip: %s", source)
+                debug_unresolved_sources.append({
+                    "match_id": match.id,
+                    "source": source,
+                    "reason": "pool_incomplete",
+                    "pool_status": pools_status.get(normalize_pool_name(source.rsplit("-", 1)[0].strip()), None),
+                })
+            continue
+
+        resolved = resolve_source_code(code, index, pool_standings)
+        if not resolved:
+            debug_unresolved_sources.append({
+                "match_id": match.id,
+                "source": source,
+                "reason": "resolve_failed",
+                "available_standings": list(pool_standings.keys()),
+            })
+            continue
+
+        if current_id is None:
+            # Assignation initiale — vérifier contrainte A ≠ B
+            other_id = getattr(match, other_attr_id)
+            if other_id != resolved:
+                setattr(match, attr_id, resolved)
+                match.updated_at = datetime.utcnow()
+                propagated += 1
+                logger.debug("[PROPAGATION] %s -> %s=%s", source, attr_id, resolved)
+            else:
+                logger.warning(f"[PROPAGATION] Contrainte A≠B bloquée: {source} -> {attr_id}={resolved} == {other_attr_id}")
+        elif is_pool and current_id != resolved:
+            # Re-propagation : les classements finaux diffèrent de l'assignation précédente
+            other_id = getattr(match, other_attr_id)
+            if other_id != resolved:
+                setattr(match, attr_id, resolved)
+                match.updated_at = datetime.utcnow()
+                propagated += 1
+                logger.debug("[PROPAGATION] Re-propagation %s -> %s=%s (était %s)", source, attr_id, resolved, current_id)
+            else:
+                logger.warning(f"[PROPAGATION] Re-propagation bloquée (contrainte A≠B): {source} -> {resolved} == {other_attr_id}")
+    return propagated
+
+
+_ON_COMMIT_KEY = "propagation_on_commit"
+
+
+def _on_commit(db: Session, callback) -> None:
+    """
+    Exécute `callback` après le prochain commit de la session (rien en cas de rollback).
+
+    Une seule paire d'écouteurs par session, posée au premier appel : les callbacks en attente
+    sont rangés dans `db.info` et vidés à chaque commit ou rollback (pas d'écouteur ajouté
+    à chaque propagation d'une session de longue durée).
+    """
+    callbacks = db.info.get(_ON_COMMIT_KEY)
+    if callbacks is None:
+        callbacks = db.info[_ON_COMMIT_KEY] = []
+        event.listen(db, "after_commit", _run_commit_callbacks)
+        event.listen(db, "after_rollback", _drop_commit_callbacks)
+    callbacks.append(callback)
+
+
+def _run_commit_callbacks(session) -> None:
+    callbacks = session.info.get(_ON_COMMIT_KEY)
+    if callbacks:
+        pending = list(callbacks)
+        callbacks.clear()
+        for callback in pending:
+            callback()
+
+
+def _drop_commit_callbacks(session) -> None:
+    callbacks = session.info.get(_ON_COMMIT_KEY)
+    if callbacks:
+        callbacks.clear()
+
+
+class PropagationEngine:
+    """Graphes de dépendances et derniers résultats connus, par tournoi"""
+
+    def __init__(self):
+        self._states: Dict[int, _TournamentState] = {}
+        self._locks: Dict[int, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+        # Compteurs
+        self._stats = {"full_runs": 0, "incremental_runs": 0, "recomputed_matches": 0}
+
+    def _lock(self, tournament_id: int) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(tournament_id, threading.Lock())
+
+    def invalidate(self, tournament_id: int) -> None:
+        """Oublie l'état d'un tournoi : le prochain appel réévalue tout"""
+        self._states.pop(tournament_id, None)
+
+    def propagate(
+        self,
+        db: Session,
+        tournament_id: int,
+        match_ids: Optional[Iterable[int]] = None,
+        full: bool = False,
+        commit: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Propage les résultats des matchs terminés vers les matchs suivants.
+        Les écritures en attente de la session sont prises en compte (flush).
+
+        Args:
+            match_ids: matchs dont le résultat vient de changer (en plus de ceux détectés
+                par comparaison avec le dernier appel)
+            full: réévaluer tout le tournoi
+            commit: False si l'appelant commit lui-même la transaction (une seule par déclencheur) ;
+                l'état du tournoi n'est alors conservé qu'après ce commit
+
+        Returns:
+            Le rapport de propagation, ou None si le tournoi n'a aucune phase
+
+        Raises:
+            NotFoundError: si le tournoi n'existe pas
+        """
+        with self._lock(tournament_id):
+            return self._propagate(db, tournament_id, set(match_ids or ()), full, commit)
+
+    def propagate_match(self, db: Session, match_id: int, commit: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Propage le résultat d'un match (le tournoi est celui de sa phase)
+
+        Raises:
+            NotFoundError: si le match n'existe pas
+        """
+        tournament_id = (
+            db.query(TournamentPhase.tournament_id)
+            .join(Match, Match.phase_id == TournamentPhase.id)
+            .filter(Match.id == match_id)
+            .scalar()
+        )
+        if tournament_id is None:
+            raise NotFoundError("Match", str(match_id))
+        return self.propagate(db, tournament_id, match_ids=[match_id], commit=commit)
+
+    def _propagate(self, db: Session, tournament_id: int, requested: Set[int], full: bool, commit: bool) -> Optional[Dict[str, Any]]:
+        db.flush()
+        tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+        if not tournament:
+            raise NotFoundError("Tournament", str(tournament_id))
+
+        phases = db.query(TournamentPhase).filter(TournamentPhase.tournament_id == tournament_id).all()
+        if not phases:
+            self.invalidate(tournament_id)
+            return None
+        phase_ids = [p.id for p in phases]
+
+        rows = db.query(Match.id, *_RESULT_COLUMNS, *_TOPOLOGY_COLUMNS).filter(Match.phase_id.in_(phase_ids)).all()
+        phase_position = {pid: i for i, pid in enumerate(phase_ids)}
+        pools = sorted(
+            db.query(Pool).filter(Pool.phase_id.in_(phase_ids)).all(),
+            key=lambda p: phase_position[p.phase_id]
+        )
+
+        topology = (
+            tuple(_topology_key(row) for row in rows),
+            tuple((p.id, p.phase_id, p.name, p.use_standing_points, p.standing_points) for p in pools),
+        )
+        state = self._states.get(tournament_id)
+        if full or state is None or state.topology != topology:
+            state = _TournamentState(topology, PropagationGraph(rows, pools))
+            full = True
+
+        if full:
+            all_matches = db.query(Match).filter(Match.phase_id.in_(phase_ids)).all()
+            affected = {m.id for m in all_matches}
+        else:
+            changed = requested | {
+                row.id for row in rows
+                if state.snapshot.get(row.id) != _result_key(row)
+            }
+            # Les matchs qui alimentent un match modifié réinjectent leur résultat (slot vidé à la main...)
+            affected = state.graph.closure(changed | state.graph.feeders_of(changed))
+            loaded = {m.id: m for m in db.query(Match).filter(Match.id.in_(affected)).all()} if affected else {}
+            # Les matchs hors fermeture ne sont que lus : les lignes suffisent
+            all_matches = [loaded.get(row.id, row) for row in rows]
+
+        matches_by_id = {m.id: m for m in all_matches}
+        propagated_count = 0
+        logger.debug(
+            "[PROPAGATION] Tournoi %s: %d/%d matchs réévalués dans %d phases (%s)",
+            tournament_id, len(affected), len(all_matches), len(phases), "complet" if full else "incrémental",
+        )
+
+        # MÉCANISME 1: Propagation via winner/loser_destination_match_id
+        placements: list = []
+        for match in all_matches:
+            if match.id in affected:
+                propagated_count += _inject_destinations(match, matches_by_id, placements)
+        _write_placed_names(db, placements)
+
+        # Statut et classement des poules (seules les poules touchées sont recalculées)
+        # Copie : l'état n'est remplacé qu'après le commit
+        pool_results = {} if full else dict(state.pool_results)
+        if full:
+            _repair_pool_ids(db, tournament, phases, pools, all_matches)
+        affected_pool_ids = {matches_by_id[mid].pool_id for mid in affected}
+        matches_by_pool = _group_by_pool(all_matches)
+        ranking_rows: List[dict] = []
+        for pool in pools:
+            if pool.id in affected_pool_ids or pool.id not in pool_results:
+                pool_results[pool.id] = _compute_pool_result(pool, matches_by_pool.get(pool.id, []))
+                ranking_rows.extend(_ranking_rows(tournament_id, pool, pool_results[pool.id][1]))
+        _upsert_rankings(db, ranking_rows)
+
+        pools_status: Dict[str, dict] = {}
+        pool_standings: Dict[str, list] = {}
+        for pool in pools:
+            status, standings = pool_results[pool.id]
+            pools_status[normalize_pool_name(pool.name)] = status
+            if standings is not None:
+                pool_standings[normalize_pool_name(pool.name)] = standings
+
+        # MÉCANISME 2: Propagation via codes source (team_a_source / team_b_source)
+        debug_unresolved_sources = []
+        index = _ResultIndex(all_matches)
+        for match in all_matches:
+            if match.id in affected:
+                propagated_count += _resolve_sources(match, index, pools_status, pool_standings, debug_unresolved_sources)
+
+        report = {
+            "tournament_id": tournament_id,
+            "propagated_matches": propagated_count,
+            "recomputed_matches": len(affected),
+            "full_propagation": full,
+            "debug_pool_standings": {k: len(v) for k, v in pool_standings.items()},
+            "debug_pools_status": {k: {"total": v["total"], "completed": v["completed"], "is_complete": v["is_complete"], "original_name": v.get("original_name", k)} for k, v in pools_status.items()},
+            "debug_phases": [{"id": p.id, "order": p.phase_order, "type": p.phase_type} for p in phases],
+            "debug_unresolved_sources": debug_unresolved_sources,
+        }
+
+        # Derniers résultats connus, relevés avant le commit (qui expire les objets)
+        snapshot = {m.id: _result_key(m) for m in all_matches}
+        new_topology = (tuple(_topology_key(m) for m in all_matches), topology[1])
+        # Réparation de pool_id : la fermeture des prochains appels doit suivre les nouvelles poules
+        graph = PropagationGraph(all_matches, pools) if new_topology != topology else state.graph
+
+        self._stats["full_runs" if full else "incremental_runs"] += 1
+        self._stats["recomputed_matches"] += len(affected)
+
+        def keep_state():
+            state.graph = graph
+            state.snapshot = snapshot
+            state.topology = new_topology
+            state.pool_results = pool_results
+            self._states[tournament_id] = state
+
+        if commit:
+            db.commit()
+            keep_state()
+        else:
+            db.flush()
+            _on_commit(db, keep_state)
+        return report
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"tournaments": len(self._states), **self._stats}
+
+
+# Instance globale
+propagation_engine = PropagationEngine()
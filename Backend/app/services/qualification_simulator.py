@@ -0,0 +1,597 @@
+"""
+Simulation Monte-Carlo des probabilités de qualification et de classement final d'un tournoi
+(GET /tournaments/{id}/qualification-odds)
+
+Les matchs restants sont tirés des milliers de fois en suivant la structure du tournoi :
+- matchs de poule : classement 3/1/0 points, différence puis buts marqués (comme la propagation)
+- bracket : graphe winner/loser_destination_match_id et codes source (WQ1, WQF1, Poule A-1,
+  Meilleur-3ème...) analysés par parse_source_code
+- scores : loi de Poisson autour de la moyenne des scores du tournoi, ajustée par la force
+  des deux équipes (buts marqués / encaissés dans les matchs terminés) ; un nul de bracket
+  est départagé à pile ou face
+- classement final : règles de GET /tournaments/{id}/final-ranking (winner_points / loser_points
+  des matchs, points de classement des poules, puis différence, buts marqués et nom)
+
+« Qualifiée » = l'équipe joue au moins un match hors poule (seulement si le tournoi a des poules).
+
+Le noyau est vectorisé avec NumPy (toutes les simulations d'un match en une opération) ;
+sans NumPy, une boucle Python fait moins de simulations. Les résultats sont mis en cache par
+(tournoi, Tournament.structure_version, simulations) : la version change à chaque résultat.
+
+Les calculs tournent hors du chemin des requêtes, dans un thread dédié (un calcul à la fois,
+avec sa propre session). L'entrée de cache est posée avant le calcul : les requêtes concurrentes
+pour la même version attendent le même calcul au lieu d'en lancer chacune un. Au-delà de
+QUALIFICATION_ODDS_MAX_PENDING calculs en attente ou en cours, `simulate` lève SimulationBusyError
+(503 + Retry-After) au lieu d'empiler du travail.
+"""
+import asyncio
+import json as _json
+import logging
+import math
+import random
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.exceptions import NotFoundError
+from app.models.match import Match
+from app.models.pool import Pool
+from app.models.team import Team
+from app.models.teamsport import TeamSport
+from app.models.tournamentphase import TournamentPhase
+from app.services.propagation_engine import normalize_pool_name, parse_source_code
+from app.services.structure_cache import get_structure_version
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Nombre de simulations par défaut / maximum selon le noyau
+DEFAULT_SIMULATIONS = 10000 if np is not None else 1000
+MAX_SIMULATIONS = 20000 if np is not None else 5000
+
+# Clé de tri (points, différence, buts marqués) en un seul nombre
+_GF_SCALE = 4096.0
+_GD_OFFSET = 4096.0
+_POINTS_SCALE = _GF_SCALE * 2 * _GD_OFFSET
+
+_RATING_PRIOR_MATCHES = 3  # matchs « moyens » ajoutés aux stats de chaque équipe
+
+# Source d'une équipe dans un match simulé :
+# ("team", idx) | ("winner", match_id) | ("loser", match_id) | ("pool", pool_id, position) | ("best_third",) | None
+Slot = Optional[tuple]
+
+
+class _Step(NamedTuple):
+    """Match à simuler, dans l'ordre topologique"""
+    match_id: int
+    pool_id: Optional[int]
+    slot_a: Slot
+    slot_b: Slot
+    scores: Optional[Tuple[int, int]]  # score connu (match terminé)
+    winner_points: int
+    loser_points: int
+
+
+class _PoolPlan(NamedTuple):
+    pool_id: int
+    teams: List[int]  # index des équipes, par ordre d'apparition dans les matchs
+    standing_points: List[int]  # points de classement par position (0 si désactivés)
+
+
+class _Plan:
+    """Structure du tournoi compilée pour la simulation"""
+
+    def __init__(self, matches: List[Match], pools: List[Pool], team_names: Dict[int, str]):
+        team_ids = {tid for m in matches for tid in (m.team_sport_a_id, m.team_sport_b_id) if tid}
+        self.team_ids = sorted(team_ids, key=lambda tid: (team_names.get(tid, "").lower(), tid))
+        self.team_names = [team_names.get(tid, "") for tid in self.team_ids]
+        index = {tid: i for i, tid in enumerate(self.team_ids)}
+
+        # Force des équipes et score moyen, d'après les matchs terminés
+        played = [0] * len(self.team_ids)
+        goals_for = [0] * len(self.team_ids)
+        goals_against = [0] * len(self.team_ids)
+        for m in matches:
+            if _is_completed(m) and m.team_sport_a_id in index and m.team_sport_b_id in index:
+                for team, scored, conceded in ((m.team_sport_a_id, m.score_a, m.score_b), (m.team_sport_b_id, m.score_b, m.score_a)):
+                    played[index[team]] += 1
+                    goals_for[index[team]] += scored
+                    goals_against[index[team]] += conceded
+        total_played = sum(played)
+        self.average_score = max(sum(goals_for) / total_played, 0.1) if total_played else 1.0
+        prior = _RATING_PRIOR_MATCHES * self.average_score
+        self.ratings = [
+            0.5 * math.log((goals_for[i] + prior) / (goals_against[i] + prior)) for i in range(len(self.team_ids))
+        ]
+
+        # Index des références (même priorité que resolve_source_code)
+        by_stage: Dict[Tuple[str, int], int] = {}
+        by_label: Dict[str, int] = {}
+        pool_by_norm: Dict[str, int] = {}
+        for m in matches:
+            if m.match_type == "qualification":
+                by_stage.setdefault(("qualification", m.match_order), m.id)
+            if m.bracket_type == "semifinal":
+                by_stage.setdefault(("semifinal", m.match_order), m.id)
+            if m.label:
+                by_label.setdefault(m.label, m.id)
+        for pool in pools:
+            pool_by_norm.setdefault(normalize_pool_name(pool.name), pool.id)
+
+        feeders: Dict[int, List[Tuple[Optional[str], tuple]]] = {}
+        for m in matches:
+            for dest_id, dest_slot, role in (
+                (m.winner_destination_match_id, m.winner_destination_slot, "winner"),
+                (m.loser_destination_match_id, m.loser_destination_slot, "loser"),
+            ):
+                if dest_id:
+                    feeders.setdefault(dest_id, []).append((dest_slot, (role, m.id)))
+
+        def source_slot(code: Optional[str]) -> Slot:
+            if not code:
+                return None
+            parsed = parse_source_code(code)
+            role = "winner" if parsed.winner else "loser"
+            if parsed.stage in by_stage:
+                return (role, by_stage[parsed.stage])
+            if parsed.label in by_label:
+                return (role, by_label[parsed.label])
+            if parsed.is_pool:
+                pool_id = next((pool_by_norm[name] for name in parsed.pool_names if name in pool_by_norm), None)
+                if pool_id is not None:
+                    return ("pool", pool_id, parsed.position)
+            if parsed.best_third:
+                return ("best_third",)
+            return None
+
+        steps: Dict[int, _Step] = {}
+        for m in matches:
+            scores = (m.score_a, m.score_b) if _is_completed(m) else None
+            if scores and m.team_sport_a_id in index and m.team_sport_b_id in index:
+                slots = {"A": ("team", index[m.team_sport_a_id]), "B": ("team", index[m.team_sport_b_id])}
+            else:
+                # Équipe envoyée par un autre match, sinon équipe déjà placée, sinon code source
+                slots = {"A": None, "B": None}
+                unslotted = []
+                for slot, source in feeders.get(m.id, ()):
+                    if slot in slots and slots[slot] is None:
+                        slots[slot] = source
+                    else:
+                        unslotted.append(source)
+                for source in unslotted:
+                    free = next((s for s in ("A", "B") if slots[s] is None), None)
+                    if free:
+                        slots[free] = source
+                for slot, team_id, code in (("A", m.team_sport_a_id, m.team_a_source), ("B", m.team_sport_b_id, m.team_b_source)):
+                    if slots[slot] is None:
+                        slots[slot] = ("team", index[team_id]) if team_id in index else source_slot(code)
+            steps[m.id] = _Step(
+                match_id=m.id,
+                pool_id=m.pool_id,
+                slot_a=slots["A"],
+                slot_b=slots["B"],
+                scores=scores,
+                winner_points=m.winner_points or 0,
+                loser_points=m.loser_points or 0,
+            )
+
+        # Poules : équipes (ordre d'apparition, comme le classement de la propagation) et points de classement
+        pool_ids = {pool.id for pool in pools}
+        matches_by_pool: Dict[int, List[int]] = {}
+        for m in matches:
+            if m.pool_id in pool_ids:
+                matches_by_pool.setdefault(m.pool_id, []).append(m.id)
+        self.pools: Dict[int, _PoolPlan] = {}
+        for pool in pools:
+            teams: List[int] = []
+            for match_id in matches_by_pool.get(pool.id, ()):
+                for slot in (steps[match_id].slot_a, steps[match_id].slot_b):
+                    if slot and slot[0] == "team" and slot[1] not in teams:
+                        teams.append(slot[1])
+            self.pools[pool.id] = _PoolPlan(pool.id, teams, _standing_points(pool, len(teams)))
+        self.has_pools = any(plan.teams for plan in self.pools.values())
+
+        # Ordre topologique : un match après ceux dont dépendent ses équipes
+        all_pool_matches = [mid for mids in matches_by_pool.values() for mid in mids]
+
+        def dependencies(slot: Slot) -> List[int]:
+            if not slot or slot[0] == "team":
+                return []
+            if slot[0] in ("winner", "loser"):
+                return [slot[1]] if slot[1] in steps else []
+            if slot[0] == "pool":
+                return matches_by_pool.get(slot[1], [])
+            return all_pool_matches
+
+        downstream: Dict[int, List[int]] = {mid: [] for mid in steps}
+        pending = {mid: 0 for mid in steps}
+        for step in steps.values():
+            for dep_id in {*dependencies(step.slot_a), *dependencies(step.slot_b)} - {step.match_id}:
+                downstream[dep_id].append(step.match_id)
+                pending[step.match_id] += 1
+        queue = deque(mid for mid in steps if pending[mid] == 0)
+        self.steps: List[_Step] = []
+        while queue:
+            match_id = queue.popleft()
+            self.steps.append(steps[match_id])
+            for next_id in downstream[match_id]:
+                pending[next_id] -= 1
+                if pending[next_id] == 0:
+                    queue.append(next_id)
+        # Matchs pris dans un cycle : non simulés
+        self.unresolved_matches = len(steps) - len(self.steps)
+        self.remaining_matches = sum(1 for step in self.steps if step.scores is None)
+
+
+def _is_completed(match) -> bool:
+    return match.status == "completed" and match.score_a is not None and match.score_b is not None
+
+
+def _standing_points(pool: Pool, size: int) -> List[int]:
+    """Points de classement par position (mêmes règles que le classement final)"""
+    if not pool.use_standing_points or not pool.standing_points:
+        return [0] * size
+    try:
+        standing_pts = _json.loads(pool.standing_points) if isinstance(pool.standing_points, str) else pool.standing_points
+    except Exception:
+        return [0] * size
+    return [standing_pts.get(str(pos), 0) or standing_pts.get(pos, 0) for pos in range(1, size + 1)]
+
+
+def _ranking_key(points, goal_diff, goals_for):
+    return points * _POINTS_SCALE + (goal_diff + _GD_OFFSET) * _GF_SCALE + goals_for
+
+
+def _simulate_numpy(plan: _Plan, simulations: int, seed: int) -> Tuple[Any, Any]:
+    """Toutes les simulations d'un match en une opération ; retourne (positions, qualifiées)"""
+    rng = np.random.default_rng(seed)
+    n, team_count = simulations, len(plan.team_ids)
+    rows = np.arange(n)
+    ratings = np.array(plan.ratings, dtype=float)
+
+    points = np.zeros((n, team_count))
+    goal_diff = np.zeros((n, team_count))
+    goals_for = np.zeros((n, team_count))
+    qualified = np.zeros((n, team_count), dtype=bool)
+    pool_stats = {
+        pid: (np.zeros((n, len(pool.teams))), np.zeros((n, len(pool.teams))), np.zeros((n, len(pool.teams))))
+        for pid, pool in plan.pools.items()
+    }
+    pool_local = {}
+    for pid, pool in plan.pools.items():
+        local = np.full(team_count + 1, -1)
+        local[pool.teams] = np.arange(len(pool.teams))
+        pool_local[pid] = local  # local[-1] = -1 : équipe inconnue
+    winners: Dict[int, Any] = {}
+    losers: Dict[int, Any] = {}
+    standings: Dict[int, Tuple[Any, Any, Any]] = {}
+    unknown = np.full(n, -1)
+
+    def pool_standings(pid):
+        if pid not in standings:
+            pts, gd, gf = pool_stats[pid]
+            order = np.argsort(-_ranking_key(pts, gd, gf), axis=1, kind="stable")
+            teams = np.array(plan.pools[pid].teams, dtype=int)[order] if plan.pools[pid].teams else np.empty((n, 0), dtype=int)
+            standings[pid] = (teams, np.take_along_axis(pts, order, axis=1), np.take_along_axis(gd, order, axis=1))
+        return standings[pid]
+
+    def resolve(slot):
+        if slot is None:
+            return unknown
+        kind = slot[0]
+        if kind == "team":
+            return np.full(n, slot[1])
+        if kind == "winner":
+            return winners.get(slot[1], unknown)
+        if kind == "loser":
+            return losers.get(slot[1], unknown)
+        if kind == "pool":
+            teams = pool_standings(slot[1])[0]
+            return teams[:, slot[2] - 1] if teams.shape[1] >= slot[2] else unknown
+        # Meilleur 3ème : plus de points puis meilleure différence, première poule en cas d'égalité
+        thirds = [pool_standings(pid) for pid, pool in plan.pools.items() if len(pool.teams) >= 3]
+        if not thirds:
+            return unknown
+        teams = np.stack([t[:, 2] for t, _, _ in thirds], axis=1)
+        keys = np.stack([p[:, 2] * _POINTS_SCALE + g[:, 2] for _, p, g in thirds], axis=1)
+        return teams[rows, np.argmax(keys, axis=1)]
+
+    for step in plan.steps:
+        team_a, team_b = resolve(step.slot_a), resolve(step.slot_b)
+        valid = (team_a >= 0) & (team_b >= 0) & (team_a != team_b)
+        if step.scores is not None:
+            score_a, score_b = np.full(n, step.scores[0]), np.full(n, step.scores[1])
+        else:
+            strength = ratings[np.maximum(team_a, 0)] - ratings[np.maximum(team_b, 0)]
+            score_a = rng.poisson(plan.average_score * np.exp(strength))
+            score_b = rng.poisson(plan.average_score * np.exp(-strength))
+        a_wins = score_a > score_b
+        draw = score_a == score_b
+        if step.scores is None and step.pool_id is None:
+            a_wins = a_wins | (draw & (rng.random(n) < 0.5))
+            draw = np.zeros(n, dtype=bool)
+
+        winners[step.match_id] = np.where(valid, np.where(a_wins, team_a, team_b), -1)
+        losers[step.match_id] = np.where(valid, np.where(a_wins, team_b, team_a), -1)
+
+        r, a, b = rows[valid], team_a[valid], team_b[valid]
+        sa, sb, aw, dr = score_a[valid], score_b[valid], a_wins[valid], draw[valid]
+        points[r, a] += np.where(dr | ~aw, step.loser_points, step.winner_points)
+        points[r, b] += np.where(dr | aw, step.loser_points, step.winner_points)
+        goal_diff[r, a] += sa - sb
+        goal_diff[r, b] += sb - sa
+        goals_for[r, a] += sa
+        goals_for[r, b] += sb
+
+        if step.pool_id in pool_stats:
+            la, lb = pool_local[step.pool_id][a], pool_local[step.pool_id][b]
+            known = (la >= 0) & (lb >= 0)
+            r, la, lb = r[known], la[known], lb[known]
+            sa, sb, aw, dr = sa[known], sb[known], aw[known], dr[known]
+            pts, gd, gf = pool_stats[step.pool_id]
+            pts[r, la] += np.where(dr, 1, np.where(aw, 3, 0))
+            pts[r, lb] += np.where(dr, 1, np.where(aw, 0, 3))
+            gd[r, la] += sa - sb
+            gd[r, lb] += sb - sa
+            gf[r, la] += sa
+            gf[r, lb] += sb
+        else:
+            qualified[r, a] = True
+            qualified[r, b] = True
+
+    # Points de classement des poules
+    for pid, pool in plan.pools.items():
+        teams = pool_standings(pid)[0]
+        for position, pts in enumerate(pool.standing_points):
+            if pts:
+                points[rows, teams[:, position]] += pts
+
+    order = np.argsort(-_ranking_key(points, goal_diff, goals_for), axis=1, kind="stable")
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.broadcast_to(np.arange(team_count), (n, team_count)), axis=1)
+    cells = (np.arange(team_count) * team_count + positions).ravel()
+    position_counts = np.bincount(cells, minlength=team_count * team_count).reshape(team_count, team_count)
+    return position_counts.tolist(), qualified.sum(axis=0).tolist()
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    threshold, k, p = math.exp(-lam), 0, rng.random()
+    while p > threshold:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def _simulate_python(plan: _Plan, simulations: int, seed: int) -> Tuple[List[List[int]], List[int]]:
+    """Même modèle que _simulate_numpy, une simulation à la fois (NumPy absent)"""
+    rng = random.Random(seed)
+    team_count = len(plan.team_ids)
+    position_counts = [[0] * team_count for _ in range(team_count)]
+    qualified_counts = [0] * team_count
+
+    for _ in range(simulations):
+        points = [0.0] * team_count
+        goal_diff = [0.0] * team_count
+        goals_for = [0.0] * team_count
+        qualified = set()
+        pool_stats = {pid: {team: [0, 0, 0] for team in pool.teams} for pid, pool in plan.pools.items()}
+        results: Dict[int, Tuple[int, int]] = {}  # match_id -> (vainqueur, perdant)
+        standings: Dict[int, list] = {}
+
+        def pool_standings(pid):
+            if pid not in standings:
+                stats = pool_stats[pid]
+                standings[pid] = sorted(
+                    ((team, *stats[team]) for team in plan.pools[pid].teams),
+                    key=lambda s: _ranking_key(s[1], s[2], s[3]), reverse=True
+                )
+            return standings[pid]
+
+        def resolve(slot):
+            if slot is None:
+                return -1
+            kind = slot[0]
+            if kind == "team":
+                return slot[1]
+            if kind in ("winner", "loser"):
+                result = results.get(slot[1])
+                return result[0 if kind == "winner" else 1] if result else -1
+            if kind == "pool":
+                ranked = pool_standings(slot[1])
+                return ranked[slot[2] - 1][0] if len(ranked) >= slot[2] else -1
+            thirds = [pool_standings(pid)[2] for pid, pool in plan.pools.items() if len(pool.teams) >= 3]
+            return max(thirds, key=lambda s: (s[1], s[2]))[0] if thirds else -1
+
+        for step in plan.steps:
+            a, b = resolve(step.slot_a), resolve(step.slot_b)
+            if a < 0 or b < 0 or a == b:
+                continue
+            if step.scores is not None:
+                sa, sb = step.scores
+            else:
+                strength = plan.ratings[a] - plan.ratings[b]
+                sa = _poisson(rng, plan.average_score * math.exp(strength))
+                sb = _poisson(rng, plan.average_score * math.exp(-strength))
+            a_wins, draw = sa > sb, sa == sb
+            if step.scores is None and step.pool_id is None and draw:
+                a_wins, draw = rng.random() < 0.5, False
+
+            results[step.match_id] = (a, b) if a_wins else (b, a)
+            points[a] += step.loser_points if draw or not a_wins else step.winner_points
+            points[b] += step.loser_points if draw or a_wins else step.winner_points
+            goal_diff[a] += sa - sb
+            goal_diff[b] += sb - sa
+            goals_for[a] += sa
+            goals_for[b] += sb
+
+            stats = pool_stats.get(step.pool_id)
+            if stats is not None:
+                if a in stats and b in stats:
+                    stats[a][0] += 1 if draw else 3 if a_wins else 0
+                    stats[b][0] += 1 if draw else 0 if a_wins else 3
+                    stats[a][1] += sa - sb
+                    stats[b][1] += sb - sa
+                    stats[a][2] += sa
+                    stats[b][2] += sb
+            else:
+                qualified.update((a, b))
+
+        for pid, pool in plan.pools.items():
+            for position, (team, *_) in enumerate(pool_standings(pid)):
+                points[team] += pool.standing_points[position]
+
+        ranked = sorted(range(team_count), key=lambda t: _ranking_key(points[t], goal_diff[t], goals_for[t]), reverse=True)
+        for position, team in enumerate(ranked):
+            position_counts[team][position] += 1
+        for team in qualified:
+            qualified_counts[team] += 1
+
+    return position_counts, qualified_counts
+
+
+class SimulationBusyError(Exception):
+    """Levée par `simulate` quand trop de calculs sont déjà en attente ou en cours"""
+
+
+class QualificationSimulator:
+    """Simulations Monte-Carlo par tournoi, mises en cache par version de tournoi"""
+
+    def __init__(self, max_entries: int = 32, max_pending: int = 2):
+        self.max_entries = max_entries
+        self.max_pending = max_pending
+        # Résultat en cours de calcul ou calculé, posé avant le calcul
+        self._cache: "OrderedDict[Tuple[int, int, int], Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qualification-odds")
+
+        # Compteurs
+        self._stats = {"hits": 0, "misses": 0, "errors": 0, "rejected": 0}
+
+    async def simulate(self, db: Session, tournament_id: int, simulations: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Probabilités de chaque position finale et de qualification, par équipe.
+        `db` ne sert qu'à lire la version du tournoi ; le calcul utilise sa propre session.
+
+        Raises:
+            NotFoundError: si le tournoi n'existe pas
+            SimulationBusyError: si max_pending calculs sont déjà en attente ou en cours
+        """
+        version = get_structure_version(db, tournament_id)
+        if version is None:
+            raise NotFoundError("Tournament", str(tournament_id))
+        simulations = min(simulations or DEFAULT_SIMULATIONS, MAX_SIMULATIONS)
+
+        key = (tournament_id, version, simulations)
+        with self._lock:
+            future = self._cache.get(key)
+            hit = future is not None
+            if hit:
+                self._cache.move_to_end(key)
+                self._stats["hits"] += 1
+            else:
+                if sum(1 for pending in self._cache.values() if not pending.done()) >= self.max_pending:
+                    self._stats["rejected"] += 1
+                    raise SimulationBusyError("Too many qualification odds computations in progress")
+                self._stats["misses"] += 1
+                future = self._executor.submit(self._compute, tournament_id, version, simulations)
+                future.add_done_callback(lambda done: self._forget_failed(key, done))
+                self._cache[key] = future
+                self._evict()
+
+        result = await asyncio.wrap_future(future)
+        return {**result, "cached": hit}
+
+    def _evict(self) -> None:
+        """Retire les résultats les plus anciens ; un calcul en attente ou en cours est gardé"""
+        for key in [key for key, future in self._cache.items() if future.done()]:
+            if len(self._cache) <= self.max_entries:
+                break
+            del self._cache[key]
+
+    def _forget_failed(self, key: Tuple[int, int, int], future: Future) -> None:
+        """Un calcul en erreur n'est pas gardé en cache : la requête suivante le relance"""
+        if future.cancelled() or future.exception() is not None:
+            with self._lock:
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+                self._stats["errors"] += 1
+
+    def _compute(self, tournament_id: int, version: int, simulations: int) -> Dict[str, Any]:
+        from app.db import SessionLocal
+
+        db = SessionLocal()
+        try:
+            return self._run(db, tournament_id, version, simulations)
+        finally:
+            db.close()
+
+    def _run(self, db: Session, tournament_id: int, version: int, simulations: int) -> Dict[str, Any]:
+        phases = db.query(TournamentPhase).filter(TournamentPhase.tournament_id == tournament_id).all()
+        phase_ids = [p.id for p in phases]
+        phase_position = {p.id: (p.phase_order, p.id) for p in phases}
+        matches = db.query(Match).filter(Match.phase_id.in_(phase_ids)).order_by(Match.id).all() if phase_ids else []
+        pools = sorted(
+            db.query(Pool).filter(Pool.phase_id.in_(phase_ids)).all() if phase_ids else [],
+            key=lambda p: (phase_position[p.phase_id], p.order, p.id)
+        )
+        team_ids = {tid for m in matches for tid in (m.team_sport_a_id, m.team_sport_b_id) if tid}
+        team_names = dict(
+            db.query(TeamSport.id, Team.name).join(Team, Team.id == TeamSport.team_id).filter(TeamSport.id.in_(team_ids))
+        ) if team_ids else {}
+
+        plan = _Plan(matches, pools, team_names)
+        seed = tournament_id * 1_000_003 + version
+        if not plan.team_ids:
+            position_counts, qualified_counts = [], []
+        elif np is not None:
+            position_counts, qualified_counts = _simulate_numpy(plan, simulations, seed)
+        else:
+            position_counts, qualified_counts = _simulate_python(plan, simulations, seed)
+
+        teams = []
+        for i, team_id in enumerate(plan.team_ids):
+            probabilities = [count / simulations for count in position_counts[i]]
+            teams.append({
+                "team_sport_id": team_id,
+                "team_name": plan.team_names[i],
+                "qualification_probability": qualified_counts[i] / simulations if plan.has_pools else None,
+                "expected_position": round(sum(p * pos for pos, p in enumerate(probabilities, start=1)), 3),
+                "final_positions": {str(pos): round(p, 4) for pos, p in enumerate(probabilities, start=1) if p},
+            })
+        teams.sort(key=lambda t: (t["expected_position"], t["team_name"].lower()))
+
+        logger.info(
+            f"[SIMULATION] Tournoi {tournament_id} (version {version}): {simulations} simulations, "
+            f"{plan.remaining_matches} matchs restants ({'numpy' if np is not None else 'python'})"
+        )
+        return {
+            "tournament_id": tournament_id,
+            "version": version,
+            "simulations": simulations,
+            "engine": "numpy" if np is not None else "python",
+            "remaining_matches": plan.remaining_matches,
+            "unresolved_matches": plan.unresolved_matches,
+            "teams": teams,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.max_entries,
+                "pending": sum(1 for future in self._cache.values() if not future.done()),
+                "max_pending": self.max_pending,
+                **self._stats,
+            }
+
+
+# Instance globale
+qualification_simulator = QualificationSimulator(max_pending=settings.QUALIFICATION_ODDS_MAX_PENDING)
@@ -0,0 +1,244 @@
+"""
+File d'attente des traitements post-résultat (PATCH /matches/{id})
+
+Le PATCH commit le score, marque le tournoi « à recalculer » et répond immédiatement.
+Une tâche de fond regroupe les résultats arrivés pendant `coalesce_window` pour un même
+tournoi et les traite en un seul passage, dans un thread (la boucle d'événements et les
+flux SSE ne sont pas bloqués) :
+- résolution des team_sport_id depuis le nom d'équipe (données historiques)
+- classement des poules touchées (une fois par poule)
+- propagation incrémentale (services/propagation_engine.py) des matchs modifiés
+
+Un tournoi en cours de traitement accumule les nouveaux résultats pour le passage suivant.
+Si une file est perdue (arrêt brutal), le moteur rattrape les résultats manqués au
+prochain appel : il compare les résultats au dernier état connu du tournoi.
+
+`enqueue` ne fait jamais le traitement lui-même. Sans tâche de fond démarrée (scripts,
+TestClient sans lifespan), l'appelant lance `process_pending` : dans un thread
+(`asyncio.to_thread`) depuis une route async.
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _TournamentJob:
+    """Résultats en attente d'un tournoi"""
+
+    def __init__(self):
+        self.match_ids: Set[int] = set()
+        self.pool_ids: Set[int] = set()
+        self.results = 0  # résultats reçus (avant regroupement)
+        self.enqueued_at = time.monotonic()
+
+
+class ResultWorker:
+    """File des tournois à recalculer, regroupée par tournoi, et sa tâche de fond"""
+
+    def __init__(self, coalesce_window: float = 0.2):
+        self.coalesce_window = coalesce_window
+
+        self._pending: Dict[int, _TournamentJob] = {}
+        self._processing: Dict[int, _TournamentJob] = {}
+        self._last_runs: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Compteurs
+        self._stats = {"enqueued": 0, "runs": 0, "coalesced": 0, "errors": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def enqueue(self, tournament_id: int, match_id: int, pool_id: Optional[int] = None) -> None:
+        """Marque un tournoi à recalculer après le résultat d'un match (déjà commité), sans le traiter"""
+        with self._lock:
+            job = self._pending.setdefault(tournament_id, _TournamentJob())
+            job.match_ids.add(match_id)
+            if pool_id is not None:
+                job.pool_ids.add(pool_id)
+            job.results += 1
+            self._stats["enqueued"] += 1
+
+        if self.running:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def process_pending(self) -> int:
+        """Traite immédiatement (thread courant) tous les tournois en attente ; retourne leur nombre"""
+        with self._lock:
+            jobs, self._pending = self._pending, {}
+        for tournament_id, job in jobs.items():
+            self._process(tournament_id, job)
+        return len(jobs)
+
+    def _process(self, tournament_id: int, job: _TournamentJob) -> None:
+        from app.db import SessionLocal
+        from app.services.match_service import MatchService
+        from app.services.propagation_engine import propagation_engine
+
+        with self._lock:
+            self._processing[tournament_id] = job
+        started = time.perf_counter()
+        run = {
+            "results": job.results,
+            "matches": sorted(job.match_ids),
+            "waited_ms": round((time.monotonic() - job.enqueued_at) * 1000, 1),
+            "propagated_matches": 0,
+            "recomputed_matches": 0,
+            "error": None,
+        }
+        db = SessionLocal()
+        try:
+            _resolve_team_names(db, tournament_id, job.match_ids)
+            match_service = MatchService(db)
+            for pool_id in sorted(job.pool_ids):
+                match_service.update_pool_rankings(pool_id, commit=False)
+            report = propagation_engine.propagate(db, tournament_id, match_ids=job.match_ids, commit=False)
+            db.commit()
+            if report:
+                run["propagated_matches"] = report["propagated_matches"]
+                run["recomputed_matches"] = report["recomputed_matches"]
+        except Exception as e:
+            db.rollback()
+            run["error"] = str(e)
+            logger.exception("[RESULT-WORKER] Tournoi %s: échec du traitement", tournament_id)
+        finally:
+            db.close()
+
+        run["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        run["finished_at"] = datetime.utcnow().isoformat()
+        with self._lock:
+            self._processing.pop(tournament_id, None)
+            self._last_runs[tournament_id] = run
+            self._stats["runs"] += 1
+            self._stats["coalesced"] += job.results - 1
+            if run["error"]:
+                self._stats["errors"] += 1
+        logger.info(
+            "[RESULT-WORKER] Tournoi %s: %d résultat(s) traité(s) en %s ms",
+            tournament_id, job.results, run["duration_ms"],
+        )
+
+    def start(self) -> None:
+        """Démarre la tâche de fond (boucle d'événements courante)"""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._worker_loop())
+
+    async def stop(self) -> None:
+        """Arrête la tâche de fond puis traite ce qui reste en attente"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.process_pending)
+
+    async def _worker_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # Fenêtre de regroupement : les résultats d'une même rafale sont traités ensemble
+            await asyncio.sleep(self.coalesce_window)
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.process_pending)
+            except Exception:
+                logger.exception("[RESULT-WORKER] Erreur de la tâche de fond")
+
+    def get_status(self, tournament_id: int) -> Dict[str, Any]:
+        """État de la file pour un tournoi : en attente, en cours, dernier passage"""
+        with self._lock:
+            pending = self._pending.get(tournament_id)
+            processing = self._processing.get(tournament_id)
+            return {
+                "tournament_id": tournament_id,
+                "state": "processing" if processing else "pending" if pending else "idle",
+                "pending_results": pending.results if pending else 0,
+                "pending_matches": sorted(pending.match_ids) if pending else [],
+                "processing_matches": sorted(processing.match_ids) if processing else [],
+                "last_run": self._last_runs.get(tournament_id),
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Compteurs globaux de la file"""
+        with self._lock:
+            return {
+                "running": self.running,
+                "coalesce_window": self.coalesce_window,
+                "pending_tournaments": len(self._pending),
+                "processing_tournaments": len(self._processing),
+                **self._stats,
+            }
+
+
+def _resolve_team_names(db, tournament_id: int, match_ids: Set[int]) -> None:
+    """
+    Données historiques : team_x_source contient le nom de l'équipe mais team_sport_x_id est NULL.
+    Renseigne team_sport_x_id pour les matchs terminés (sport du tournoi), en deux requêtes
+    pour tout le lot : le sport du tournoi, puis les équipes de tous les noms cités.
+    """
+    from app.models.match import Match
+    from app.models.team import Team
+    from app.models.teamsport import TeamSport
+    from app.models.tournament import Tournament
+
+    matches = (
+        db.query(Match)
+        .filter(
+            Match.id.in_(match_ids),
+            Match.status == "completed",
+            Match.score_a.isnot(None),
+            Match.score_b.isnot(None),
+            ((Match.team_sport_a_id.is_(None) & Match.team_a_source.isnot(None))
+             | (Match.team_sport_b_id.is_(None) & Match.team_b_source.isnot(None))),
+        )
+        .all()
+    )
+    if not matches:
+        return
+
+    tournament_row = db.query(Tournament.sport_id).filter(Tournament.id == tournament_id).first()
+    if tournament_row is None or not tournament_row.sport_id:
+        return
+
+    slots = (("team_sport_a_id", "team_a_source"), ("team_sport_b_id", "team_b_source"))
+    names = {
+        getattr(match, attr_source)
+        for match in matches
+        for attr_id, attr_source in slots
+        if getattr(match, attr_id) is None and getattr(match, attr_source)
+    }
+    team_sport_by_name: Dict[str, int] = {}
+    for team_sport_id, name in (
+        db.query(TeamSport.id, Team.name)
+        .join(Team)
+        .filter(Team.name.in_(names), TeamSport.sport_id == tournament_row.sport_id)
+        .order_by(TeamSport.id)
+    ):
+        team_sport_by_name.setdefault(name, team_sport_id)
+
+    for match in matches:
+        for attr_id, attr_source in slots:
+            source = getattr(match, attr_source)
+            team_sport_id = team_sport_by_name.get(source) if getattr(match, attr_id) is None else None
+            if team_sport_id:
+                setattr(match, attr_id, team_sport_id)
+                logger.debug("[Match %s] %s '%s' → team_sport_id %s", match.id, attr_source, source, team_sport_id)
+    db.flush()
+
+
+# Instance globale
+result_worker = ResultWorker(coalesce_window=settings.RESULT_WORKER_COALESCE_MS / 1000)
@@ -0,0 +1,206 @@
+"""
+SSE Connections - Registry of the open live score streams
+Replaces the per-stream keepalive timers by one shared ticker.
+
+- `register` enforces the global and per-IP connection limits
+- the ticker asks idle streams to write a keepalive every `heartbeat_interval`
+- a stream that did not flush anything for `client_timeout` (dead client) is evicted
+- `drain` (shutdown/deploy) closes every stream with a randomized `retry:` hint so the
+  reconnections are spread over a window, and rejects new streams meanwhile
+- `get_stats` exposes the gauges (open streams, per-IP, evictions...)
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SSEConnectionLimitError(Exception):
+    """Raised by `register` when a connection limit is reached"""
+
+    def __init__(self, message: str, scope: str):
+        self.scope = scope  # "global", "ip" or "draining"
+        super().__init__(message)
+
+
+class SSEConnection:
+    """One open SSE stream"""
+
+    def __init__(self, connection_id: int, client_ip: str, topics: List[str]):
+        self.id = connection_id
+        self.client_ip = client_ip
+        self.topics = list(topics)
+        self.subscription = None  # LiveScoreSubscription, attached once the stream starts
+        self.opened_at = time.time()
+        self.last_write = time.monotonic()
+        self.closed = False
+        self.retry_ms: Optional[int] = None  # reconnect delay sent before closing (drain)
+
+        # Counters
+        self.events_sent = 0
+        self.keepalives_sent = 0
+
+    def touch(self) -> None:
+        """Record that the client consumed a frame"""
+        self.last_write = time.monotonic()
+
+    def close(self) -> None:
+        """Make the stream stop at its next wake-up"""
+        self.closed = True
+        if self.subscription is not None:
+            self.subscription.close()
+
+
+class SSEConnectionRegistry:
+    """Open SSE streams, connection limits and the shared heartbeat ticker"""
+
+    def __init__(
+        self,
+        heartbeat_interval: float = 5.0,
+        client_timeout: float = 30.0,
+        max_connections: int = 2000,
+        max_connections_per_ip: int = 50,
+    ):
+        self.heartbeat_interval = heartbeat_interval
+        self.client_timeout = client_timeout
+        self.max_connections = max_connections
+        self.max_connections_per_ip = max_connections_per_ip
+
+        self._connections: Dict[int, SSEConnection] = {}
+        self._per_ip: Counter = Counter()
+        self._next_id = 0
+        self._ticker_task: Optional[asyncio.Task] = None
+        self.draining = False
+        self.reconnect_window = 0.0
+
+        # Counters
+        self._stats = {"opened": 0, "closed": 0, "rejected": 0, "evicted": 0, "keepalives": 0, "drained": 0}
+
+    def register(self, client_ip: str, topics: List[str]) -> SSEConnection:
+        """
+        Reserve a slot for a new stream.
+
+        Raises:
+            SSEConnectionLimitError: if the global or per-IP limit is reached, or while draining
+        """
+        if self.draining:
+            self._stats["rejected"] += 1
+            raise SSEConnectionLimitError("Server is shutting down", scope="draining")
+        if len(self._connections) >= self.max_connections:
+            self._stats["rejected"] += 1
+            raise SSEConnectionLimitError("Too many live score streams", scope="global")
+        if self._per_ip[client_ip] >= self.max_connections_per_ip:
+            self._stats["rejected"] += 1
+            raise SSEConnectionLimitError(f"Too many live score streams from {client_ip}", scope="ip")
+
+        self._next_id += 1
+        connection = SSEConnection(self._next_id, client_ip, topics)
+        self._connections[connection.id] = connection
+        self._per_ip[client_ip] += 1
+        self._stats["opened"] += 1
+        return connection
+
+    def unregister(self, connection: SSEConnection) -> None:
+        """Release the slot of a stream (idempotent)"""
+        if self._connections.pop(connection.id, None) is None:
+            return
+        self._per_ip[connection.client_ip] -= 1
+        if self._per_ip[connection.client_ip] <= 0:
+            del self._per_ip[connection.client_ip]
+        self._stats["closed"] += 1
+
+    def reconnect_delay(self) -> float:
+        """Random reconnect delay (seconds) within the drain window"""
+        return random.uniform(1.0, max(1.0, self.reconnect_window))
+
+    def drain(self, reconnect_window: float) -> int:
+        """
+        Close every open stream with a randomized `retry:` hint and reject new streams.
+
+        Args:
+            reconnect_window: reconnections are spread uniformly over this many seconds
+
+        Returns:
+            The number of drained streams
+        """
+        if self.draining:
+            return 0
+        self.draining = True
+        self.reconnect_window = reconnect_window
+
+        connections = list(self._connections.values())
+        for connection in connections:
+            connection.retry_ms = int(self.reconnect_delay() * 1000)
+            connection.close()
+        self._stats["drained"] += len(connections)
+        logger.info(f"[SSE CONNECTIONS] Draining {len(connections)} streams (reconnect window {reconnect_window}s)")
+        return len(connections)
+
+    def start(self) -> None:
+        """Start the shared heartbeat ticker"""
+        if self._ticker_task is None:
+            self._ticker_task = asyncio.create_task(self._ticker_loop())
+
+    async def stop(self) -> None:
+        """Stop the ticker"""
+        if self._ticker_task is not None:
+            self._ticker_task.cancel()
+            try:
+                await self._ticker_task
+            except asyncio.CancelledError:
+                pass
+            self._ticker_task = None
+
+    def tick(self) -> None:
+        """Request keepalives from idle streams and evict the dead ones"""
+        now = time.monotonic()
+        for connection in list(self._connections.values()):
+            idle = now - connection.last_write
+            if idle >= self.client_timeout:
+                logger.info(f"[SSE CONNECTIONS] Evicting stream {connection.id} ({connection.client_ip}), idle for {idle:.0f}s")
+                connection.close()
+                self.unregister(connection)
+                self._stats["evicted"] += 1
+            elif idle >= self.heartbeat_interval and connection.subscription is not None:
+                connection.subscription.request_keepalive()
+                self._stats["keepalives"] += 1
+
+    async def _ticker_loop(self) -> None:
+        interval = min(1.0, self.heartbeat_interval)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"[SSE CONNECTIONS] Ticker error: {e}")
+
+    def get_connections(self) -> List[SSEConnection]:
+        return list(self._connections.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gauges and counters of the SSE streams"""
+        return {
+            "open": len(self._connections),
+            "draining": self.draining,
+            "max_connections": self.max_connections,
+            "max_connections_per_ip": self.max_connections_per_ip,
+            "clients": len(self._per_ip),
+            "top_clients": dict(self._per_ip.most_common(5)),
+            **self._stats,
+        }
+
+
+# Global singleton instance
+sse_connections = SSEConnectionRegistry(
+    heartbeat_interval=settings.SSE_HEARTBEAT_INTERVAL,
+    client_timeout=settings.SSE_CLIENT_TIMEOUT,
+    max_connections=settings.SSE_MAX_CONNECTIONS,
+    max_connections_per_ip=settings.SSE_MAX_CONNECTIONS_PER_IP,
+)
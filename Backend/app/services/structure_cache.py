@@ -0,0 +1,119 @@
+"""
+Cache de la structure des tournois (GET /tournaments/{id}/structure)
+
+- Tournament.structure_version est incrémenté dans la même transaction que toute écriture
+  ORM touchant un match, un set, une planification, une poule ou une phase du tournoi
+  (écouteur after_flush), et explicitement par les suppressions en masse
+- la réponse sérialisée est mise en cache par (tournoi, version) et servie avec un ETag fort ;
+  un client à jour reçoit 304 Not Modified
+"""
+import logging
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models.match import Match
+from app.models.matchschedule import MatchSchedule
+from app.models.matchset import MatchSet
+from app.models.pool import Pool
+from app.models.tournament import Tournament
+from app.models.tournamentphase import TournamentPhase
+
+logger = logging.getLogger(__name__)
+
+
+def get_structure_version(db: Session, tournament_id: int) -> Optional[int]:
+    """Version courante de la structure d'un tournoi (None si le tournoi n'existe pas)"""
+    return db.query(Tournament.structure_version).filter(Tournament.id == tournament_id).scalar()
+
+
+def bump_structure_version(db: Session, *tournament_ids: int) -> None:
+    """Invalide la structure en cache des tournois (à appeler avant le commit des écritures en masse)"""
+    ids = {tid for tid in tournament_ids if tid is not None}
+    if not ids:
+        return
+    db.execute(
+        update(Tournament)
+        .where(Tournament.id.in_(ids))
+        .values(structure_version=Tournament.structure_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _touched_tournament_ids(session: Session) -> Set[int]:
+    """Tournois concernés par les objets écrits lors d'un flush"""
+    tournament_ids: Set[int] = set()
+    match_ids: Set[int] = set()
+    phase_ids: Set[int] = set()
+
+    dirty = [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in [*session.new, *dirty, *session.deleted]:
+        if isinstance(obj, (Match, MatchSchedule, TournamentPhase)):
+            tournament_ids.add(obj.tournament_id)
+        elif isinstance(obj, MatchSet):
+            match_ids.add(obj.match_id)
+        elif isinstance(obj, Pool):
+            phase_ids.add(obj.phase_id)
+
+    connection = session.connection()
+    if match_ids:
+        tournament_ids.update(connection.execute(
+            select(Match.tournament_id).where(Match.id.in_(match_ids))
+        ).scalars())
+    if phase_ids:
+        tournament_ids.update(connection.execute(
+            select(TournamentPhase.tournament_id).where(TournamentPhase.id.in_(phase_ids))
+        ).scalars())
+
+    tournament_ids.discard(None)
+    return tournament_ids
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _bump_after_flush(session: Session, flush_context) -> None:
+    tournament_ids = _touched_tournament_ids(session)
+    if tournament_ids:
+        session.connection().execute(
+            update(Tournament.__table__)
+            .where(Tournament.__table__.c.id.in_(tournament_ids))
+            .values(structure_version=Tournament.__table__.c.structure_version + 1)
+        )
+
+
+class StructureCache:
+    """Réponses sérialisées de la structure, par tournoi, pour une version donnée"""
+
+    def __init__(self):
+        # tournament_id -> (version, body)
+        self._entries: Dict[int, Tuple[int, bytes]] = {}
+        self._lock = threading.Lock()
+
+        # Compteurs
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def etag(tournament_id: int, version: int) -> str:
+        return f'"structure-{tournament_id}-{version}"'
+
+    def get(self, tournament_id: int, version: int) -> Optional[bytes]:
+        entry = self._entries.get(tournament_id)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, tournament_id: int, version: int, body: bytes) -> None:
+        with self._lock:
+            self._entries[tournament_id] = (version, body)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Instance globale
+structure_cache = StructureCache()
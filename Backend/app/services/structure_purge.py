@@ -0,0 +1,94 @@
+"""
+Suppression ensembliste des matchs et de la structure d'un tournoi
+
+Chaque table dépendante est vidée par un seul `DELETE ... WHERE match_id IN (sous-requête)`,
+quel que soit le nombre de matchs : le verrou d'écriture SQLite n'est tenu que quelques
+millisecondes. Les joueurs de la feuille de match appartiennent aux équipes (Player.team_sport_id)
+et sont conservés ; leurs événements (MatchEvent) sont supprimés avec le match.
+"""
+from typing import Dict, Iterable, Union
+
+from sqlalchemy import Select, delete, select, update
+from sqlalchemy.orm import Session
+
+from app.models.match import Match
+from app.models.match_event import MatchEvent
+from app.models.matchschedule import MatchSchedule
+from app.models.matchset import MatchSet
+from app.models.pool import Pool
+from app.models.teampool import TeamPool
+from app.models.tournamentphase import TournamentPhase
+from app.services.structure_cache import bump_structure_version
+
+
+def _bulk(statement):
+    return statement.execution_options(synchronize_session=False)
+
+
+def tournament_match_ids(tournament_id: int) -> Select:
+    """Sous-requête des matchs d'un tournoi (rattachés par leur phase)"""
+    return select(Match.id).where(
+        Match.phase_id.in_(select(TournamentPhase.id).where(TournamentPhase.tournament_id == tournament_id))
+    )
+
+
+def purge_matches(db: Session, match_ids: Union[Select, Iterable[int]]) -> int:
+    """
+    Supprime des matchs et toutes leurs lignes dépendantes (événements, sets, planification).
+    Les destinations vainqueur/perdant des autres matchs qui pointaient vers eux sont effacées.
+
+    Ne commit pas ; l'appelant invalide la structure (bump_structure_version) si besoin.
+
+    Args:
+        match_ids: sous-requête (select de Match.id) ou liste d'IDs
+
+    Returns:
+        Le nombre de matchs supprimés
+    """
+    if not isinstance(match_ids, Select):
+        match_ids = list(match_ids)
+        if not match_ids:
+            return 0
+
+    for model in (MatchEvent, MatchSet, MatchSchedule):
+        db.execute(_bulk(delete(model).where(model.match_id.in_(match_ids))))
+
+    db.execute(_bulk(
+        update(Match)
+        .where(Match.winner_destination_match_id.in_(match_ids))
+        .values(winner_destination_match_id=None, winner_destination_slot=None)
+    ))
+    db.execute(_bulk(
+        update(Match)
+        .where(Match.loser_destination_match_id.in_(match_ids))
+        .values(loser_destination_match_id=None, loser_destination_slot=None)
+    ))
+
+    return db.execute(_bulk(delete(Match).where(Match.id.in_(match_ids)))).rowcount
+
+
+def purge_tournament_structure(db: Session, tournament_id: int, keep_phases: bool = False) -> Dict[str, int]:
+    """
+    Supprime les matchs d'un tournoi et, sauf `keep_phases`, ses poules (avec leurs équipes) et phases.
+    Nombre de requêtes constant ; ne commit pas.
+
+    Returns:
+        {"deleted_matches", "deleted_pools", "deleted_phases"}
+    """
+    result = {
+        "deleted_matches": purge_matches(db, tournament_match_ids(tournament_id)),
+        "deleted_pools": 0,
+        "deleted_phases": 0,
+    }
+
+    if not keep_phases:
+        phase_ids = select(TournamentPhase.id).where(TournamentPhase.tournament_id == tournament_id)
+        pool_ids = select(Pool.id).where(Pool.phase_id.in_(phase_ids))
+        db.execute(_bulk(delete(TeamPool).where(TeamPool.pool_id.in_(pool_ids))))
+        result["deleted_pools"] = db.execute(_bulk(delete(Pool).where(Pool.phase_id.in_(phase_ids)))).rowcount
+        result["deleted_phases"] = db.execute(_bulk(
+            delete(TournamentPhase).where(TournamentPhase.tournament_id == tournament_id)
+        )).rowcount
+
+    bump_structure_version(db, tournament_id)
+    return result
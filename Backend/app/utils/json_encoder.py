@@ -0,0 +1,77 @@
+"""
+Encodeur JSON sélectionnable pour les chemins chauds (scores en direct, SSE)
+"json" : module standard (par défaut), "orjson" : plus rapide si le paquet est installé
+
+`iter_json_object` / `iter_json_array` produisent un document JSON par morceaux
+(réponses en streaming des gros tournois, mémoire bornée).
+"""
+import json
+import logging
+from typing import Any, Callable, Iterable, Iterator, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+JsonEncoder = Callable[[Any], bytes]
+
+
+def _std_dumps(obj: Any) -> bytes:
+    """Encode avec le module json standard (sortie compacte UTF-8)"""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def get_json_encoder(name: str) -> JsonEncoder:
+    """
+    Retourne la fonction d'encodage JSON -> bytes correspondant au backend demandé.
+    Retombe sur le module standard si orjson n'est pas installé.
+    """
+    name = name.lower()
+
+    if name == "orjson":
+        try:
+            import orjson
+            return orjson.dumps
+        except ImportError:
+            logger.warning("orjson n'est pas installé, utilisation du module json standard")
+            return _std_dumps
+
+    if name != "json":
+        logger.warning(f"Encodeur JSON inconnu '{name}', utilisation du module json standard")
+    return _std_dumps
+
+
+# Encodeur sélectionné par JSON_ENCODER
+dumps_bytes: JsonEncoder = get_json_encoder(settings.JSON_ENCODER)
+
+
+def iter_json_array(items: Iterable[Any]) -> Iterator[bytes]:
+    """Encode un tableau JSON élément par élément (les itérateurs sont imbriqués tels quels)"""
+    yield b"["
+    first = True
+    for item in items:
+        if not first:
+            yield b","
+        first = False
+        if isinstance(item, Iterator):
+            yield from item
+        else:
+            yield dumps_bytes(item)
+    yield b"]"
+
+
+def iter_json_object(fields: Iterable[Tuple[str, Any]]) -> Iterator[bytes]:
+    """
+    Encode un objet JSON champ par champ.
+    Une valeur qui est un itérateur (générateur de morceaux déjà encodés) est streamée telle quelle.
+    """
+    yield b"{"
+    first = True
+    for key, value in fields:
+        yield (b"" if first else b",") + dumps_bytes(key) + b":"
+        first = False
+        if isinstance(value, Iterator):
+            yield from value
+        else:
+            yield dumps_bytes(value)
+    yield b"}"
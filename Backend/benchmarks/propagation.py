@@ -0,0 +1,227 @@
+"""
+Benchmark de la propagation des résultats : tournoi de 32 équipes en double élimination (62 matchs).
+
+Joue tous les matchs dans l'ordre et compte les requêtes SQL de chaque propagation, pour chaque
+point d'entrée du moteur de propagation :
+- POST /tournaments/{id}/propagate-results (détection des matchs modifiés par comparaison)
+- PATCH /matches/{id} (file post-résultat : traitement du match mis à jour, hors regroupement)
+- MatchResultPropagationService.propagate
+- réévaluation complète (?full=true), équivalente à l'ancienne implémentation
+
+Usage (depuis Backend/) : python -m benchmarks.propagation
+La base est créée dans un dossier temporaire : la base de l'application n'est pas touchée.
+"""
+import contextlib
+import io
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="benchmark_propagation_"), "benchmark.db")
+os.environ["DEBUG"] = "false"  # pas d'écho SQL
+
+from sqlalchemy import event
+
+from app.db import SessionLocal, engine, init_db
+from app.models.match import Match
+from app.models.sport import Sport
+from app.models.team import Team
+from app.models.teamsport import TeamSport
+from app.models.tournament import Tournament
+from app.models.tournamentphase import TournamentPhase
+from app.models.user import User
+import app.services.structure_cache  # noqa: F401 - écouteur after_flush, comme dans l'application
+from app.services.match_propagation import MatchResultPropagationService
+from app.services.propagation_engine import propagation_engine
+from app.services.result_worker import result_worker
+
+TEAMS = 32
+
+# Une ligne de log par passage de la file : hors du tableau de résultats
+logging.getLogger("app.services.result_worker").setLevel(logging.WARNING)
+
+
+def create_double_elimination(db, name: str, team_sport_ids) -> int:
+    """
+    Crée un tableau double élimination : 31 matchs de tableau principal (WB), 30 de tableau
+    perdants (LB) et la grande finale. Retourne l'ID du tournoi.
+    """
+    tournament = Tournament(name=name, sport_id=1, created_by_user_id=1, tournament_type="final")
+    db.add(tournament)
+    db.flush()
+    phase = TournamentPhase(tournament_id=tournament.id, phase_type="elimination", phase_order=1)
+    db.add(phase)
+    db.flush()
+
+    def add(label, match_type="bracket", **fields):
+        match = Match(
+            phase_id=phase.id, tournament_id=tournament.id, match_type=match_type,
+            label=label, status="upcoming", created_by_user_id=1, **fields
+        )
+        db.add(match)
+        return match
+
+    def send(source, attr, dest, slot):
+        db.flush()
+        setattr(source, f"{attr}_destination_match_id", dest.id)
+        setattr(source, f"{attr}_destination_slot", slot)
+
+    grand_final = add("GF", bracket_type="final")
+
+    # Tableau principal : 16, 8, 4, 2, 1 matchs
+    wb = [[add(f"WB1-{i + 1}", team_sport_a_id=team_sport_ids[2 * i], team_sport_b_id=team_sport_ids[2 * i + 1]) for i in range(16)]]
+    while len(wb[-1]) > 1:
+        wb.append([add(f"WB{len(wb) + 1}-{i + 1}") for i in range(len(wb[-1]) // 2)])
+    for r in range(len(wb) - 1):
+        for i, match in enumerate(wb[r]):
+            send(match, "winner", wb[r + 1][i // 2], "AB"[i % 2])
+    send(wb[-1][0], "winner", grand_final, "A")
+
+    # Tableau perdants : tours impairs = entre perdants, tours pairs = contre les perdants du WB
+    lb = [[add(f"LB1-{i + 1}", match_type="loser_bracket") for i in range(8)]]
+    for i, match in enumerate(wb[0]):
+        send(match, "loser", lb[0][i // 2], "AB"[i % 2])
+    for r in range(1, len(wb)):
+        minor = [add(f"LB{len(lb) + 1}-{i + 1}", match_type="loser_bracket") for i in range(len(lb[-1]))]
+        for i, match in enumerate(lb[-1]):
+            send(match, "winner", minor[i], "A")
+        for i, match in enumerate(wb[r]):
+            send(match, "loser", minor[i], "B")
+        lb.append(minor)
+        if len(minor) > 1:
+            major = [add(f"LB{len(lb) + 1}-{i + 1}", match_type="loser_bracket") for i in range(len(minor) // 2)]
+            for i, match in enumerate(minor):
+                send(match, "winner", major[i // 2], "AB"[i % 2])
+            lb.append(major)
+    send(lb[-1][0], "winner", grand_final, "B")
+
+    db.commit()
+    return tournament.id
+
+
+def play(tournament_id: int, propagate, seed: int = 2026):
+    """Joue les matchs prêts un par un ; retourne les requêtes et durées de chaque propagation"""
+    rng = random.Random(seed)
+    queries, durations = [], []
+    counter = {"n": 0}
+
+    def count(*args):
+        counter["n"] += 1
+
+    while True:
+        db = SessionLocal()
+        try:
+            match = (
+                db.query(Match)
+                .filter(
+                    Match.tournament_id == tournament_id,
+                    Match.status != "completed",
+                    Match.team_sport_a_id.isnot(None),
+                    Match.team_sport_b_id.isnot(None),
+                )
+                .order_by(Match.id)
+                .first()
+            )
+            if match is None:
+                break
+            score_a = rng.randint(0, 5)
+            match.score_a, match.score_b = score_a, rng.choice([s for s in range(6) if s != score_a])
+            match.status = "completed"
+            db.commit()
+
+            counter["n"] = 0
+            event.listen(engine, "before_cursor_execute", count)
+            started = time.perf_counter()
+            try:
+                propagate(db, tournament_id, match.id)
+            finally:
+                event.remove(engine, "before_cursor_execute", count)
+            durations.append((time.perf_counter() - started) * 1000)
+            queries.append(counter["n"])
+        finally:
+            db.close()
+
+    db = SessionLocal()
+    try:
+        final_state = [
+            (m.label, m.status, m.team_sport_a_id, m.team_sport_b_id)
+            for m in db.query(Match).filter(Match.tournament_id == tournament_id).order_by(Match.label)
+        ]
+    finally:
+        db.close()
+    return queries, durations, final_state
+
+
+def propagate_endpoint(db, tournament_id, match_id):
+    propagation_engine.propagate(db, tournament_id)
+
+
+def propagate_patch(db, tournament_id, match_id):
+    # Sans tâche de fond démarrée, la route traite la file elle-même (dans un thread)
+    result_worker.enqueue(tournament_id, match_id)
+    result_worker.process_pending()
+
+
+def propagate_service(db, tournament_id, match_id):
+    MatchResultPropagationService(db).propagate(match_id)
+
+
+def propagate_full(db, tournament_id, match_id):
+    propagation_engine.propagate(db, tournament_id, full=True)
+
+
+MODES = [
+    ("POST /tournaments/{id}/propagate-results", propagate_endpoint),
+    ("PATCH /matches/{id}", propagate_patch),
+    ("MatchResultPropagationService", propagate_service),
+    ("Réévaluation complète (?full=true)", propagate_full),
+]
+
+
+def main():
+    init_db()
+    db = SessionLocal()
+    db.add(User(email="benchmark@example.com", role="admin"))
+    db.add(Sport(name="Benchmark", score_type="points"))
+    teams = [Team(name=f"Équipe {i + 1}") for i in range(TEAMS)]
+    db.add_all(teams)
+    db.flush()
+    team_sports = [TeamSport(team_id=team.id, sport_id=1) for team in teams]
+    db.add_all(team_sports)
+    db.commit()
+    team_sport_ids = [ts.id for ts in team_sports]
+    db.close()
+
+    print(f"Tournoi double élimination, {TEAMS} équipes\n")
+    print(f"{'Point d entrée':<42} {'matchs':>6} {'req. moy':>9} {'req. max':>9} {'total':>6} {'réévalués moy':>14} {'ms moy':>7}")
+    reference_state = None
+    for index, (label, propagate) in enumerate(MODES):
+        db = SessionLocal()
+        tournament_id = create_double_elimination(db, f"Benchmark {index + 1}", team_sport_ids)
+        db.close()
+
+        # Premier appel : construction du graphe (non compté)
+        db = SessionLocal()
+        with contextlib.redirect_stdout(io.StringIO()):
+            propagation_engine.propagate(db, tournament_id)
+        db.close()
+
+        recomputed_before = propagation_engine.get_stats()["recomputed_matches"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            queries, durations, final_state = play(tournament_id, propagate)
+        recomputed = (propagation_engine.get_stats()["recomputed_matches"] - recomputed_before) / len(queries)
+        state = [row[1:] for row in final_state]
+        if reference_state is None:
+            reference_state = state
+        consistent = "" if state == reference_state else "  ⚠️ état final différent"
+        print(
+            f"{label:<42} {len(queries):>6} {statistics.mean(queries):>9.1f} {max(queries):>9} "
+            f"{sum(queries):>6} {recomputed:>14.1f} {statistics.mean(durations):>7.1f}{consistent}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Moteur de propagation (services/propagation_engine.py) sur une base SQLite en mémoire :
+- un match re-scoré déplace l'équipe qu'il avait placée
+- réévaluation complète et incrémentale donnent les mêmes placements et classements
+- un second passage ne modifie rien
+
+Usage (depuis Backend/) : python -m pytest tests
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401 - enregistre les modèles auprès de Base
+from app.db import Base
+from app.models.match import Match
+from app.models.pool import Pool
+from app.models.sport import Sport
+from app.models.team import Team
+from app.models.teamsport import TeamSport
+from app.models.tournament import Tournament
+from app.models.tournamentphase import TournamentPhase
+from app.models.tournamentranking import TournamentRanking
+from app.models.user import User
+from app.services.propagation_engine import PropagationEngine
+
+# Résultats de poule (équipes 0..2) : 0 gagne tout, 1 bat 2
+POOL_RESULTS = [((0, 1), (3, 1)), ((0, 2), (2, 0)), ((1, 2), (4, 2))]
+
+
+@pytest.fixture
+def new_db():
+    """Fabrique de sessions, chacune sur sa propre base en mémoire"""
+    engines, sessions = [], []
+
+    def make():
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        engines.append(engine)
+        sessions.append(session)
+        return session
+
+    yield make
+    for session in sessions:
+        session.close()
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture
+def db(new_db):
+    return new_db()
+
+
+def build_tournament(db):
+    """
+    Poule A (3 équipes, round robin) dont les deux premiers jouent la finale par codes source,
+    et deux demi-finales (4 équipes) dont les vainqueurs / perdants vont en finale / petite finale.
+    Retourne (tournament_id, {label: match}, [team_sport_id...]).
+    """
+    db.add(User(id=1, email="tests@example.com", role="admin"))
+    db.add(Sport(id=1, name="Volleyball", score_type="points"))
+    db.flush()
+    team_sport_ids = []
+    for i in range(7):
+        team = Team(name=f"Équipe {i}")
+        db.add(team)
+        db.flush()
+        team_sport = TeamSport(team_id=team.id, sport_id=1)
+        db.add(team_sport)
+        db.flush()
+        team_sport_ids.append(team_sport.id)
+
+    tournament = Tournament(name="Tests", sport_id=1, created_by_user_id=1, tournament_type="mixed")
+    db.add(tournament)
+    db.flush()
+    pools_phase = TournamentPhase(tournament_id=tournament.id, phase_type="pools", phase_order=1)
+    final_phase = TournamentPhase(tournament_id=tournament.id, phase_type="final", phase_order=2)
+    db.add_all([pools_phase, final_phase])
+    db.flush()
+    pool = Pool(phase_id=pools_phase.id, name="Poule A", order=1,
+                use_standing_points=True, standing_points='{"1": 15, "2": 10, "3": 4}')
+    db.add(pool)
+    db.flush()
+
+    matches = {}
+
+    def add(label, phase, match_type, **fields):
+        match = Match(
+            phase_id=phase.id, tournament_id=tournament.id, match_type=match_type,
+            label=label, status="upcoming", created_by_user_id=1, **fields
+        )
+        db.add(match)
+        matches[label] = match
+        return match
+
+    for i, ((a, b), _) in enumerate(POOL_RESULTS):
+        add(f"P{i + 1}", pools_phase, "pool", pool_id=pool.id,
+            team_sport_a_id=team_sport_ids[a], team_sport_b_id=team_sport_ids[b])
+    add("F-POULE", final_phase, "bracket", team_a_source="Poule A-1", team_b_source="Poule A-2")
+    add("F", final_phase, "bracket", bracket_type="final")
+    add("PF", final_phase, "bracket", bracket_type="third_place")
+    db.flush()
+    for label, (a, b), slot in (("SF1", (3, 4), "A"), ("SF2", (5, 6), "B")):
+        add(label, final_phase, "bracket", bracket_type="semifinal",
+            team_sport_a_id=team_sport_ids[a], team_sport_b_id=team_sport_ids[b],
+            winner_destination_match_id=matches["F"].id, winner_destination_slot=slot,
+            loser_destination_match_id=matches["PF"].id, loser_destination_slot=slot)
+    db.commit()
+    return tournament.id, matches, team_sport_ids
+
+
+def play(db, match, score_a, score_b):
+    match.score_a, match.score_b, match.status = score_a, score_b, "completed"
+    db.commit()
+
+
+def placements(db, tournament_id):
+    return {
+        m.label: (m.team_sport_a_id, m.team_sport_b_id)
+        for m in db.query(Match).filter(Match.tournament_id == tournament_id)
+    }
+
+
+def rankings(db, tournament_id):
+    return sorted(
+        (r.team_sport_id, r.final_position, r.points_awarded)
+        for r in db.query(TournamentRanking).filter(TournamentRanking.tournament_id == tournament_id)
+    )
+
+
+def play_all(db, engine, tournament_id, matches, incremental):
+    for label, (_, score) in zip(("P1", "P2", "P3"), POOL_RESULTS):
+        play(db, matches[label], *score)
+        if incremental:
+            engine.propagate(db, tournament_id, match_ids=[matches[label].id])
+    for label in ("SF1", "SF2"):
+        play(db, matches[label], 3, 1)
+        if incremental:
+            engine.propagate(db, tournament_id, match_ids=[matches[label].id])
+    if not incremental:
+        engine.propagate(db, tournament_id, full=True)
+
+
+def test_rescored_match_moves_the_team_it_placed(db):
+    tournament_id, matches, teams = build_tournament(db)
+    engine = PropagationEngine()
+
+    play(db, matches["SF1"], 3, 1)
+    engine.propagate(db, tournament_id, match_ids=[matches["SF1"].id])
+    assert placements(db, tournament_id)["F"] == (teams[3], None)
+    assert placements(db, tournament_id)["PF"] == (teams[4], None)
+
+    # Score corrigé : le vainqueur et le perdant échangent leurs places
+    play(db, matches["SF1"], 0, 2)
+    engine.propagate(db, tournament_id, match_ids=[matches["SF1"].id])
+    assert placements(db, tournament_id)["F"] == (teams[4], None)
+    assert placements(db, tournament_id)["PF"] == (teams[3], None)
+    assert db.get(Match, matches["F"].id).team_a_source == "Équipe 4"
+
+
+def test_pool_codes_wait_for_the_pool_and_follow_corrections(db):
+    tournament_id, matches, teams = build_tournament(db)
+    engine = PropagationEngine()
+
+    play(db, matches["P1"], 3, 1)
+    engine.propagate(db, tournament_id, match_ids=[matches["P1"].id])
+    assert placements(db, tournament_id)["F-POULE"] == (None, None)
+
+    play(db, matches["P2"], 2, 0)
+    play(db, matches["P3"], 4, 2)
+    engine.propagate(db, tournament_id, match_ids=[matches["P2"].id, matches["P3"].id])
+    assert placements(db, tournament_id)["F-POULE"] == (teams[0], teams[1])
+
+    # L'équipe 2 gagne finalement contre l'équipe 1 : elle prend la 2e place
+    play(db, matches["P3"], 0, 5)
+    engine.propagate(db, tournament_id, match_ids=[matches["P3"].id])
+    assert placements(db, tournament_id)["F-POULE"] == (teams[0], teams[2])
+
+
+def test_full_and_incremental_runs_agree(new_db):
+    # Même tournoi, joué résultat par résultat d'un côté et réévalué d'un coup de l'autre
+    incremental_db, full_db = new_db(), new_db()
+    tournament_id, matches, _ = build_tournament(incremental_db)
+    play_all(incremental_db, PropagationEngine(), tournament_id, matches, incremental=True)
+    tournament_id, matches, _ = build_tournament(full_db)
+    play_all(full_db, PropagationEngine(), tournament_id, matches, incremental=False)
+
+    incremental = placements(incremental_db, tournament_id), rankings(incremental_db, tournament_id)
+    full = placements(full_db, tournament_id), rankings(full_db, tournament_id)
+    assert incremental == full
+    assert incremental[1], "les classements de poule doivent être écrits"
+
+
+def test_repeated_run_is_idempotent(db):
+    tournament_id, matches, _ = build_tournament(db)
+    engine = PropagationEngine()
+    play_all(db, engine, tournament_id, matches, incremental=True)
+    before = placements(db, tournament_id), rankings(db, tournament_id)
+
+    report = engine.propagate(db, tournament_id)
+    assert report["propagated_matches"] == 0
+    assert report["recomputed_matches"] == 0
+
+    report = engine.propagate(db, tournament_id, full=True)
+    assert report["propagated_matches"] == 0
+    assert (placements(db, tournament_id), rankings(db, tournament_id)) == before